@@ -19,7 +19,7 @@ import sys
 assert sys.version_info > (3, 6), "Outdated python version detected, Odoo requires Python >= 3.6 to run."
 
 #----------------------------------------------------------
-# Running mode flags (gevent, prefork)
+# Running mode flags (gevent, asyncio, prefork)
 #----------------------------------------------------------
 # Is the server running with gevent.
 evented = False
@@ -49,6 +49,12 @@ if len(sys.argv) > 1 and sys.argv[1] == 'gevent':
     psycopg2.extensions.set_wait_callback(gevent_wait_callback)
     evented = True
 
+# Is the server running the asyncio longpolling service.
+asynchronous = False
+if len(sys.argv) > 1 and sys.argv[1] == 'asyncio':
+    sys.argv.remove('asyncio')
+    asynchronous = True
+
 # Is the server running in prefork mode (e.g. behind Gunicorn).
 # If this is True, the processes have to communicate some events,
 # e.g. database update or cache invalidation. Each process has also
@@ -10,6 +10,7 @@ from . import ir_ui_menu
 from . import ir_ui_view
 from . import ir_actions
 from . import ir_actions_report
+from . import ir_actions_report_job
 from . import ir_attachment
 from . import ir_cron
 from . import ir_filters
@@ -13,6 +13,7 @@ except ImportError:
     # If the `sass` python library isn't found, we fallback on the
     # `sassc` executable in the path.
     libsass = None
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import closing
 from datetime import datetime
 from subprocess import Popen, PIPE
@@ -113,6 +114,7 @@ class AssetsBundle(object):
         self.stylesheets = []
         self.css_errors = []
         self._checksum = None
+        self._compiled_css = None
         self.files = files
         self.user_direction = self.env['res.lang']._lang_get(
             self.env.context.get('lang') or self.env.user.lang
@@ -213,6 +215,25 @@ class AssetsBundle(object):
             **self._get_asset_url_values(id=id, unique=unique, extra=extra, name=name, sep=sep, type=type)
         )
 
+    def _try_build_lock(self, type):
+        """ Try to take the lock dedicated to building the current version of
+        the bundle for the given type. The lock is held until the end of the
+        transaction, hence while the attachment is not visible to the other
+        workers.
+
+        :return: False if another transaction is building the same bundle
+        """
+        url = self.get_asset_url(
+            unique=self.version,
+            extra='%s' % ('rtl/' if type == 'css' and self.user_direction == 'rtl' else ''),
+            name=self.name,
+            sep='',
+            type='.%s' % type
+        )
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        self.env.cr.execute("SELECT pg_try_advisory_xact_lock(%s)", [int(key[:15], 16)])
+        return self.env.cr.fetchone()[0]
+
     def clean_attachments(self, type):
         """ Takes care of deleting any outdated ir.attachment records associated to a bundle before
         saving a fresh one.
@@ -314,6 +335,10 @@ class AssetsBundle(object):
 
     def js(self):
         attachments = self.get_attachments('js')
+        if not attachments and not self._try_build_lock('js'):
+            # another worker is building this version: serve the previous one
+            # meanwhile, if any; it is invalidated once the new one is saved
+            attachments = self.get_attachments('js', ignore_version=True)
         if not attachments:
             content = ';\n'.join(asset.minify() for asset in self.javascripts)
             return self.save_attachment('js', content)
@@ -321,6 +346,8 @@ class AssetsBundle(object):
 
     def css(self):
         attachments = self.get_attachments('css')
+        if not attachments and not self._try_build_lock('css'):
+            attachments = self.get_attachments('css', ignore_version=True)
         if not attachments:
             # get css content
             css = self.preprocess_css()
@@ -450,12 +477,10 @@ class AssetsBundle(object):
             Returns the bundle's flat css.
         """
         if self.stylesheets:
-            compiled = ""
-            for atype in (SassStylesheetAsset, ScssStylesheetAsset, LessStylesheetAsset):
-                assets = [asset for asset in self.stylesheets if isinstance(asset, atype)]
-                if assets:
-                    source = '\n'.join([asset.get_source() for asset in assets])
-                    compiled += self.compile_css(assets[0].compile, source)
+            if self._compiled_css is None:
+                self.precompile_css([self])
+            compiled = ''.join(self._compiled_css)
+            self._compiled_css = None
 
             # We want to run rtlcss on normal css, so merge it in compiled
             if self.user_direction == 'rtl':
@@ -499,6 +524,44 @@ class AssetsBundle(object):
 
         return '\n'.join(asset.minify() for asset in self.stylesheets)
 
+    def get_css_sources(self):
+        """ Return the ``(compiler, source)`` pairs to compile, one per kind of
+        preprocessed stylesheet (sass, scss, less) found in the bundle.
+        """
+        sources = []
+        for atype in (SassStylesheetAsset, ScssStylesheetAsset, LessStylesheetAsset):
+            assets = [asset for asset in self.stylesheets if isinstance(asset, atype)]
+            if assets:
+                source = '\n'.join([asset.get_source() for asset in assets])
+                sources.append((assets[0].compile, source))
+        return sources
+
+    @staticmethod
+    def precompile_css(bundles):
+        """ Compile the preprocessed stylesheets of the given bundles, the
+        result being used by their next call to :meth:`preprocess_css`.
+
+        The sources are gathered beforehand, as it may require the database,
+        then compiled concurrently: each source is compiled on its own (by an
+        external process or libsass), so independent sources do not have to
+        wait for each other.
+        """
+        jobs = [
+            (bundle, compiler, source)
+            for bundle in bundles
+            for compiler, source in bundle.get_css_sources()
+        ]
+        if len(jobs) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as executor:
+                results = list(executor.map(lambda job: job[0].compile_css(job[1], job[2]), jobs))
+        else:
+            results = [bundle.compile_css(compiler, source) for bundle, compiler, source in jobs]
+
+        for bundle in bundles:
+            bundle._compiled_css = []
+        for (bundle, _compiler, _source), compiled in zip(jobs, results):
+            bundle._compiled_css.append(compiled)
+
     def compile_css(self, compiler, source):
         """Sanitizes @import rules, remove duplicates @import rules, then compile"""
         imports = []
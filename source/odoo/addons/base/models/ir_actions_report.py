@@ -27,6 +27,7 @@ from reportlab.graphics.barcode import createBarcodeDrawing
 from PyPDF2 import PdfFileWriter, PdfFileReader, utils
 from collections import OrderedDict
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageFile
 # Allow truncated images
 ImageFile.LOAD_TRUNCATED_IMAGES = True
@@ -34,6 +35,9 @@ ImageFile.LOAD_TRUNCATED_IMAGES = True
 
 _logger = logging.getLogger(__name__)
 
+# minimum number of bodies converted by each wkhtmltopdf subprocess of a report
+WKHTMLTOPDF_PART_MIN_BODIES = 10
+
 # A lock occurs when the user wants to print a report having multiple barcode while the server is
 # started in threaded-mode. The reason is that reportlab has to build a cache of the T1 fonts
 # before rendering a barcode (done in a C extension) and this part is not thread safe. We attempt
@@ -49,6 +53,13 @@ def _get_wkhtmltopdf_bin():
     return find_in_path('wkhtmltopdf')
 
 
+def _wkhtmltopdf_subprocess(command):
+    """ Run the wkhtmltopdf ``command``, and return its return code and error output. """
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = process.communicate()
+    return process.returncode, err
+
+
 # Check the presence of Wkhtmltopdf and return its version at Odoo start-up
 wkhtmltopdf_state = 'install'
 wkhtmltopdf_dpi_zoom_ratio = False
@@ -117,6 +128,8 @@ class IrActionsReport(models.Model):
                                     help='If you check this, then the second time the user prints with same attachment name, it returns the previous report.')
     attachment = fields.Char(string='Save as Attachment Prefix',
                              help='This is the filename of the attachment used to store the printing result. Keep empty to not save the printed reports. You can use a python expression with the object and time variables.')
+    background = fields.Boolean(string='Generate in Background',
+                                help='If you check this, printing the report queues its generation instead of rendering it right away, and the user is notified once the document is ready.')
 
     @api.depends('model')
     def _compute_model_id(self):
@@ -414,6 +427,36 @@ class IrActionsReport(models.Model):
         :param set_viewport_size: Enable a viewport sized '1024x1280' or '1280x1024' depending of landscape arg.
         :return: Content of the pdf as a string
         '''
+        [(pdf_content, _indexes)] = self._run_wkhtmltopdf_parts(
+            bodies,
+            header=header,
+            footer=footer,
+            landscape=landscape,
+            specific_paperformat_args=specific_paperformat_args,
+            set_viewport_size=set_viewport_size)
+        return pdf_content
+
+    @api.model
+    def _run_wkhtmltopdf_parts(
+            self,
+            bodies,
+            header=None,
+            footer=None,
+            landscape=False,
+            specific_paperformat_args=None,
+            set_viewport_size=False,
+            processes=1):
+        '''Same as ``_run_wkhtmltopdf``, but split the bodies into at most ``processes``
+        parts of consecutive bodies, converted concurrently by as many wkhtmltopdf subprocesses.
+
+        Every part is a separate wkhtmltopdf document: the document-wide page counters of
+        wkhtmltopdf (``page``, ``frompage``, ``topage``) restart in each part. The page counters
+        of the minimal layout (``sitepage``, ``sitepages``) count the pages of each body, and are
+        not affected.
+
+        :param processes: The maximum number of wkhtmltopdf subprocesses.
+        :return: A list of pairs (content of the pdf, indexes of the bodies of the part)
+        '''
         paperformat_id = self.get_paperformat()
 
         # Build the base command args for wkhtmltopdf bin
@@ -425,61 +468,81 @@ class IrActionsReport(models.Model):
 
         files_command_args = []
         temporary_files = []
-        if header:
-            head_file_fd, head_file_path = tempfile.mkstemp(suffix='.html', prefix='report.header.tmp.')
-            with closing(os.fdopen(head_file_fd, 'wb')) as head_file:
-                head_file.write(header)
-            temporary_files.append(head_file_path)
-            files_command_args.extend(['--header-html', head_file_path])
-        if footer:
-            foot_file_fd, foot_file_path = tempfile.mkstemp(suffix='.html', prefix='report.footer.tmp.')
-            with closing(os.fdopen(foot_file_fd, 'wb')) as foot_file:
-                foot_file.write(footer)
-            temporary_files.append(foot_file_path)
-            files_command_args.extend(['--footer-html', foot_file_path])
-
-        paths = []
-        for i, body in enumerate(bodies):
-            prefix = '%s%d.' % ('report.body.tmp.', i)
-            body_file_fd, body_file_path = tempfile.mkstemp(suffix='.html', prefix=prefix)
-            with closing(os.fdopen(body_file_fd, 'wb')) as body_file:
-                body_file.write(body)
-            paths.append(body_file_path)
-            temporary_files.append(body_file_path)
-
-        pdf_report_fd, pdf_report_path = tempfile.mkstemp(suffix='.pdf', prefix='report.tmp.')
-        os.close(pdf_report_fd)
-        temporary_files.append(pdf_report_path)
-
         try:
-            wkhtmltopdf = [_get_wkhtmltopdf_bin()] + command_args + files_command_args + paths + [pdf_report_path]
-            process = subprocess.Popen(wkhtmltopdf, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            out, err = process.communicate()
-
-            if process.returncode not in [0, 1]:
-                if process.returncode == -11:
-                    message = _(
-                        'Wkhtmltopdf failed (error code: %s). Memory limit too low or maximum file number of subprocess reached. Message : %s')
-                else:
-                    message = _('Wkhtmltopdf failed (error code: %s). Message: %s')
-                raise UserError(message % (str(process.returncode), err[-1000:]))
+            if header:
+                head_file_fd, head_file_path = tempfile.mkstemp(suffix='.html', prefix='report.header.tmp.')
+                with closing(os.fdopen(head_file_fd, 'wb')) as head_file:
+                    head_file.write(header)
+                temporary_files.append(head_file_path)
+                files_command_args.extend(['--header-html', head_file_path])
+            if footer:
+                foot_file_fd, foot_file_path = tempfile.mkstemp(suffix='.html', prefix='report.footer.tmp.')
+                with closing(os.fdopen(foot_file_fd, 'wb')) as foot_file:
+                    foot_file.write(footer)
+                temporary_files.append(foot_file_path)
+                files_command_args.extend(['--footer-html', foot_file_path])
+
+            # The index of a body in the name of its file is used by the minimal layout to select
+            # its header and footer, whatever the part the body belongs to.
+            paths = []
+            for i, body in enumerate(bodies):
+                prefix = '%s%d.' % ('report.body.tmp.', i)
+                body_file_fd, body_file_path = tempfile.mkstemp(suffix='.html', prefix=prefix)
+                with closing(os.fdopen(body_file_fd, 'wb')) as body_file:
+                    body_file.write(body)
+                paths.append(body_file_path)
+                temporary_files.append(body_file_path)
+
+            size = -(-len(paths) // max(processes, 1)) or 1
+            parts = [range(start, min(start + size, len(paths))) for start in range(0, len(paths), size)]
+            if not parts:
+                # no body, let wkhtmltopdf handle it as a single document
+                parts = [range(0)]
+
+            commands = []
+            pdf_report_paths = []
+            for part in parts:
+                pdf_report_fd, pdf_report_path = tempfile.mkstemp(suffix='.pdf', prefix='report.tmp.')
+                os.close(pdf_report_fd)
+                temporary_files.append(pdf_report_path)
+                pdf_report_paths.append(pdf_report_path)
+                commands.append(
+                    [_get_wkhtmltopdf_bin()] + command_args + files_command_args
+                    + [paths[i] for i in part] + [pdf_report_path]
+                )
+
+            if len(commands) == 1:
+                results = [_wkhtmltopdf_subprocess(commands[0])]
             else:
-                if err:
-                    _logger.warning('wkhtmltopdf: %s' % err)
-        except:
-            raise
+                with ThreadPoolExecutor(len(commands)) as executor:
+                    results = list(executor.map(_wkhtmltopdf_subprocess, commands))
+
+            for returncode, err in results:
+                if returncode not in [0, 1]:
+                    if returncode == -11:
+                        message = _(
+                            'Wkhtmltopdf failed (error code: %s). Memory limit too low or maximum file number of subprocess reached. Message : %s')
+                    else:
+                        message = _('Wkhtmltopdf failed (error code: %s). Message: %s')
+                    raise UserError(message % (str(returncode), err[-1000:]))
+                else:
+                    if err:
+                        _logger.warning('wkhtmltopdf: %s' % err)
 
-        with open(pdf_report_path, 'rb') as pdf_document:
-            pdf_content = pdf_document.read()
+            pdf_contents = []
+            for pdf_report_path, part in zip(pdf_report_paths, parts):
+                with open(pdf_report_path, 'rb') as pdf_document:
+                    pdf_contents.append((pdf_document.read(), list(part)))
 
-        # Manual cleanup of the temporary files
-        for temporary_file in temporary_files:
-            try:
-                os.unlink(temporary_file)
-            except (OSError, IOError):
-                _logger.error('Error when trying to remove file %s' % temporary_file)
+        finally:
+            # Manual cleanup of the temporary files
+            for temporary_file in temporary_files:
+                try:
+                    os.unlink(temporary_file)
+                except (OSError, IOError):
+                    _logger.error('Error when trying to remove file %s' % temporary_file)
 
-        return pdf_content
+        return pdf_contents
 
     @api.model
     def _get_report_from_name(self, report_name):
@@ -556,7 +619,8 @@ class IrActionsReport(models.Model):
         if required.
 
         :param save_in_attachment: The retrieved attachments as map record.id -> attachment_id.
-        :param pdf_content: The pdf content newly generated by wkhtmltopdf.
+        :param pdf_content: The pdf content newly generated by wkhtmltopdf, or a list of pairs
+                            (pdf_content, res_ids) if it was generated in several parts.
         :param res_ids: the ids of record to allow postprocessing.
         :return: The pdf content of the merged pdf.
         '''
@@ -580,7 +644,11 @@ class IrActionsReport(models.Model):
         streams = []
 
         # In wkhtmltopdf has been called, we need to split the pdf in order to call the postprocess method.
-        if pdf_content:
+        # The pdf may have been generated in several parts, given as a list of pairs (pdf_content, res_ids).
+        pdf_parts = pdf_content if isinstance(pdf_content, list) else [(pdf_content, res_ids)]
+        for pdf_content, res_ids in pdf_parts:
+            if not pdf_content:
+                continue
             pdf_content_stream = io.BytesIO(pdf_content)
             # Build a record_map mapping id -> record
             record_map = {r.id: r for r in self.env[self.model].browse([res_id for res_id in res_ids if res_id])}
@@ -779,19 +847,28 @@ class IrActionsReport(models.Model):
             raise UserError(_("The report's template '%s' is wrong, please contact your administrator. \n\n"
                 "Can not separate file to save as attachment because the report's template does not contains the attributes 'data-oe-model' and 'data-oe-id' on the div with 'article' classname.") %  self.name)
 
-        pdf_content = self._run_wkhtmltopdf(
+        # Large reports are split into parts converted concurrently, if enabled by the option
+        # report_processes; the document-wide page counters then restart in every part
+        processes = min(config['report_processes'], len(bodies) // WKHTMLTOPDF_PART_MIN_BODIES) or 1
+        pdf_parts = self._run_wkhtmltopdf_parts(
             bodies,
             header=header,
             footer=footer,
             landscape=context.get('landscape'),
             specific_paperformat_args=specific_paperformat_args,
             set_viewport_size=context.get('set_viewport_size'),
+            processes=processes,
         )
         if res_ids:
             _logger.info('The PDF report has been generated for model: %s, records %s.' % (self.model, str(res_ids)))
             self._raise_on_unreadable_pdfs(save_in_attachment.values(), stream_record)
-            return self._post_pdf(save_in_attachment, pdf_content=pdf_content, res_ids=html_ids), 'pdf'
-        return pdf_content, 'pdf'
+            if len(pdf_parts) == 1:
+                return self._post_pdf(save_in_attachment, pdf_content=pdf_parts[0][0], res_ids=html_ids), 'pdf'
+            pdf_content = [(content, [html_ids[i] for i in indexes]) for content, indexes in pdf_parts]
+            return self._post_pdf(save_in_attachment, pdf_content=pdf_content), 'pdf'
+        if len(pdf_parts) == 1:
+            return pdf_parts[0][0], 'pdf'
+        return self._merge_pdfs([io.BytesIO(content) for content, _indexes in pdf_parts]), 'pdf'
 
     @api.model
     def render_qweb_text(self, docids, data=None):
@@ -842,6 +919,41 @@ class IrActionsReport(models.Model):
             return None
         return render_func(res_ids, data=data)
 
+    def _enqueue(self, res_ids, data=None):
+        """Queue the generation of the report for the given records; it is
+        rendered later on by a cron worker, see ``ir.actions.report.job``.
+
+        :param res_ids: ids of the records to print
+        :param data: optional data given to the report
+        :return: the queued ``ir.actions.report.job`` record
+        """
+        self.ensure_one()
+        records = self.env[self.model].browse(res_ids)
+        records.check_access_rights('read')
+        records.check_access_rule('read')
+
+        name = self.name
+        if self.print_report_name and len(records) == 1:
+            name = safe_eval(self.print_report_name, {'object': records, 'time': time})
+
+        # the context is stored as JSON, other values are dropped
+        context = {}
+        for key, value in self.env.context.items():
+            try:
+                json.dumps(value)
+            except (TypeError, ValueError):
+                continue
+            context[key] = value
+        job = self.env['ir.actions.report.job'].sudo().create({
+            'name': name,
+            'report_id': self.id,
+            'res_ids': ','.join(str(res_id) for res_id in records.ids),
+            'data': json.dumps(data) if data else False,
+            'context': json.dumps(context),
+            'user_id': self.env.uid,
+        })
+        return job.sudo(False)
+
     def report_action(self, docids, data=None, config=True):
         """Return an action of type ir.actions.report.
 
@@ -866,6 +978,7 @@ class IrActionsReport(models.Model):
             'report_type': self.report_type,
             'report_file': self.report_file,
             'name': self.name,
+            'background': self.background,
         }
 
         discard_logo_check = self.env.context.get('discard_logo_check')
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+import base64
+import json
+import logging
+import threading
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+# number of times a job is started before it is considered as failed
+MAX_ATTEMPTS = 3
+
+# seconds after which a job being processed is considered as interrupted,
+# when the time of cron jobs is not limited
+PROCESSING_TIMEOUT = 3600
+
+# seconds given to the server to kill a cron worker over its time limit
+PROCESSING_MARGIN = 60
+
+
+class IrActionsReportJob(models.Model):
+    """ A report rendering queued by a user, and processed later on by a
+    cron worker instead of the HTTP worker that received the request.
+    """
+    _name = 'ir.actions.report.job'
+    _description = 'Report Rendering Job'
+    _order = 'id desc'
+
+    name = fields.Char(string='File Name', required=True)
+    report_id = fields.Many2one('ir.actions.report', string='Report', required=True, ondelete='cascade')
+    res_ids = fields.Char(string='Record Ids', help="Comma-separated ids of the records to print.")
+    data = fields.Text(help="JSON-encoded data given to the report.")
+    context = fields.Text(help="JSON-encoded context used to render the report.")
+    user_id = fields.Many2one('res.users', string='User', required=True, ondelete='cascade',
+                              default=lambda self: self.env.user)
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], required=True, default='queued', readonly=True)
+    attempts = fields.Integer(readonly=True, help="Number of times the rendering of the report was started.")
+    date_start = fields.Datetime(readonly=True)
+    attachment_id = fields.Many2one('ir.attachment', string='Result', readonly=True, ondelete='set null')
+    error = fields.Text(readonly=True)
+    date_done = fields.Datetime(readonly=True)
+
+    def unlink(self):
+        attachments = self.sudo().mapped('attachment_id')
+        res = super(IrActionsReportJob, self).unlink()
+        attachments.unlink()
+        return res
+
+    @api.model
+    def _process_queue(self, limit=None):
+        """ Render the queued jobs, one transaction per job. Jobs are locked
+        with ``SKIP LOCKED``, so that several cron workers may share the queue.
+
+        A job is marked as processing in its own transaction before being
+        rendered: a job whose rendering kills its worker is not picked again
+        by the next run, and is requeued later by :meth:`_requeue_jobs`.
+
+        :param limit: maximum number of jobs to process, all of them if None
+        """
+        auto_commit = not getattr(threading.currentThread(), 'testing', False)
+        self._requeue_jobs()
+        if auto_commit:
+            self._cr.commit()
+        processed = 0
+        while limit is None or processed < limit:
+            self._cr.execute("""
+                SELECT id FROM ir_actions_report_job
+                WHERE state = 'queued'
+                ORDER BY id
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            """)
+            row = self._cr.fetchone()
+            if not row:
+                break
+            job = self.browse(row[0])
+            job.write({
+                'state': 'processing',
+                'attempts': job.attempts + 1,
+                'date_start': fields.Datetime.now(),
+            })
+            if auto_commit:
+                self._cr.commit()
+            job._process()
+            processed += 1
+            if auto_commit:
+                self._cr.commit()
+        return processed
+
+    def _process(self):
+        self.ensure_one()
+        res_ids = [int(x) for x in self.res_ids.split(',')] if self.res_ids else []
+        data = json.loads(self.data) if self.data else None
+        context = json.loads(self.context) if self.context else {}
+        report = self.report_id.with_user(self.user_id).with_context(context)
+        try:
+            with self._cr.savepoint():
+                content, extension = report.render(res_ids, data=data)
+        except Exception as e:
+            _logger.exception("Failed to render the queued report %s (job %d)", report.report_name, self.id)
+            self.write({
+                'state': 'failed',
+                'error': str(e),
+                'date_done': fields.Datetime.now(),
+            })
+        else:
+            attachment = self.env['ir.attachment'].sudo().create({
+                'name': "%s.%s" % (self.name, extension),
+                'datas': base64.b64encode(content),
+                'res_model': self._name,
+                'res_id': self.id,
+            })
+            self.write({
+                'state': 'done',
+                'attachment_id': attachment.id,
+                'date_done': fields.Datetime.now(),
+            })
+        self._notify_user()
+
+    def _notify_user(self):
+        """ Hook called once the job is done or failed, to let the user know. """
+        pass
+
+    @api.model
+    def _processing_timeout(self):
+        """ Return the number of seconds after which a job being processed is
+        considered as interrupted. Jobs are processed by cron workers, which
+        are killed once over their time limit: a job older than that limit is
+        no longer being rendered, and may be requeued safely.
+        """
+        timeout = config['limit_time_real_cron']
+        if timeout is None or timeout < 0:
+            timeout = config['limit_time_real']
+        if not timeout or timeout <= 0:
+            return PROCESSING_TIMEOUT
+        return timeout + PROCESSING_MARGIN
+
+    @api.model
+    def _requeue_jobs(self):
+        """ Requeue the jobs whose processing was interrupted, which happens
+        when rendering them killed their worker. The jobs that were started
+        ``MAX_ATTEMPTS`` times are failed instead.
+        """
+        limit_date = fields.Datetime.now() - timedelta(seconds=self._processing_timeout())
+        jobs = self.sudo().search([('state', '=', 'processing'), ('date_start', '<', limit_date)])
+        failed = jobs.filtered(lambda job: job.attempts >= MAX_ATTEMPTS)
+        if failed:
+            _logger.warning("Queued reports failed after %d attempts: %s", MAX_ATTEMPTS, failed.ids)
+            failed.write({
+                'state': 'failed',
+                'error': "The report could not be generated after %d attempts." % MAX_ATTEMPTS,
+                'date_done': fields.Datetime.now(),
+            })
+            failed._notify_user()
+        (jobs - failed).write({'state': 'queued'})
+
+    @api.model
+    def _gc_jobs(self, days=1):
+        """ Delete the jobs (and their result) processed more than ``days``
+        ago, and requeue the interrupted ones.
+        """
+        self._requeue_jobs()
+        limit_date = fields.Datetime.now() - timedelta(days=days)
+        jobs = self.sudo().search([('state', 'in', ('done', 'failed')), ('date_done', '<', limit_date)])
+        jobs.unlink()
+        _logger.info("GC'd %d report jobs", len(jobs))
+
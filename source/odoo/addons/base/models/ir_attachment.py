@@ -17,6 +17,9 @@ from odoo.tools.mimetypes import guess_mimetype
 
 _logger = logging.getLogger(__name__)
 
+# bytes written in the image cache of each database since its last gc
+_image_cache_written = defaultdict(int)
+
 
 class IrAttachment(models.Model):
     """Attachments are used to link binary files or url to any openerp document.
@@ -191,6 +194,74 @@ class IrAttachment(models.Model):
         cr.commit()
         _logger.info("filestore gc %d checked, %d removed", len(checklist), removed)
 
+    @api.model
+    def _image_cache_path(self, key):
+        return self._full_path('image_cache/%s/%s' % (key[:2], key))
+
+    @api.model
+    def _image_cache_get(self, key):
+        """ Return the cached image variant ``key``, or ``None``. """
+        full_path = self._image_cache_path(key)
+        try:
+            with open(full_path, 'rb') as fp:
+                content = fp.read()
+            # the modification time tracks the last use of the file
+            os.utime(full_path)
+        except (IOError, OSError):
+            return None
+        return content
+
+    @api.model
+    def _image_cache_set(self, key, content):
+        """ Store the image variant ``key`` in the cache of the filestore. """
+        max_size = config['image_cache_size']
+        if not max_size or len(content) > max_size // 10:
+            return
+        full_path = self._image_cache_path(key)
+        try:
+            dirname = os.path.dirname(full_path)
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname, exist_ok=True)
+            # write atomically, concurrent requests may store the same variant
+            tmp_path = '%s.%s' % (full_path, uuid.uuid4().hex)
+            with open(tmp_path, 'wb') as fp:
+                fp.write(content)
+            os.replace(tmp_path, full_path)
+        except (IOError, OSError):
+            _logger.info("_image_cache_set writing %s", full_path, exc_info=True)
+            return
+
+        written = _image_cache_written[self._cr.dbname] = _image_cache_written[self._cr.dbname] + len(content)
+        if written > max_size // 10:
+            self._image_cache_gc()
+
+    @api.model
+    def _image_cache_gc(self):
+        """ Remove the least recently used image variants until the cache
+        uses at most 80% of its maximum size.
+        """
+        _image_cache_written[self._cr.dbname] = 0
+        files = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self._full_path('image_cache')):
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                with tools.ignore(OSError):
+                    stat = os.stat(full_path)
+                    files.append((stat.st_mtime, stat.st_size, full_path))
+                    total += stat.st_size
+
+        max_size = int(config['image_cache_size'] * 0.8)
+        removed = 0
+        for _mtime, size, full_path in sorted(files):
+            if total <= max_size:
+                break
+            with tools.ignore(OSError):
+                os.unlink(full_path)
+                removed += 1
+            total -= size
+        _logger.debug("image cache gc %d checked, %d removed", len(files), removed)
+
     @api.depends('store_fname', 'db_datas')
     def _compute_datas(self):
         bin_size = self._context.get('bin_size')
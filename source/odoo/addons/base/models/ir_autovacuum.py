@@ -42,6 +42,9 @@ class AutoVacuum(models.AbstractModel):
         if not self.env.is_admin():
             raise AccessDenied()
         self.env['ir.attachment']._file_gc()
+        self.env['ir.attachment']._image_cache_gc()
+        self.env['ir.qweb']._compiled_code_gc()
+        self.env['ir.actions.report.job']._gc_jobs()
         self._gc_transient_models()
         self._gc_user_logs()
         return True
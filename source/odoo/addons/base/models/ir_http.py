@@ -16,6 +16,8 @@ import werkzeug.exceptions
 import werkzeug.routing
 import werkzeug.urls
 import werkzeug.utils
+import werkzeug.wrappers
+import werkzeug.wsgi
 
 import odoo
 from odoo import api, http, models, tools, SUPERUSER_ID
@@ -282,6 +284,56 @@ class IrHttp(models.AbstractModel):
             cls._routing_map = {}
             _logger.debug("Clear routing map")
 
+    @api.model
+    def _warmup_contexts(self):
+        """ Return the users and contexts of the anonymous requests whose
+        caches are filled by :meth:`_warmup_caches`, as a list of pairs
+        ``(user id, context)``.
+        """
+        public_user = self.env.ref('base.public_user')
+        return [(public_user.id, {'lang': code}) for code, _ in self.env['res.lang'].get_installed()]
+
+    @api.model
+    def _warmup_caches(self, templates=()):
+        """ Fill the caches used by most requests. This is done by the prefork
+        server before spawning its workers, which then share those caches
+        with it instead of computing them each on their own. The caches are
+        filled by the same calls as requests, in the environments given by
+        :meth:`_warmup_contexts`, in order to fill the same cache keys.
+
+        :param templates: xml ids of the qweb templates to compile
+        """
+        model_names = [
+            model_name
+            for model_name, model in self.env.items()
+            if not (model._abstract or model._transient)
+        ]
+        xmlids = []
+        for xmlid in templates:
+            if self.env.ref(xmlid, raise_if_not_found=False):
+                xmlids.append(xmlid)
+            else:
+                _logger.warning("Cannot warm up template %s: not found", xmlid)
+
+        for uid, context in self._warmup_contexts():
+            # access rights and record rules
+            env = self.env(user=uid, su=False, context=context)
+            for model_name in model_names:
+                try:
+                    with tools.mute_logger('odoo.addons.base.models.ir_model'):
+                        env[model_name].check_access_rights('read')
+                except AccessError:
+                    pass
+                env['ir.rule']._compute_domain(model_name, 'read')
+
+            # templates are compiled with the context of the rendering as
+            # options, by view id when rendered, and by xmlid when called
+            qweb = self.env(context=context)['ir.qweb']
+            for xmlid in xmlids:
+                view_id = qweb.env['ir.ui.view'].get_view_id(xmlid)
+                for template in (view_id, xmlid):
+                    qweb.compile(template, dict(qweb.env.context))
+
     #------------------------------------------------------
     # Binary server
     #------------------------------------------------------
@@ -378,7 +430,22 @@ class IrHttp(models.AbstractModel):
         if not content:
             content = record[field] or ''
 
-        # filename
+        if not mimetype:
+            try:
+                decoded_content = base64.b64decode(content)
+            except base64.binascii.Error:  # if we could not decode it, no need to pass it down: it would crash elsewhere...
+                return (404, [], None)
+            mimetype = guess_mimetype(decoded_content, default=default_mimetype)
+
+        filename = self._binary_filename(record, field, filename, filename_field, mimetype)
+
+        if not filehash:
+            filehash = '"%s"' % hashlib.md5(pycompat.to_text(content).encode('utf-8')).hexdigest()
+
+        status = 200 if content else 404
+        return status, content, filename, mimetype, filehash
+
+    def _binary_filename(self, record, field, filename, filename_field, mimetype):
         default_filename = False
         if not filename:
             if filename_field in record:
@@ -387,25 +454,32 @@ class IrHttp(models.AbstractModel):
                 default_filename = True
                 filename = "%s-%s-%s" % (record._name, record.id, field)
 
-        if not mimetype:
-            try:
-                decoded_content = base64.b64decode(content)
-            except base64.binascii.Error:  # if we could not decode it, no need to pass it down: it would crash elsewhere...
-                return (404, [], None)
-            mimetype = guess_mimetype(decoded_content, default=default_mimetype)
-
         # extension
         _, existing_extension = os.path.splitext(filename)
         if not existing_extension or default_filename:
             extension = mimetypes.guess_extension(mimetype)
             if extension:
                 filename = "%s%s" % (filename, extension)
+        return filename
 
-        if not filehash:
-            filehash = '"%s"' % hashlib.md5(pycompat.to_text(content).encode('utf-8')).hexdigest()
-
-        status = 200 if content else 404
-        return status, content, filename, mimetype, filehash
+    def _binary_record_attachment(self, record, field='datas'):
+        """ Return the attachment whose file in the filestore holds the
+        content of ``field`` on ``record``, if any.
+        """
+        Attachment = self.env['ir.attachment'].sudo()
+        if record._name == 'ir.attachment':
+            attachment = record if field == 'datas' else Attachment
+        else:
+            field_def = record._fields[field]
+            if not (field_def.type == 'binary' and field_def.attachment):
+                return Attachment
+            attachment = Attachment.search([
+                ('res_model', '=', record._name), ('res_id', '=', record.id), ('res_field', '=', field),
+            ], limit=1)
+        if attachment.type != 'binary' or not attachment.store_fname \
+                or not os.path.isfile(attachment._full_path(attachment.store_fname)):
+            return Attachment
+        return attachment
 
     def _binary_set_headers(self, status, content, filename, mimetype, unique, filehash=None, download=False):
         headers = [('Content-Type', mimetype), ('X-Content-Type-Options', 'nosniff')]
@@ -452,6 +526,16 @@ class IrHttp(models.AbstractModel):
         if not record:
             return (status or 404, [], None)
 
+        return self._binary_content(
+            record, field=field, unique=unique, filename=filename,
+            filename_field=filename_field, download=download, default_mimetype=default_mimetype)
+
+    def _binary_content(self, record, field='datas', unique=False, filename=None,
+                        filename_field='name', download=False,
+                        default_mimetype='application/octet-stream'):
+        """ Same as ``binary_content``, for a record whose access has been
+        checked by ``_get_record_and_check``.
+        """
         content, headers, status = None, [], None
 
         if record._name == 'ir.attachment':
@@ -466,6 +550,70 @@ class IrHttp(models.AbstractModel):
 
         return status, headers, content
 
+    def binary_file(self, xmlid=None, model='ir.attachment', id=None, field='datas',
+                    unique=False, filename=None, filename_field='name', download=False,
+                    mimetype=None, default_mimetype='application/octet-stream',
+                    access_token=None):
+        """ Get file, attachment or downloadable content, as the attachment
+        holding it in the filestore when possible
+
+        Same as ``binary_content``, but when the content is stored in the
+        filestore, the attachment holding it is returned instead of its
+        base64-encoded value, in order to serve it directly from the disk (see
+        ``_binary_file_response``). Otherwise, the content is returned as by
+        ``binary_content``, without checking the access to the record again.
+
+        :param str mimetype: mimetype of the content if the attachment has none
+        :returns: (status, headers, content, attachment), where the content is
+                  ``None`` when the attachment is not empty
+        """
+        record, status = self._get_record_and_check(xmlid=xmlid, model=model, id=id, field=field, access_token=access_token)
+
+        if not record:
+            return (status or 404, [], None, self.env['ir.attachment'])
+
+        attachment = self._binary_record_attachment(record, field=field)
+        if not attachment:
+            status, headers, content = self._binary_content(
+                record, field=field, unique=unique, filename=filename,
+                filename_field=filename_field, download=download, default_mimetype=default_mimetype)
+            return status, headers, content, attachment
+
+        mimetype = attachment.mimetype or mimetype \
+            or mimetypes.guess_type(filename or attachment.name or '')[0] or default_mimetype
+        filename = self._binary_filename(record, field, filename, filename_field, mimetype)
+        status, headers, _content = self._binary_set_headers(
+            200, None, filename, mimetype, unique, filehash=attachment.checksum, download=download)
+
+        return status, headers, None, attachment
+
+    def _binary_file_response(self, status, headers, attachment):
+        """ Return a response streaming the file of ``attachment`` without
+        loading it in memory. Depending on the ``x_sendfile`` option, the file
+        is sent by the reverse proxy with the X-Sendfile or X-Accel-Redirect
+        header instead. Range requests are supported.
+        """
+        if status != 200:
+            return self._response_by_status(status, headers, None)
+
+        full_path = attachment._full_path(attachment.store_fname)
+        mode = odoo.tools.config['x_sendfile']
+        if mode == 'x-sendfile':
+            headers.append(('X-Sendfile', full_path))
+            return werkzeug.wrappers.Response(headers=headers)
+        if mode == 'x-accel':
+            # the internal location /web/filestore/ must be an alias of the
+            # filestore directory, e.g. in nginx:
+            #   location /web/filestore { internal; alias /path/to/data_dir/filestore; }
+            headers.append(('X-Accel-Redirect', '/web/filestore/%s/%s' % (self._cr.dbname, attachment.store_fname)))
+            return werkzeug.wrappers.Response(headers=headers)
+
+        size = os.path.getsize(full_path)
+        headers.append(('Content-Length', size))
+        data = werkzeug.wsgi.wrap_file(request.httprequest.environ, open(full_path, 'rb'))
+        response = werkzeug.wrappers.Response(data, headers=headers, direct_passthrough=True)
+        return response.make_conditional(request.httprequest, accept_ranges=True, complete_length=size)
+
     def _response_by_status(self, status, headers, content):
         if status == 304:
             return werkzeug.wrappers.Response(status=status, headers=headers)
@@ -2,8 +2,15 @@
 from __future__ import print_function
 import ast
 import copy
+import hashlib
 import json
 import logging
+import marshal
+import os
+import re
+import shutil
+import sys
+import uuid
 from collections import OrderedDict
 from time import time
 
@@ -22,6 +29,9 @@ from odoo.addons.base.models.assetsbundle import AssetsBundle
 
 _logger = logging.getLogger(__name__)
 
+# number of versions of the compiled code cache kept by the autovacuum
+QWEB_CACHE_VERSIONS = 4
+
 
 class IrQWeb(models.AbstractModel, QWeb):
     """ Base QWeb rendering engine
@@ -95,6 +105,11 @@ class IrQWeb(models.AbstractModel, QWeb):
         default.update(request=request, cache_assets=round(time()/180), true=True, false=False) # true and false added for backward compatibility to remove after v10
         return default
 
+    @classmethod
+    def clear_caches(cls):
+        """ Clear the caches of compiled templates and asset bundles only. """
+        cls.pool._clear_cache('templates')
+
     # assume cache will be invalidated by third party on write to ir.ui.view
     def _get_template_cache_keys(self):
         """ Return the list of context keys to use for caching ``_get_template``. """
@@ -103,7 +118,7 @@ class IrQWeb(models.AbstractModel, QWeb):
     # apply ormcache_context decorator unless in dev mode...
     @tools.conditional(
         'xml' not in tools.config['dev_mode'],
-        tools.ormcache('id_or_xml_id', 'tuple(options.get(k) for k in self._get_template_cache_keys())'),
+        tools.ormcache('id_or_xml_id', 'tuple(options.get(k) for k in self._get_template_cache_keys())', cache='templates'),
     )
     def compile(self, id_or_xml_id, options):
         try:
@@ -112,6 +127,83 @@ class IrQWeb(models.AbstractModel, QWeb):
             pass
         return super(IrQWeb, self).compile(id_or_xml_id, options=options)
 
+    # the code of compiled templates is kept on disk, so that new processes
+    # don't need to compile them again
+    def _compiled_code_path(self, template, options):
+        """ Return the path of the file caching the code of ``template``
+        compiled with ``options``, or ``None`` if it must not be cached.
+        """
+        if not isinstance(template, (int, str)) or 'load' in options or 'profile' in options \
+                or 'xml' in tools.config['dev_mode']:
+            return None
+        pool = self.pool
+        # the cached code must match the templates of the current transaction,
+        # which may not be the case after they are modified and until the other
+        # processes are notified of their modification
+        if pool.in_test_mode() or 'templates' in pool.cache_invalidated:
+            return None
+
+        # the version changes with the templates, the installed modules and the
+        # code that generates the templates
+        version = [str(pool.registry_sequence), str(pool.cache_sequences.get('templates')), sys.implementation.cache_tag]
+        for cls in type(self).__mro__:
+            filename = getattr(sys.modules.get(cls.__module__), '__file__', None)
+            if filename:
+                stat = os.stat(filename)
+                version.append('%s:%s:%s' % (filename, stat.st_mtime, stat.st_size))
+        version = hashlib.sha1(':'.join(version).encode()).hexdigest()
+
+        key = repr((template, tuple(options.get(k) for k in self._get_template_cache_keys())))
+        key = hashlib.sha1(key.encode()).hexdigest()
+        filestore = self.env['ir.attachment']._full_path('qweb_cache')
+        return os.path.join(filestore, version, key)
+
+    def _load_compiled_code(self, template, options):
+        path = self._compiled_code_path(template, options)
+        if not path:
+            return None
+        try:
+            with open(path, 'rb') as fp:
+                return marshal.load(fp)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            _logger.warning("Could not load the compiled template %s from %s", template, path, exc_info=True)
+            return None
+
+    def _save_compiled_code(self, template, options, compiled):
+        path = self._compiled_code_path(template, options)
+        if not path:
+            return
+        try:
+            # obsolete versions are removed by _compiled_code_gc(), as other
+            # processes may still use them
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # write atomically, concurrent workers may compile the same template
+            tmp_path = '%s.%s' % (path, uuid.uuid4().hex)
+            with open(tmp_path, 'wb') as fp:
+                marshal.dump(compiled, fp)
+            os.replace(tmp_path, path)
+        except (ValueError, OSError):
+            _logger.info("Could not save the compiled template %s in %s", template, path, exc_info=True)
+
+    @api.model
+    def _compiled_code_gc(self, keep=QWEB_CACHE_VERSIONS):
+        """ Remove the versions of the compiled code cache, except the
+        ``keep`` most recently modified ones.
+        """
+        filestore = self.env['ir.attachment']._full_path('qweb_cache')
+        versions = []
+        with tools.ignore(OSError):
+            for name in os.listdir(filestore):
+                path = os.path.join(filestore, name)
+                with tools.ignore(OSError):
+                    versions.append((os.stat(path).st_mtime, path))
+        versions.sort(reverse=True)
+        for _mtime, path in versions[keep:]:
+            shutil.rmtree(path, ignore_errors=True)
+        _logger.debug("qweb cache gc %d checked, %d removed", len(versions), len(versions[keep:]))
+
     def load(self, name, options):
         lang = options.get('lang', get_lang(self.env).code)
         env = self.env
@@ -290,7 +382,7 @@ class IrQWeb(models.AbstractModel, QWeb):
         # in non-xml-debug mode we want assets to be cached forever, and the admin can force a cache clear
         # by restarting the server after updating the source code (or using the "Clear server cache" in debug tools)
         'xml' not in tools.config['dev_mode'],
-        tools.ormcache_context('xmlid', 'options.get("lang", "en_US")', 'css', 'js', 'debug', 'async_load', 'defer_load', 'lazy_load', keys=("website_id",)),
+        tools.ormcache_context('xmlid', 'options.get("lang", "en_US")', 'css', 'js', 'debug', 'async_load', 'defer_load', 'lazy_load', keys=("website_id",), cache='templates'),
     )
     def _get_asset_nodes(self, xmlid, options, css=True, js=True, debug=False, async_load=False, defer_load=False, lazy_load=False, values=None):
         files, remains = self._get_asset_content(xmlid, options)
@@ -302,7 +394,7 @@ class IrQWeb(models.AbstractModel, QWeb):
         asset_nodes = self._get_asset_nodes(xmlid, options, js=False)
         return [node[1]['href'] for node in asset_nodes if node[0] == 'link']
 
-    @tools.ormcache_context('xmlid', 'options.get("lang", "en_US")', keys=("website_id",))
+    @tools.ormcache_context('xmlid', 'options.get("lang", "en_US")', keys=("website_id",), cache='templates')
     def _get_asset_content(self, xmlid, options):
         options = dict(options,
             inherit_branding=False, inherit_branding_auto=False,
@@ -359,6 +451,55 @@ class IrQWeb(models.AbstractModel, QWeb):
 
         return (files, remains)
 
+    def _get_asset_bundle_xmlids(self):
+        """ Return the xmlids of the asset bundles called by the templates. """
+        self.env.cr.execute("""
+            SELECT arch_db FROM ir_ui_view
+            WHERE type = 'qweb' AND active AND arch_db LIKE '%%t-call-assets=%%'
+        """)
+        xmlids = set()
+        for arch, in self.env.cr.fetchall():
+            xmlids.update(re.findall(r'''t-call-assets=["']([\w.]+)["']''', arch))
+        return sorted(xmlids)
+
+    def _get_asset_build_contexts(self):
+        """ Return the contexts in which the asset bundles are prebuilt: the
+        language only matters for its direction, so one language is enough per
+        direction.
+        """
+        langs = {}
+        for lang in self.env['res.lang'].search([], order='id'):
+            langs.setdefault(lang.direction, lang.code)
+        return [{'lang': code} for code in langs.values()]
+
+    def _prebuild_asset_bundles(self):
+        """ Build and store the css and js of every asset bundle, so that no
+        request has to wait for it after an install or an update. The
+        stylesheets of all the bundles are compiled concurrently.
+        """
+        t0 = time()
+        bundles = []
+        for context in self._get_asset_build_contexts():
+            IrQweb = self.with_context(**context)
+            for xmlid in self._get_asset_bundle_xmlids():
+                try:
+                    files, _remains = IrQweb._get_asset_content(xmlid, dict(context))
+                except Exception:
+                    _logger.warning("Could not prebuild the asset bundle %s", xmlid, exc_info=True)
+                    continue
+                bundles.append(IrQweb.get_asset_bundle(xmlid, files, env=IrQweb.env))
+
+        AssetsBundle.precompile_css([
+            bundle for bundle in bundles
+            if bundle.stylesheets and not bundle.get_attachments('css')
+        ])
+        for bundle in bundles:
+            if bundle.stylesheets:
+                bundle.css()
+            if bundle.javascripts:
+                bundle.js()
+        _logger.info("%d asset bundles prebuilt in %.2fs", len(bundles), time() - t0)
+
     def _get_field(self, record, field_name, expression, tagName, field_options, options, values):
         field = record._fields[field_name]
 
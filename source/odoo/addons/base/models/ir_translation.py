@@ -1,19 +1,29 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 import hashlib
+import io
 import itertools
 import json
 import logging
+import multiprocessing
 import operator
+import os
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from difflib import get_close_matches
 
-from odoo import api, fields, models, tools, SUPERUSER_ID, _
+import psycopg2
+
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import AccessError, UserError, ValidationError
 from odoo.modules import get_module_path, get_module_resource
 
 _logger = logging.getLogger(__name__)
 
+# minimum number of PO files to load for parsing them in a pool of processes,
+# which must import the translation module before parsing anything
+PO_PARALLEL_MIN_FILES = 8
+
 TRANSLATION_TYPE = [
     ('model', 'Model Field'),
     ('model_terms', 'Structured Model Field'),
@@ -21,6 +31,13 @@ TRANSLATION_TYPE = [
 ]
 
 
+def _copy_value(value):
+    """ Format ``value`` for the text format of ``COPY``. """
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
 class IrTranslationImport(object):
     """ Temporary cursor for optimizing mass insert into model 'ir.translation'.
 
@@ -36,6 +53,7 @@ class IrTranslationImport(object):
         :param model: the model to insert the data into (as a recordset)
         """
         self._cr = model._cr
+        self._pool = model.pool
         self._model_table = model._table
         self._overwrite = model._context.get('overwrite', False)
         self._debug = False
@@ -63,12 +81,21 @@ class IrTranslationImport(object):
         """ Transfer the data from the temp table to ir.translation """
         cr = self._cr
 
-        # Step 0: insert rows in batch
-        query = """ INSERT INTO %s (name, lang, res_id, src, type, imd_model,
-                                    module, imd_name, value, state, comments)
-                    VALUES """ % self._table
-        for rows in cr.split_for_in_conditions(self._rows):
-            cr.execute(query + ", ".join(["%s"] * len(rows)), rows)
+        # Step 0: copy rows in batch
+        columns = ['name', 'lang', 'res_id', 'src', 'type', 'imd_model',
+                   'module', 'imd_name', 'value', 'state', 'comments']
+        data = io.StringIO(''.join(
+            '\t'.join(_copy_value(value) for value in row) + '\n'
+            for row in self._rows
+        ))
+        # disable eventual async callback / support for the extent of
+        # the COPY FROM, as these are apparently incompatible
+        callback = psycopg2.extensions.get_wait_callback()
+        psycopg2.extensions.set_wait_callback(None)
+        try:
+            cr.copy_from(data, table=self._table, columns=columns)
+        finally:
+            psycopg2.extensions.set_wait_callback(callback)
 
         _logger.debug("ir.translation.cursor: We have %d entries to process", len(self._rows))
 
@@ -92,14 +119,6 @@ class IrTranslationImport(object):
         # referencing non-existent data.
         cr.execute("DELETE FROM %s WHERE res_id IS NULL AND module IS NOT NULL" % self._table)
 
-        # detect the xml_translate fields, where the src must be the same
-        env = api.Environment(cr, SUPERUSER_ID, {})
-        src_relevant_fields = []
-        for model in env:
-            for field_name, field in env[model]._fields.items():
-                if hasattr(field, 'translate') and callable(field.translate):
-                    src_relevant_fields.append("%s,%s" % (model, field_name))
-
         count = 0
         # Step 2: insert new or upsert non-noupdate translations
         if self._overwrite:
@@ -152,6 +171,9 @@ class IrTranslationImport(object):
         # Step 3: cleanup
         cr.execute("DROP TABLE %s" % self._table)
         self._rows.clear()
+
+        # the catalogs of the imported languages are outdated
+        self._pool._clear_cache('translations')
         return True
 
 
@@ -320,7 +342,7 @@ class IrTranslation(models.Model):
 
         return (query, params)
 
-    @tools.ormcache('name', 'types', 'lang', 'source', 'res_id')
+    @tools.ormcache('name', 'types', 'lang', 'source', 'res_id', cache='translations')
     def __get_source(self, name, types, lang, source, res_id):
         # res_id is a tuple or None, otherwise ormcache cannot cache it!
         query, params = self._get_source_query(name, types, lang, source, res_id)
@@ -352,6 +374,9 @@ class IrTranslation(models.Model):
             return tools.ustr(source or '')
         if isinstance(types, str):
             types = (types,)
+        if types == ('code',) and source and not name and not res_id:
+            source = tools.ustr(source)
+            return self._get_code_catalog(lang).get(source) or source
         if res_id:
             if isinstance(res_id, int):
                 res_id = (res_id,)
@@ -359,6 +384,32 @@ class IrTranslation(models.Model):
                 res_id = tuple(res_id)
         return self.__get_source(name, types, lang, source, res_id)
 
+    @api.model
+    @tools.ormcache('lang', cache='translations')
+    def _get_code_catalog(self, lang):
+        """ Return the translations of type 'code' in ``lang``, as a dict
+        mapping the source terms to their translation. The catalog is loaded at
+        once and shared by all the lookups of code terms in the language, which
+        would otherwise be cached one by one.
+        """
+        self._cr.execute(""" SELECT src, value FROM ir_translation
+                            WHERE lang=%s AND type='code' AND value != '' """, (lang,))
+        return dict(self._cr.fetchall())
+
+    @api.model
+    @tools.ormcache('lang', cache='translations')
+    def _get_web_catalog(self, lang):
+        """ Return the translations of the web client in ``lang``, as a dict
+        mapping each module to a tuple of ``{'id': source, 'string': value}``.
+        """
+        self._cr.execute(""" SELECT module, src, value FROM ir_translation
+                            WHERE lang=%s AND comments LIKE %s AND value != ''
+                            ORDER BY module, id """, (lang, '%openerp-web%'))
+        return {
+            module: tuple({'id': src, 'string': value} for _module, src, value in rows)
+            for module, rows in itertools.groupby(self._cr.fetchall(), key=operator.itemgetter(0))
+        }
+
     @api.model
     def _get_terms_query(self, field, records):
         """ Utility function that makes the query for field terms. """
@@ -796,52 +847,94 @@ class IrTranslation(models.Model):
         return IrTranslationImport(self)
 
     def _load_module_terms(self, modules, langs):
-        """ Load PO files of the given modules for the given languages. """
+        """ Load PO files of the given modules for the given languages. When
+        there are enough files, they are parsed concurrently in a pool of
+        processes, while the terms of the previous modules are loaded.
+        """
         # make sure the given languages are active
         res_lang = self.env['res.lang'].sudo()
         for lang in langs:
             res_lang.load_lang(lang)
-        # load i18n files
-        for module_name in modules:
-            modpath = get_module_path(module_name)
-            if not modpath:
-                continue
-            for lang in langs:
-                context = dict(self._context)
-                lang_code = tools.get_iso_codes(lang)
-                base_lang_code = None
-                if '_' in lang_code:
-                    base_lang_code = lang_code.split('_')[0]
-
-                # Step 1: for sub-languages, load base language first (e.g. es_CL.po is loaded over es.po)
-                if base_lang_code:
-                    base_trans_file = get_module_resource(module_name, 'i18n', base_lang_code + '.po')
-                    if base_trans_file:
-                        _logger.info('module %s: loading base translation file %s for language %s', module_name, base_lang_code, lang)
-                        tools.trans_load(self._cr, base_trans_file, lang, verbose=False, module_name=module_name, context=context)
-                        context['overwrite'] = True  # make sure the requested translation will override the base terms later
-
-                    # i18n_extra folder is for additional translations handle manually (eg: for l10n_be)
-                    base_trans_extra_file = get_module_resource(module_name, 'i18n_extra', base_lang_code + '.po')
-                    if base_trans_extra_file:
-                        _logger.info('module %s: loading extra base translation file %s for language %s', module_name, base_lang_code, lang)
-                        tools.trans_load(self._cr, base_trans_extra_file, lang, verbose=False, module_name=module_name, context=context)
-                        context['overwrite'] = True  # make sure the requested translation will override the base terms later
-
-                # Step 2: then load the main translation file, possibly overriding the terms coming from the base language
-                trans_file = get_module_resource(module_name, 'i18n', lang_code + '.po')
-                if trans_file:
-                    _logger.info('module %s: loading translation file (%s) for language %s', module_name, lang_code, lang)
-                    tools.trans_load(self._cr, trans_file, lang, verbose=False, module_name=module_name, context=context)
-                elif lang_code != 'en_US':
-                    _logger.info('module %s: no translation for language %s', module_name, lang_code)
-
-                trans_extra_file = get_module_resource(module_name, 'i18n_extra', lang_code + '.po')
-                if trans_extra_file:
-                    _logger.info('module %s: loading extra translation file (%s) for language %s', module_name, lang_code, lang)
-                    tools.trans_load(self._cr, trans_extra_file, lang, verbose=False, module_name=module_name, context=context)
+
+        module_files = [
+            (module_name, self._get_module_terms_files(module_name, langs))
+            for module_name in modules
+            if get_module_path(module_name)
+        ]
+        filenames = list(tools.unique(
+            filename
+            for _module_name, files in module_files
+            for _lang, filename, _base in files
+        ))
+
+        executor = None
+        futures = {}
+        processes = min(len(filenames), os.cpu_count() or 1)
+        if processes > 1 and len(filenames) >= PO_PARALLEL_MIN_FILES:
+            # the server may run other threads, which may hold locks (like the
+            # logging lock) while forking; the processes must be started anew
+            start_methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in start_methods else 'spawn')
+            executor = ProcessPoolExecutor(processes, mp_context=context)
+            futures = {filename: executor.submit(tools.trans_read_file, filename) for filename in filenames}
+        try:
+            for module_name, files in module_files:
+                entries = {}
+                for _lang, filename, _base in files:
+                    if filename not in entries:
+                        future = futures.pop(filename, None)
+                        try:
+                            entries[filename] = future.result() if future else tools.trans_read_file(filename)
+                        except IOError:
+                            _logger.error("couldn't read translation file %s", filename)
+                            entries[filename] = None
+
+                contexts = {lang: dict(self._context) for lang in langs}
+                for lang, filename, base in files:
+                    if entries[filename] is not None:
+                        _logger.info('module %s: loading translation file %s for language %s', module_name, filename, lang)
+                        tools.trans_load_rows(self._cr, entries[filename], lang, verbose=False,
+                                              module_name=module_name, context=contexts[lang])
+                    if base:
+                        # make sure the requested translation will override the base terms later
+                        contexts[lang]['overwrite'] = True
+        finally:
+            if executor is not None:
+                executor.shutdown()
         return True
 
+    def _get_module_terms_files(self, module_name, langs):
+        """ Return the PO files to load for the given module and languages, in
+        order, as a list of triples ``(lang, filename, base)`` where ``base``
+        tells whether the next files of the language override its terms.
+        """
+        files = []
+        for lang in langs:
+            lang_code = tools.get_iso_codes(lang)
+            base_lang_code = None
+            if '_' in lang_code:
+                base_lang_code = lang_code.split('_')[0]
+
+            # Step 1: for sub-languages, load base language first (e.g. es_CL.po is loaded over es.po)
+            # i18n_extra folder is for additional translations handle manually (eg: for l10n_be)
+            if base_lang_code:
+                for folder in ('i18n', 'i18n_extra'):
+                    base_trans_file = get_module_resource(module_name, folder, base_lang_code + '.po')
+                    if base_trans_file:
+                        files.append((lang, base_trans_file, True))
+
+            # Step 2: then load the main translation file, possibly overriding the terms coming from the base language
+            trans_file = get_module_resource(module_name, 'i18n', lang_code + '.po')
+            if trans_file:
+                files.append((lang, trans_file, False))
+            elif lang_code != 'en_US':
+                _logger.info('module %s: no translation for language %s', module_name, lang_code)
+
+            trans_extra_file = get_module_resource(module_name, 'i18n_extra', lang_code + '.po')
+            if trans_extra_file:
+                files.append((lang, trans_extra_file, False))
+        return files
+
     @api.model
     def get_technical_translations(self, model_name):
         """ Find the translations for the fields of `model_name`
@@ -896,23 +989,17 @@ class IrTranslation(models.Model):
 
         # Regional languages (ll_CC) must inherit/override their parent lang (ll), but this is
         # done server-side when the language is loaded, so we only need to load the user's lang.
-        translations_per_module = {}
-        messages = self.env['ir.translation'].sudo().search_read([
-            ('module', 'in', mods), ('lang', '=', lang),
-            ('comments', 'like', 'openerp-web'), ('value', '!=', False),
-            ('value', '!=', '')],
-            ['module', 'src', 'value', 'lang'], order='module')
-        for mod, msg_group in itertools.groupby(messages, key=operator.itemgetter('module')):
-            translations_per_module.setdefault(mod, {'messages': []})
-            translations_per_module[mod]['messages'].extend({
-                'id': m['src'],
-                'string': m['value']}
-                for m in msg_group)
+        catalog = self._get_web_catalog(lang)
+        translations_per_module = {
+            mod: {'messages': list(catalog[mod])}
+            for mod in mods
+            if mod in catalog
+        }
 
         return translations_per_module, lang_params
 
     @api.model
-    @tools.ormcache('frozenset(mods)', 'lang')
+    @tools.ormcache('frozenset(mods)', 'lang', cache='translations')
     def get_web_translations_hash(self, mods, lang):
         translations, lang_params = self.get_translations_for_webclient(mods, lang)
         translation_cache = {
@@ -25,6 +25,13 @@ class IrUiMenu(models.Model):
         super(IrUiMenu, self).__init__(*args, **kwargs)
         self.pool['ir.model.access'].register_cache_clearing_method(self._name, 'clear_caches')
 
+    @classmethod
+    def clear_caches(cls):
+        """ Clear the caches of menus; they do not involve templates, so the
+        'templates' cache is kept as is.
+        """
+        cls.pool._clear_cache('default')
+
     name = fields.Char(string='Menu', required=True, translate=True)
     active = fields.Boolean(default=True)
     sequence = fields.Integer(default=10)
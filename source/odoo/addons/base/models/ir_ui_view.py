@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 import collections
+import copy
 import datetime
 import fnmatch
 import json
@@ -30,6 +31,7 @@ from odoo.tools.safe_eval import safe_eval
 from odoo.tools.view_validation import valid_view, get_attrs_field_names, field_is_editable
 from odoo.tools.translate import xml_translate, TRANSLATED_ATTRS
 from odoo.tools.image import image_data_uri
+from odoo.tools.lru import LRU
 
 _logger = logging.getLogger(__name__)
 
@@ -39,6 +41,9 @@ MOVABLE_BRANDING = ['data-oe-model', 'data-oe-id', 'data-oe-field', 'data-oe-xpa
 # Note: natural _order has `name`, but only because that makes list browsing easier
 INHERIT_ORDER = 'priority,id'
 
+# parsed inheritance specs of views, per database
+_specs_trees = {}
+
 
 def transfer_field_to_modifiers(field, modifiers):
     default_values = {}
@@ -509,6 +514,7 @@ actual arch.
         # if in uninstall mode and has children views, emulate an ondelete cascade
         if self.env.context.get('_force_unlink', False) and self.inherit_children_ids:
             self.inherit_children_ids.unlink()
+        self.clear_caches()
         return super(View, self).unlink()
 
     @api.returns('self', lambda value: value.id)
@@ -565,7 +571,7 @@ actual arch.
     @api.model
     def _get_inheriting_views_arch_domain(self, view_id, model):
         return [
-            ['inherit_id', '=', view_id],
+            ['inherit_id', 'in' if isinstance(view_id, list) else '=', view_id],
             ['model', '=', model],
             ['mode', '=', 'extension'],
             ['active', '=', True],
@@ -580,7 +586,8 @@ actual arch.
            is already loaded. Custom views defined directly in the database are loaded only
            after the module initialization phase is completely finished.
 
-           :param int view_id: id of the view whose inheriting views should be retrieved
+           :param view_id: id of the view whose inheriting views should be retrieved,
+                           or list of ids to retrieve the inheriting views of several views
            :param str model: model identifier of the inheriting views.
            :rtype: list of tuples
            :return: [(view_arch,view_id), ...]
@@ -593,6 +600,24 @@ actual arch.
                 for view in views.sudo()
                 if not view.groups_id or (view.groups_id & user_groups)]
 
+    @api.model
+    def _get_inheritance_tree_ids(self, view_id, model):
+        """ Return the ids of the extension views of ``model`` that inherit
+        directly or indirectly from the given view, with a single query.
+        """
+        self.flush(['inherit_id', 'model', 'mode'])
+        self._cr.execute("""
+            WITH RECURSIVE tree(id) AS (
+                SELECT id FROM ir_ui_view
+                WHERE inherit_id = %(view_id)s AND model = %(model)s AND mode = 'extension'
+              UNION
+                SELECT view.id FROM ir_ui_view view JOIN tree ON view.inherit_id = tree.id
+                WHERE view.model = %(model)s AND view.mode = 'extension'
+            )
+            SELECT id FROM tree
+        """, {'view_id': view_id, 'model': model})
+        return [row[0] for row in self._cr.fetchall()]
+
     @api.model
     def raise_view_error(self, message, view_id):
         view = self.browse(view_id)
@@ -686,15 +711,37 @@ actual arch.
         """
         if root_id is None:
             root_id = source_id
-        sql_inherit = self.get_inheriting_views_arch(source_id, model)
-        for (specs, view_id) in sql_inherit:
-            specs_tree = etree.fromstring(specs.encode('utf-8'))
+
+        # retrieve the inheriting views of the whole inheritance tree at once,
+        # and group them by parent view
+        parent_ids = [source_id] + self._get_inheritance_tree_ids(source_id, model)
+        children = collections.defaultdict(list)
+        for specs, view_id in self.get_inheriting_views_arch(parent_ids, model):
+            children[self.browse(view_id).inherit_id.id].append((specs, view_id))
+
+        return self._apply_view_inheritance(source, source_id, children, root_id)
+
+    def _apply_view_inheritance(self, source, source_id, children, root_id):
+        for (specs, view_id) in children.get(source_id, ()):
+            specs_tree = self._parse_specs(specs, view_id)
             if self._context.get('inherit_branding'):
                 self.inherit_branding(specs_tree, view_id, root_id)
             source = self.apply_inheritance_specs(source, specs_tree, view_id)
-            source = self.apply_view_inheritance(source, view_id, model, root_id=root_id)
+            source = self._apply_view_inheritance(source, view_id, children, root_id)
         return source
 
+    def _parse_specs(self, specs, view_id):
+        """ Return a new tree of the inheritance specs ``specs`` of the given
+        view. The trees are parsed once, then copied, as applying them modifies
+        them.
+        """
+        cache = _specs_trees.setdefault(self._cr.dbname, LRU(2048))
+        try:
+            specs_tree = cache[view_id, specs]
+        except KeyError:
+            specs_tree = cache[view_id, specs] = etree.fromstring(specs.encode('utf-8'))
+        return copy.deepcopy(specs_tree)
+
     def read_combined(self, fields=None):
         """
         Utility function to get a view combined with its inherited views.
@@ -725,7 +772,36 @@ actual arch.
 
         # read the view arch
         [view_data] = root.read(fields=fields)
-        view_arch = etree.fromstring(view_data['arch'].encode('utf-8'))
+
+        # the combined arch does not depend on check_view_ids outside of the
+        # module initialization
+        if self.pool._init:
+            arch = self._combine_arch(root.id, self.model, view_data['arch'])
+        else:
+            arch = self._get_combined_arch(root.id, self.model)
+
+        return dict(view_data, arch=arch)
+
+    @api.model
+    @tools.conditional(
+        'xml' not in config['dev_mode'],
+        tools.ormcache('frozenset(self.env.user.groups_id.ids)', 'root_id', 'model',
+                       'tuple(self._context.get(k) for k in self._read_template_keys())',
+                       cache='templates'),
+    )
+    def _get_combined_arch(self, root_id, model):
+        """ Return the arch of the primary view ``root_id`` combined with its
+        inheriting views of ``model``, memoized per group set and context.
+        """
+        return self._combine_arch(root_id, model, self.browse(root_id).arch)
+
+    @api.model
+    def _combine_arch(self, root_id, model, arch):
+        """ Apply the inheriting views of ``model`` on the arch of the primary
+        view ``root_id``, which inherits itself from its parent view.
+        """
+        root = self.browse(root_id)
+        view_arch = etree.fromstring(arch.encode('utf-8'))
         if not root.inherit_id:
             if self._context.get('inherit_branding'):
                 view_arch.attrib.update({
@@ -737,14 +813,14 @@ actual arch.
         else:
             if self._context.get('inherit_branding'):
                 self.inherit_branding(view_arch, root.id, root.id)
-            parent_view = root.inherit_id.read_combined(fields=fields)
+            parent_view = root.inherit_id.read_combined(fields=['arch'])
             arch_tree = etree.fromstring(parent_view['arch'])
             arch_tree = self.apply_inheritance_specs(arch_tree, view_arch, parent_view['id'])
 
         # and apply inheritance
-        arch = self.apply_view_inheritance(arch_tree, root.id, self.model)
+        arch_tree = self.apply_view_inheritance(arch_tree, root.id, model)
 
-        return dict(view_data, arch=etree.tostring(arch, encoding='unicode'))
+        return etree.tostring(arch_tree, encoding='unicode')
 
     def _apply_group(self, model, node, modifiers, fields):
         """Apply group restrictions,  may be set at view level or model level::
@@ -1057,7 +1133,8 @@ actual arch.
     @tools.conditional(
         'xml' not in config['dev_mode'],
         tools.ormcache('frozenset(self.env.user.groups_id.ids)', 'view_id',
-                       'tuple(self._context.get(k) for k in self._read_template_keys())'),
+                       'tuple(self._context.get(k) for k in self._read_template_keys())',
+                       cache='templates'),
     )
     def _read_template(self, view_id):
         arch = self.browse(view_id).read_combined(['arch'])['arch']
@@ -1086,6 +1163,13 @@ actual arch.
         view = self.search([('key', '=', template)], limit=1)
         return view and view.id or self.env['ir.model.data'].xmlid_to_res_id(template, raise_if_not_found=True)
 
+    @classmethod
+    def clear_caches(cls):
+        """ Clear the caches of views and templates only; they are stored in
+        the 'templates' cache, which does not hold anything else.
+        """
+        cls.pool._clear_cache('templates')
+
     def clear_cache(self):
         """ Deprecated, use `clear_caches` instead. """
         if 'xml' not in config['dev_mode']:
@@ -1180,7 +1264,7 @@ actual arch.
         # Deprecated: templates are translated once read from database
         return arch
 
-    @tools.ormcache('self.id')
+    @tools.ormcache('self.id', cache='templates')
     def get_view_xmlid(self):
         domain = [('model', '=', 'ir.ui.view'), ('res_id', '=', self.id)]
         xmlid = self.env['ir.model.data'].sudo().search_read(domain, ['module', 'name'])[0]
@@ -274,6 +274,49 @@ class QWeb(object):
         _options = dict(options)
         options = frozendict(options)
 
+        cached = self._load_compiled_code(template, options)
+        if cached:
+            code, def_name, name = cached
+        else:
+            code, def_name, name = self._compile_code(template, options, _options)
+            self._save_compiled_code(template, options, (code, def_name, name))
+
+        try:
+            # noinspection PyBroadException
+            ns = {}
+            unsafe_eval(code, ns)
+            compiled = ns[def_name]
+        except QWebException as e:
+            raise e
+        except Exception as e:
+            raise QWebException("Error when compiling AST", e, None, None, name)
+
+        # return the wrapped function
+
+        def _compiled_fn(self, append, values):
+            log = {'last_path_node': None}
+            new = self.default_values()
+            new.update(values)
+            wrap_values(new)
+            try:
+                return compiled(self, append, new, options, log)
+            except (QWebException, TransactionRollbackError) as e:
+                raise e
+            except Exception as e:
+                path = log['last_path_node']
+                element, document = self.get_template(template, options)
+                node = element.getroottree().xpath(path) if ':' not in path else None
+                raise QWebException("Error to render compiling AST", e, path, node and etree.tostring(node[0], encoding='unicode'), name)
+
+        return _compiled_fn
+
+    def _compile_code(self, template, options, _options):
+        """ Generate the code of the given template, and return it as a triple
+        ``(code, def_name, name)``, where ``code`` is the code object defining
+        the rendering function ``def_name``, and ``name`` is the name of the
+        template. ``options`` is the frozen dict of compile options, and
+        ``_options`` the mutable one used during the generation.
+        """
         element, document = self.get_template(template, options)
         name = element.get('t-name', 'unknown')
 
@@ -311,9 +354,7 @@ class QWeb(object):
 
         try:
             # noinspection PyBroadException
-            ns = {}
-            unsafe_eval(compile(astmod, '<template>', 'exec'), ns)
-            compiled = ns[def_name]
+            code = compile(astmod, '<template>', 'exec')
         except QWebException as e:
             raise e
         except Exception as e:
@@ -322,24 +363,17 @@ class QWeb(object):
             node = element.getroottree().xpath(path)
             raise QWebException("Error when compiling AST", e, path, node and etree.tostring(node[0], encoding='unicode'), name)
 
-        # return the wrapped function
+        return code, def_name, name
 
-        def _compiled_fn(self, append, values):
-            log = {'last_path_node': None}
-            new = self.default_values()
-            new.update(values)
-            wrap_values(new)
-            try:
-                return compiled(self, append, new, options, log)
-            except (QWebException, TransactionRollbackError) as e:
-                raise e
-            except Exception as e:
-                path = log['last_path_node']
-                element, document = self.get_template(template, options)
-                node = element.getroottree().xpath(path) if ':' not in path else None
-                raise QWebException("Error to render compiling AST", e, path, node and etree.tostring(node[0], encoding='unicode'), name)
+    def _load_compiled_code(self, template, options):
+        """ Return a triple ``(code, def_name, name)`` previously saved by
+        ``_save_compiled_code`` for the given template and options, or ``None``.
+        """
+        return None
 
-        return _compiled_fn
+    def _save_compiled_code(self, template, options, compiled):
+        """ Hook to persist the result of ``_compile_code``. """
+        pass
 
     def default_values(self):
         """ Return attributes added to the values for each computed template. """
@@ -1,13 +1,18 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
+import logging
+import time
+
 import psycopg2
 
 from odoo.models import BaseModel
-from odoo.tests.common import TransactionCase
+from odoo.tests.common import TransactionCase, tagged
 from odoo.tools import mute_logger
 from odoo.osv import expression
 
+_logger = logging.getLogger(__name__)
+
 
 class TestExpression(TransactionCase):
     def _search(self, obj, domain, init_domain=[]):
@@ -795,6 +800,196 @@ class TestExpression(TransactionCase):
         countries = countries.browse(reversed(countries._ids))
         self.assertEqual(countries.filtered_domain(domain)._ids, countries._ids)
 
+    def test_expression_cache(self):
+        """ Domains with the same shape are parsed once, unless their parsing
+            depends on their values. """
+        self.registry._expression_cache.clear()
+        parsed = []
+        parse = expression.expression.parse
+
+        def mock_parse(expr):
+            parsed.append(expr.root_model._name)
+            return parse(expr)
+
+        self.patch(expression.expression, 'parse', mock_parse)
+        Users = self.env['res.users']
+
+        e1 = expression.expression([('name', '=', 'foo'), ('login', 'in', ['a', 'b'])], Users)
+        e2 = expression.expression([('name', '=', 'bar'), ('login', 'in', ['c', 'd'])], Users)
+        self.assertEqual(parsed.count('res.users'), 1)
+        self.assertEqual(e1.get_tables(), e2.get_tables())
+        self.assertEqual(e1.to_sql()[0], e2.to_sql()[0])
+        self.assertEqual(e1.to_sql()[1], ['foo', 'a', 'b'])
+        self.assertEqual(e2.to_sql()[1], ['bar', 'c', 'd'])
+
+        # different values may lead to a different parsing
+        expression.expression([('name', '=', False), ('login', 'in', ['a', 'b'])], Users)
+        expression.expression([('name', '=', 'foo'), ('login', 'in', [])], Users)
+        self.assertEqual(parsed.count('res.users'), 3)
+
+        # the parsing of many2one terms with names depends on the names
+        expression.expression([('parent_id', '=', 'foo')], Users)
+        expression.expression([('parent_id', '=', 'bar')], Users)
+        self.assertEqual(parsed.count('res.users'), 5)
+        expression.expression([('parent_id', '=', 1)], Users)
+        expression.expression([('parent_id', '=', 2)], Users)
+        self.assertEqual(parsed.count('res.users'), 6)
+
+        # the results are correct with a cached parsing
+        Partner = self.env['res.partner']
+        p1 = Partner.create({'name': 'test_expression_cache_1', 'ref': 'A'})
+        p2 = Partner.create({'name': 'test_expression_cache_2', 'ref': 'B'})
+        self.assertEqual(self._search(Partner, [('name', '=', p1.name), ('ref', '=', 'A')]), p1)
+        self.assertEqual(self._search(Partner, [('name', '=', p2.name), ('ref', '=', 'B')]), p2)
+        self.assertEqual(self._search(Partner, [('name', '=', p2.name), ('ref', '=', 'A')]), Partner)
+
+    def test_x2many_exists(self):
+        """ Conditions on x2many fields are expressed with EXISTS subqueries. """
+        Partner = self.env['res.partner']
+        e = expression.expression([('category_id', 'in', [1, 2])], Partner)
+        self.assertEqual(e.to_sql(), (
+            '(EXISTS (SELECT 1 FROM "res_partner_res_partner_category_rel" as "res_partner__category_id"'
+            ' WHERE "res_partner__category_id"."partner_id" = "res_partner"."id"'
+            ' AND "res_partner__category_id"."category_id" IN %s))',
+            [(1, 2)],
+        ))
+
+        e = expression.expression([('category_id', '=', False)], Partner)
+        self.assertEqual(e.to_sql(), (
+            '(NOT EXISTS (SELECT 1 FROM "res_partner_res_partner_category_rel" as "res_partner__category_id"'
+            ' WHERE "res_partner__category_id"."partner_id" = "res_partner"."id"))',
+            [],
+        ))
+
+        e = expression.expression([('child_ids', '!=', False)], Partner)
+        self.assertEqual(e.to_sql(), (
+            '(EXISTS (SELECT 1 FROM "res_partner" as "res_partner__child_ids"'
+            ' WHERE "res_partner__child_ids"."parent_id" = "res_partner"."id"))',
+            [],
+        ))
+
+        e = expression.expression([('child_ids', 'not in', [1, 2])], Partner)
+        self.assertEqual(e.to_sql(), (
+            '(NOT EXISTS (SELECT 1 FROM "res_partner" as "res_partner__child_ids"'
+            ' WHERE "res_partner__child_ids"."parent_id" = "res_partner"."id"'
+            ' AND "res_partner__child_ids"."id" IN %s))',
+            [(1, 2)],
+        ))
+
+        # check the results
+        parent = Partner.create({'name': 'test_x2many_exists'})
+        child = Partner.create({'name': 'test_x2many_exists_child', 'parent_id': parent.id})
+        partners = parent + child
+        self.assertEqual(self._search(partners, [('id', 'in', partners.ids), ('child_ids', 'in', child.ids)]), parent)
+        self.assertEqual(self._search(partners, [('id', 'in', partners.ids), ('child_ids', 'not in', child.ids)]), child)
+        self.assertEqual(self._search(partners, [('id', 'in', partners.ids), ('child_ids', '=', False)]), child)
+
+    def test_query_join_dedup(self):
+        """ Joins are added once to queries. """
+        Users = self.env['res.users']
+        query = Users._where_calc([('name', '=', 'foo'), ('email', '=', 'bar')], active_test=False)
+        self.assertEqual(Users._inherits_join_calc('res_users', 'name', query), '"res_users__partner_id"."name"')
+        self.assertEqual(query.tables, ['"res_partner" as "res_users__partner_id"', '"res_users"'])
+        self.assertEqual(query.get_sql(), (
+            '"res_partner" as "res_users__partner_id","res_users"',
+            '"res_users"."partner_id"="res_users__partner_id"."id"'
+            ' AND (("res_users__partner_id"."name" = %s) AND ("res_users__partner_id"."email" = %s))',
+            ['foo', 'bar'],
+        ))
+
+        # the join of a record rule is not repeated
+        user = Users.create({'name': 'test_query_join_dedup', 'login': 'test_query_join_dedup'})
+        self.env['ir.rule'].create({
+            'name': 'test_query_join_dedup',
+            'model_id': self.env['ir.model']._get('res.users').id,
+            'domain_force': "[('email', '!=', 'foo')]",
+        })
+        Users = Users.with_user(user)
+        query = Users._where_calc([('name', '=', 'foo')], active_test=False)
+        Users._apply_ir_rules(query)
+        self.assertEqual(query.where_clause.count('"res_users"."partner_id"="res_users__partner_id"."id"'), 1)
+        self.assertEqual(query.tables.count('"res_partner" as "res_users__partner_id"'), 1)
+
+
+@tagged('-standard', 'bench')
+class TestExpressionBenchmark(TransactionCase):
+    """ Micro-benchmarks of the conversion of domains to SQL, with and without
+        the cache of parsed domains; run with ``--test-tags bench``.
+    """
+
+    def _benchmark(self, label, model, make_domain, count=2000):
+        cache = self.registry._expression_cache
+        timings = []
+        for cached in (False, True):
+            cache.clear()
+            t0 = time.perf_counter()
+            for index in range(count):
+                if not cached:
+                    cache.clear()
+                expression.expression(make_domain(index), model).to_sql()
+            timings.append((time.perf_counter() - t0) / count * 1e6)
+        _logger.info("%s: %.1fus uncached, %.1fus cached", label, *timings)
+
+    def test_simple_term(self):
+        self._benchmark("simple term", self.env['res.partner'], lambda index: [
+            ('name', 'ilike', 'foo%d' % index),
+        ])
+
+    def test_record_rule(self):
+        self._benchmark("record rule", self.env['res.partner'], lambda index: [
+            '|', ('company_id', '=', False), ('company_id', 'in', [1, index + 1]),
+        ])
+
+    def test_inherited_fields(self):
+        self._benchmark("inherited fields", self.env['res.users'], lambda index: [
+            ('name', '=', 'foo%d' % index), ('email', '!=', False), ('share', '=', False),
+        ])
+
+    def test_name_search(self):
+        self._benchmark("name search", self.env['res.partner'], lambda index: [
+            '&', ('active', '=', True),
+            '|', '|', '|',
+            ('display_name', 'ilike', 'foo%d' % index),
+            ('ref', '=', 'foo%d' % index),
+            ('email', 'ilike', 'foo%d' % index),
+            ('vat', 'ilike', 'foo%d' % index),
+        ])
+
+    def test_x2many_search(self):
+        """ Search on x2many fields of a large table. """
+        categories = self.env['res.partner.category'].create([
+            {'name': 'bench %d' % index} for index in range(10)
+        ])
+        Partner = self.env['res.partner']
+        parents = Partner.create([
+            {'name': 'bench %d' % index, 'category_id': [(6, 0, categories[index % 10].ids)]}
+            for index in range(5000)
+        ])
+        Partner.create([
+            {'name': 'bench child %d' % index, 'parent_id': parents[index].id}
+            for index in range(0, 5000, 3)
+        ])
+        Partner.flush()
+        for domain in [
+            [('category_id', 'in', categories[:2].ids)],
+            [('category_id', 'not in', categories[:2].ids)],
+            [('category_id', '=', False)],
+            [('child_ids', '!=', False)],
+            [('child_ids.name', 'like', 'bench child 1')],
+        ]:
+            t0 = time.perf_counter()
+            Partner.search(domain)
+            _logger.info("search %s: %.1fms", domain, (time.perf_counter() - t0) * 1000)
+
+    def test_large_domain(self):
+        self._benchmark("large domain", self.env['res.partner'], lambda index: [
+            (fname, '!=', index)
+            for fname in ('id', 'color', 'parent_id', 'user_id', 'company_id', 'country_id', 'state_id')
+        ] + [
+            (fname, 'not ilike', 'foo%d' % index)
+            for fname in ('name', 'ref', 'email', 'phone', 'mobile', 'street', 'city', 'zip')
+        ])
+
 
 class TestAutoJoin(TransactionCase):
 
@@ -883,9 +1078,10 @@ class TestAutoJoin(TransactionCase):
         sql_query = self.query_list[1].get_sql()
         self.assertIn('res_partner', sql_query[0],
             "_auto_join off: ('bank_ids.sanitized_acc_number', 'like', '..') second query incorrect main table")
-        self.assertIn('"res_partner"."id" in (%s)', sql_query[1],
+        expected = '(EXISTS (SELECT 1 FROM "res_partner_bank" as "res_partner__bank_ids" WHERE "res_partner__bank_ids"."partner_id" = "res_partner"."id" AND "res_partner__bank_ids"."id" IN %s))'
+        self.assertIn(expected, sql_query[1],
             "_auto_join off: ('bank_ids.sanitized_acc_number', 'like', '..') second query incorrect where condition")
-        self.assertIn(p_aa.id, sql_query[2],
+        self.assertIn((b_aa.id,), sql_query[2],
             "_auto_join off: ('bank_ids.sanitized_acc_number', 'like', '..') second query incorrect parameter")
 
         # Do: cascaded one2many without _auto_join
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from odoo.http import PostgreSQLSessionStore
+from odoo.tests.common import BaseCase, get_db_name
+
+
+class TestPostgreSQLSessionStore(BaseCase):
+
+    def setUp(self):
+        super(TestPostgreSQLSessionStore, self).setUp()
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        self.store = PostgreSQLSessionStore(get_db_name(), path)
+        # another worker sharing the same table
+        self.other_store = PostgreSQLSessionStore(get_db_name(), path)
+        self.sids = []
+
+    def tearDown(self):
+        with self.store.cursor() as cr:
+            cr.execute("DELETE FROM http_session WHERE sid IN %s", [tuple(self.sids)])
+        super(TestPostgreSQLSessionStore, self).tearDown()
+
+    def new_session(self, **values):
+        session = self.store.new()
+        session.update(values)
+        self.sids.append(session.sid)
+        return session
+
+    def test_save_get_delete(self):
+        session = self.new_session(login='demo', context={'lang': 'en_US'})
+        self.store.save(session)
+
+        for store in (self.store, self.other_store):
+            read = store.get(session.sid)
+            self.assertEqual(dict(read), {'login': 'demo', 'context': {'lang': 'en_US'}})
+            self.assertFalse(read.new)
+
+        # modifying a session read from the cache does not modify the cache
+        read = self.other_store.get(session.sid)
+        read['context']['lang'] = 'fr_FR'
+        read['login'] = 'admin'
+        self.assertEqual(dict(self.other_store.get(session.sid)),
+                         {'login': 'demo', 'context': {'lang': 'en_US'}})
+
+        self.store.delete(session)
+        for store in (self.store, self.other_store):
+            self.assertEqual(dict(store.get(session.sid)), {})
+        self.assertNotIn(session.sid, self.other_store.cache)
+
+        # an invalid session id gives a new session
+        self.assertTrue(self.store.get('../invalid').new)
+
+    def test_cache(self):
+        session = self.new_session(login='demo')
+        self.store.save(session)
+        self.other_store.get(session.sid)
+        version = self.other_store.cache[session.sid][0]
+
+        # an unchanged session is not unpickled again
+        with patch('odoo.http.pickle.loads') as loads:
+            self.assertEqual(dict(self.other_store.get(session.sid)), {'login': 'demo'})
+            self.assertFalse(loads.called)
+
+        # a session saved by another worker is read again
+        session['login'] = 'admin'
+        self.store.save(session)
+        self.assertEqual(dict(self.other_store.get(session.sid)), {'login': 'admin'})
+        self.assertEqual(self.other_store.cache[session.sid][0], version + 1)
+
+    def test_gc(self):
+        old_session = self.new_session(login='demo')
+        self.store.save(old_session)
+        session = self.new_session(login='admin')
+        self.store.save(session)
+        with self.store.cursor() as cr:
+            cr.execute("""
+                UPDATE http_session SET write_date = write_date - interval '30 days'
+                WHERE sid = %s
+            """, [old_session.sid])
+
+        self.store.gc()
+        self.assertEqual(dict(self.other_store.get(old_session.sid)), {})
+        self.assertEqual(dict(self.other_store.get(session.sid)), {'login': 'admin'})
@@ -129,3 +129,34 @@ class test_ir_http_mimetype(common.TransactionCase):
         status = test_access(access_token=u'Secret')
         self.assertEqual(status, 404,
             "no access with access token for deleted attachment")
+
+
+class TestWarmupCaches(common.TransactionCase):
+
+    def test_warmup_caches(self):
+        view = self.env['ir.ui.view'].create({
+            'name': 'test_warmup_caches',
+            'type': 'qweb',
+            'key': 'base.test_warmup_caches',
+            'arch': '<t t-name="base.test_warmup_caches"><div t-esc="value"/></t>',
+        })
+        self.env['ir.model.data'].create({
+            'name': 'test_warmup_caches',
+            'module': 'base',
+            'model': 'ir.ui.view',
+            'res_id': view.id,
+        })
+        self.registry.clear_caches()
+        self.env['ir.http']._warmup_caches(['base.test_warmup_caches'])
+
+        # requests find the caches filled: no query needed anymore
+        public_env = self.env(user=self.env.ref('base.public_user').id, su=False,
+                              context={'lang': 'en_US', 'tz': 'Europe/Brussels'})
+        queries = self.cr.sql_log_count
+        public_env['res.partner'].check_access_rights('read')
+        public_env['ir.rule']._compute_domain('res.partner', 'read')
+        content = self.env['ir.qweb'].with_context(public_env.context).render(view.id, {'value': 42})
+        self.assertIn(b'42', content)
+        content = self.env['ir.qweb'].with_context(public_env.context).render('base.test_warmup_caches', {'value': 42})
+        self.assertIn(b'42', content)
+        self.assertEqual(self.cr.sql_log_count, queries)
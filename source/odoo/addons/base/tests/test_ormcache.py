@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
-from odoo.tests.common import TransactionCase
-from odoo.tools import get_cache_key_counter
+import os
+import select
+from unittest.mock import patch
+
+import odoo
+from odoo.modules.registry import SignalingListener, _cache_signaling_sequence
+from odoo.tests.common import BaseCase, TransactionCase
+from odoo.tools import config, get_cache_key_counter
+from odoo.tools.lru import SizedLRU
 
 
 class TestOrmcache(TransactionCase):
@@ -37,3 +44,135 @@ class TestOrmcache(TransactionCase):
         self.assertEqual(counter.hit, hit + 2)
         self.assertEqual(counter.miss, miss + 1)
         self.assertIn(key, cache)
+
+    def test_ormcache_regions(self):
+        """ Test that caches are invalidated independently of each other. """
+        IMD = self.env['ir.model.data']
+        View = self.env['ir.ui.view']
+        view = self.env.ref('base.view_partner_form')
+
+        # fill in both the 'default' and 'templates' caches
+        IMD.xmlid_lookup('base.group_no_one')
+        view.get_view_xmlid()
+        default_cache, default_key, _counter = get_cache_key_counter(IMD.xmlid_lookup, 'base.group_no_one')
+        templates_cache, templates_key, _counter = get_cache_key_counter(view.get_view_xmlid)
+        self.assertIsNot(default_cache, templates_cache)
+        self.assertIn(default_key, default_cache)
+        self.assertIn(templates_key, templates_cache)
+
+        # invalidating views keeps the default cache
+        View.clear_caches()
+        self.assertIn(default_key, default_cache)
+        self.assertNotIn(templates_key, templates_cache)
+        self.assertIn('templates', self.registry.cache_invalidated)
+
+        # invalidating a method keeps the templates cache
+        view.get_view_xmlid()
+        IMD.xmlid_lookup.clear_cache(IMD)
+        self.assertNotIn(default_key, default_cache)
+        self.assertIn(templates_key, templates_cache)
+
+        # invalidating a model clears all caches
+        IMD.xmlid_lookup('base.group_no_one')
+        IMD.clear_caches()
+        self.assertNotIn(default_key, default_cache)
+        self.assertNotIn(templates_key, templates_cache)
+
+
+@patch.dict(config.options, {'registry_listen': True})
+class TestSignalingListener(TransactionCase):
+    def test_notify(self):
+        """ Test that signaling changes notifies the listening processes. """
+        with odoo.sql_db.db_connect('postgres').cursor() as cr:
+            cr.execute("LISTEN odoo_signaling")
+            cr.commit()
+            conn = cr._cnx
+            try:
+                self.registry.cache_invalidated = {'templates'}
+                self.registry.signal_changes()
+                select.select([conn], [], [], 5)
+                conn.poll()
+                payloads = [notify.payload for notify in conn.notifies]
+            finally:
+                cr.execute("UNLISTEN odoo_signaling")
+                cr.commit()
+        self.assertEqual(payloads, [self.registry.db_name])
+
+    def test_notified(self):
+        """ Test that the signaled caches are only cleared once notified. """
+        listener = SignalingListener()
+        listener.pid = os.getpid()
+        listener.connected = True
+        self.patch(SignalingListener, '_instance', listener)
+
+        IMD = self.env['ir.model.data']
+        view = self.env.ref('base.view_partner_form')
+        self.registry.check_signaling()
+
+        # fill in both the 'default' and 'templates' caches
+        IMD.xmlid_lookup('base.group_no_one')
+        view.get_view_xmlid()
+        default_cache, default_key, _counter = get_cache_key_counter(IMD.xmlid_lookup, 'base.group_no_one')
+        templates_cache, templates_key, _counter = get_cache_key_counter(view.get_view_xmlid)
+
+        # another process invalidates the 'templates' cache
+        self.cr.execute("SELECT nextval(%s)", [_cache_signaling_sequence('templates')])
+
+        # not notified yet: the sequences are not read
+        self.assertIs(self.registry.check_signaling(), self.registry)
+        self.assertIn(templates_key, templates_cache)
+
+        # once notified, only the signaled cache is cleared
+        listener.notified(self.registry.db_name)
+        self.assertIs(self.registry.check_signaling(), self.registry)
+        self.assertIn(default_key, default_cache)
+        self.assertNotIn(templates_key, templates_cache)
+
+        # notifications from other databases are ignored
+        view.get_view_xmlid()
+        self.cr.execute("SELECT nextval(%s)", [_cache_signaling_sequence('templates')])
+        listener.notified('%s_other' % self.registry.db_name)
+        self.registry.check_signaling()
+        self.assertIn(templates_key, templates_cache)
+
+
+class TestSizedLRU(BaseCase):
+    def test_size(self):
+        """ Test that the cache is bounded by the size of its values. """
+        evicted = []
+        cache = SizedLRU(10000, on_evict=evicted.append)
+        cache['a'] = 'x' * 4000
+        cache['b'] = 'x' * 4000
+        self.assertEqual(len(cache), 2)
+        self.assertGreater(cache.size, 8000)
+        self.assertEqual(cache.size, cache.sizeof('a') + cache.sizeof('b'))
+
+        # make 'a' the most recently used entry, then evict 'b'
+        self.assertEqual(cache['a'], 'x' * 4000)
+        cache['c'] = 'x' * 4000
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(evicted, ['b'])
+
+        # a value larger than the cache is not stored
+        cache['d'] = 'x' * 20000
+        self.assertNotIn('d', cache)
+        self.assertEqual(len(cache), 2)
+
+        # replacing a value updates the size
+        cache['a'] = 'x'
+        self.assertLess(cache.size, 8000)
+        del cache['a']
+        self.assertEqual(cache.size, cache.sizeof('c'))
+        cache.clear()
+        self.assertEqual(cache.size, 0)
+        self.assertEqual(cache.get('c'), None)
+
+    def test_nested_size(self):
+        """ Test that the size of containers includes their items. """
+        cache = SizedLRU(100000)
+        cache['list'] = ['x' * 1000 for _index in range(10)]
+        self.assertGreater(cache.sizeof('list'), 10000)
+        cache['dict'] = {'key': {'nested': 'x' * 1000}}
+        self.assertGreater(cache.sizeof('dict'), 1000)
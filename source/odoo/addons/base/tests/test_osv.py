@@ -43,3 +43,51 @@ class QueryTestCase(BaseCase):
         query = Query()
         query.tables.append('"product_product"')
         self.assertRaises(AssertionError, query.add_join, ("product_template", "product_category", "categ_id", "id", "categ_id"), implicit=False, outer=False)
+
+    def test_implicit_join_dedup(self):
+        query = Query(['"res_users"'])
+        join = ("res_users", "res_partner", "partner_id", "id", "partner_id")
+        self.assertEqual(query.add_join(join), ("res_users__partner_id", '"res_partner" as "res_users__partner_id"'))
+        self.assertEqual(query.add_join(join), ("res_users__partner_id", '"res_partner" as "res_users__partner_id"'))
+        self.assertEqual(query.tables, ['"res_users"', '"res_partner" as "res_users__partner_id"'])
+        self.assertEqual(query.where_clause, ['("res_users"."partner_id" = "res_users__partner_id"."id")'])
+
+    def test_add_where(self):
+        query = Query(['"res_users"'])
+        query.add_where('"res_users"."partner_id" = "res_partner"."id"')
+        query.add_where('"res_users"."login" = %s', ['admin'])
+        query.add_where('"res_users"."partner_id" = "res_partner"."id"')
+        query.add_where('"res_users"."login" = %s', ['demo'])
+        query.add_tables(['"res_partner"', '"res_users"'])
+        self.assertEqual(query.get_sql(), (
+            '"res_users","res_partner"',
+            '"res_users"."partner_id" = "res_partner"."id" AND "res_users"."login" = %s AND "res_users"."login" = %s',
+            ['admin', 'demo'],
+        ))
+
+    def test_add_where_join_format(self):
+        query = Query(['"res_users"'])
+        query.add_join(("res_users", "res_partner", "partner_id", "id", "partner_id"))
+        # the same join condition, as written by domains
+        query.add_where('"res_users"."partner_id"="res_users__partner_id"."id"')
+        query.add_where('"res_users__partner_id"."id" = "res_users"."partner_id"')
+        self.assertEqual(query.where_clause, ['("res_users"."partner_id" = "res_users__partner_id"."id")'])
+
+    def test_select(self):
+        query = Query(['"res_users"'])
+        query.add_where('"res_users"."active" = %s', [True])
+        query.add_join(("res_users", "res_partner", "partner_id", "id", "partner_id"), implicit=False, outer=True)
+        self.assertEqual(
+            query.select('"res_users".id', order_by='"res_users__partner_id"."name"', limit=10, offset=20),
+            ('SELECT "res_users".id FROM "res_users" LEFT JOIN "res_partner" as "res_users__partner_id"'
+             ' ON ("res_users"."partner_id" = "res_users__partner_id"."id")'
+             ' WHERE "res_users"."active" = %s ORDER BY "res_users__partner_id"."name" LIMIT 10 OFFSET 20',
+             [True]),
+        )
+        self.assertEqual(
+            query.select('count(1)', '"res_users"."company_id"', group_by='"res_users"."company_id"'),
+            ('SELECT count(1), "res_users"."company_id" FROM "res_users" LEFT JOIN "res_partner" as "res_users__partner_id"'
+             ' ON ("res_users"."partner_id" = "res_users__partner_id"."id")'
+             ' WHERE "res_users"."active" = %s GROUP BY "res_users"."company_id"',
+             [True]),
+        )
@@ -5,6 +5,9 @@ import collections
 import json
 import os.path
 import re
+import shutil
+import time
+from unittest.mock import patch
 
 from lxml import etree, html
 from lxml.builder import E
@@ -12,7 +15,7 @@ from lxml.builder import E
 from odoo.modules import get_module_resource
 from odoo.tests.common import TransactionCase
 from odoo.addons.base.models.qweb import QWebException
-from odoo.tools import misc, ustr
+from odoo.tools import frozendict, misc, ustr
 
 
 class TestQWebTField(TransactionCase):
@@ -734,3 +737,57 @@ def load_tests(loader, suite, _):
     # instance
     suite.addTests(TestQWeb.get_cases())
     return suite
+
+
+class TestCompiledCodeCache(TransactionCase):
+    def test_compiled_code_cache(self):
+        """ The code of compiled templates is saved on disk for other processes. """
+        qweb = self.env['ir.qweb']
+        options = {'lang': 'en_US'}
+        # ignore the invalidations made by previous tests in this transaction
+        with patch.object(type(self.registry), 'cache_invalidated', set()):
+            path = qweb._compiled_code_path('base.contact_name', options)
+            self.assertTrue(path)
+            code, def_name, name = qweb._compile_code('base.contact_name', frozendict(options), dict(options))
+            qweb._save_compiled_code('base.contact_name', options, (code, def_name, name))
+            self.assertTrue(os.path.isfile(path))
+            self.assertEqual(qweb._load_compiled_code('base.contact_name', options), (code, def_name, name))
+
+            # the options used as cache keys give other files
+            other_options = {'lang': 'en_US', 'inherit_branding': True}
+            self.assertNotEqual(qweb._compiled_code_path('base.contact_name', other_options), path)
+            self.assertIsNone(qweb._load_compiled_code('base.contact_name', other_options))
+
+            # the code of another version of the templates is ignored
+            with patch.dict(self.registry.cache_sequences, templates=-1):
+                self.assertIsNone(qweb._load_compiled_code('base.contact_name', options))
+
+            # compiled code is not cached with a custom loader
+            self.assertIsNone(qweb._compiled_code_path('base.contact_name', dict(options, load=lambda *args: None)))
+
+        # nor after the templates have been modified in the current transaction
+        with patch.object(type(self.registry), 'cache_invalidated', {'templates'}):
+            self.assertIsNone(qweb._compiled_code_path('base.contact_name', options))
+
+    def test_compiled_code_gc(self):
+        """ Only the most recent versions of the compiled code are kept. """
+        qweb = self.env['ir.qweb']
+        filestore = self.env['ir.attachment']._full_path('qweb_cache')
+        paths = [os.path.join(filestore, 'test_version_%d' % index) for index in range(4)]
+        for index, path in enumerate(paths):
+            os.makedirs(path, exist_ok=True)
+            self.addCleanup(shutil.rmtree, path, True)
+            mtime = time.time() + 100 + index
+            os.utime(path, (mtime, mtime))
+
+        # saving code does not remove the other versions
+        options = {'lang': 'en_US'}
+        with patch.object(type(self.registry), 'cache_invalidated', set()):
+            code, def_name, name = qweb._compile_code('base.contact_name', frozendict(options), dict(options))
+            qweb._save_compiled_code('base.contact_name', options, (code, def_name, name))
+            current = os.path.dirname(qweb._compiled_code_path('base.contact_name', options))
+        self.assertTrue(all(os.path.isdir(path) for path in paths))
+
+        qweb._compiled_code_gc(keep=2)
+        self.assertEqual([os.path.isdir(path) for path in paths], [False, False, True, True])
+        self.assertFalse(os.path.isdir(current))
@@ -1,9 +1,21 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
+import base64
+import io
+import json
 import logging
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from PyPDF2 import PdfFileReader
 
 import odoo
 import odoo.tests
+from odoo.tools import mute_logger
 
 
 _logger = logging.getLogger(__name__)
@@ -31,3 +43,162 @@ class TestReports(odoo.tests.TransactionCase):
                 report.render_qweb_html(report_records.ids)
             else:
                 continue
+
+
+# Stub of wkhtmltopdf, writing one page per body and logging the indexes of its bodies
+WKHTMLTOPDF_STUB = """#!%s
+import json, os, sys
+from reportlab.pdfgen import canvas
+bodies = [arg for arg in sys.argv[1:-1] if os.path.basename(arg).startswith('report.body.tmp.')]
+with open(os.environ['WKHTMLTOPDF_STUB_LOG'], 'a') as log:
+    log.write(json.dumps([int(os.path.basename(body).split('.')[3]) for body in bodies]) + '\\n')
+pdf = canvas.Canvas(sys.argv[-1])
+for body in bodies:
+    pdf.drawString(100, 750, os.path.basename(body))
+    pdf.showPage()
+pdf.save()
+""" % sys.executable
+
+
+class TestReportsParallel(odoo.tests.TransactionCase):
+    def setUp(self):
+        super(TestReportsParallel, self).setUp()
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        stub = os.path.join(tmpdir, 'wkhtmltopdf')
+        with open(stub, 'w') as f:
+            f.write(WKHTMLTOPDF_STUB)
+        os.chmod(stub, 0o755)
+        self.log = os.path.join(tmpdir, 'wkhtmltopdf.log')
+
+        for patcher in [
+            patch('odoo.addons.base.models.ir_actions_report._get_wkhtmltopdf_bin', return_value=stub),
+            patch.dict(os.environ, WKHTMLTOPDF_STUB_LOG=self.log),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.report = self.env.ref('base.report_ir_model_overview')
+        self.bodies = [b'<html><body>%d</body></html>' % i for i in range(7)]
+
+    def get_calls(self):
+        """ Return the indexes of the bodies given to each wkhtmltopdf call. """
+        with open(self.log) as f:
+            return sorted(json.loads(line) for line in f)
+
+    def test_single_process(self):
+        pdf_content = self.report._run_wkhtmltopdf(self.bodies, header=b'<html/>', footer=b'<html/>')
+        self.assertEqual(PdfFileReader(io.BytesIO(pdf_content)).numPages, 7)
+        self.assertEqual(self.get_calls(), [[0, 1, 2, 3, 4, 5, 6]])
+
+    def test_parallel_processes(self):
+        parts = self.report._run_wkhtmltopdf_parts(
+            self.bodies, header=b'<html/>', footer=b'<html/>', processes=3)
+
+        # the bodies keep their index, which selects their header and footer
+        self.assertEqual([indexes for _content, indexes in parts], [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(self.get_calls(), [[0, 1, 2], [3, 4, 5], [6]])
+        for content, indexes in parts:
+            self.assertEqual(PdfFileReader(io.BytesIO(content)).numPages, len(indexes))
+
+        # the parts are concatenated in order
+        reader = PdfFileReader(io.BytesIO(self.report._merge_pdfs([io.BytesIO(content) for content, _indexes in parts])))
+        self.assertEqual(reader.numPages, 7)
+        for i in range(7):
+            self.assertIn('report.body.tmp.%d.' % i, reader.getPage(i).extractText())
+
+    def test_no_bodies(self):
+        parts = self.report._run_wkhtmltopdf_parts([], header=b'<html/>', footer=b'<html/>', processes=3)
+        self.assertEqual([indexes for _content, indexes in parts], [[]])
+        self.assertEqual(self.get_calls(), [[]])
+
+
+class TestReportsBackground(odoo.tests.TransactionCase):
+    def setUp(self):
+        super(TestReportsBackground, self).setUp()
+        self.env['ir.ui.view'].create({
+            'name': 'test_report_background',
+            'type': 'qweb',
+            'key': 'base.test_report_background',
+            'arch': '<t t-name="base.test_report_background"><t t-foreach="docs" t-as="doc">[<t t-esc="doc.name"/>]</t></t>',
+        })
+        self.report = self.env['ir.actions.report'].create({
+            'name': 'Partners',
+            'model': 'res.partner',
+            'report_type': 'qweb-text',
+            'report_name': 'base.test_report_background',
+            'background': True,
+        })
+        self.partners = self.env['res.partner'].create([{'name': 'Alpha'}, {'name': 'Beta'}])
+
+    def test_enqueue(self):
+        self.assertTrue(self.report.report_action(self.partners)['background'])
+
+        job = self.report._enqueue(self.partners.ids)
+        self.assertEqual(job.state, 'queued')
+        self.assertEqual(job.user_id, self.env.user)
+        self.assertFalse(job.attachment_id)
+
+        self.assertEqual(self.env['ir.actions.report.job']._process_queue(), 1)
+        self.assertEqual(job.state, 'done')
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(job.attachment_id.name, 'Partners.txt')
+        self.assertEqual(base64.b64decode(job.attachment_id.datas), b'[Alpha][Beta]')
+
+        # nothing left to do
+        self.assertEqual(self.env['ir.actions.report.job']._process_queue(), 0)
+
+    @mute_logger('odoo.addons.base.models.ir_actions_report_job')
+    def test_enqueue_failure(self):
+        self.report.report_name = 'base.test_report_background_missing'
+        job = self.report._enqueue(self.partners.ids)
+        self.env['ir.actions.report.job']._process_queue()
+        self.assertEqual(job.state, 'failed')
+        self.assertTrue(job.error)
+        self.assertFalse(job.attachment_id)
+
+    def test_enqueue_context(self):
+        """ Only the JSON values of the context are kept. """
+        job = self.report.with_context(lang='en_US', record=self.partners)._enqueue(self.partners.ids)
+        context = json.loads(job.context)
+        self.assertEqual(context.get('lang'), 'en_US')
+        self.assertNotIn('record', context)
+
+    @mute_logger('odoo.addons.base.models.ir_actions_report_job')
+    def test_requeue(self):
+        """ Jobs interrupted while processing are requeued, then failed. """
+        Job = self.env['ir.actions.report.job']
+        job = self.report._enqueue(self.partners.ids)
+        job.sudo().write({
+            'state': 'processing',
+            'attempts': 1,
+            'date_start': datetime.now() - timedelta(hours=2),
+        })
+        # an interrupted job is not picked again until it is requeued
+        self.assertEqual(Job._process_queue(), 1)
+        self.assertEqual(job.state, 'done')
+        self.assertEqual(job.attempts, 2)
+
+        # a job that is still processing is left alone
+        other_job = self.report._enqueue(self.partners.ids)
+        other_job.sudo().write({'state': 'processing', 'attempts': 1, 'date_start': datetime.now()})
+        self.assertEqual(Job._process_queue(), 0)
+        self.assertEqual(other_job.state, 'processing')
+
+        # after too many attempts, the job fails
+        other_job.sudo().write({'attempts': 3, 'date_start': datetime.now() - timedelta(hours=2)})
+        Job._gc_jobs()
+        self.assertEqual(other_job.state, 'failed')
+        self.assertTrue(other_job.error)
+        self.assertFalse(other_job.attachment_id)
+
+    def test_processing_timeout(self):
+        """ Jobs are requeued once their cron worker has been killed. """
+        Job = self.env['ir.actions.report.job']
+        options = odoo.tools.config.options
+        with patch.dict(options, {'limit_time_real': 120, 'limit_time_real_cron': -1}):
+            self.assertEqual(Job._processing_timeout(), 180)
+        with patch.dict(options, {'limit_time_real': 120, 'limit_time_real_cron': 600}):
+            self.assertEqual(Job._processing_timeout(), 660)
+        with patch.dict(options, {'limit_time_real': 120, 'limit_time_real_cron': 0}):
+            self.assertEqual(Job._processing_timeout(), 3600)
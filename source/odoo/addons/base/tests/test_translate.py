@@ -735,3 +735,48 @@ class TestXMLTranslation(TransactionCase):
         view.write({"arch_db": "<form><i>content</i></form>"})
         self.assertIn("<i>", view.arch_db)
         self.assertIn("<i>", view_fr.arch_db)
+
+
+class TestTranslationCatalog(TransactionCase):
+
+    def setUp(self):
+        super(TestTranslationCatalog, self).setUp()
+        self.env['res.lang'].load_lang('fr_FR')
+        self.translation = self.env['ir.translation'].create({
+            'type': 'code',
+            'name': 'addons/base/models/test.py',
+            'module': 'base',
+            'lang': 'fr_FR',
+            'src': 'Catalog Term',
+            'value': 'Terme du catalogue',
+            'comments': 'openerp-web',
+        })
+
+    def test_code_catalog(self):
+        Translation = self.env['ir.translation']
+        self.assertEqual(Translation._get_source(None, ('code',), 'fr_FR', 'Catalog Term'), 'Terme du catalogue')
+        self.assertEqual(Translation._get_source(None, 'code', 'fr_FR', 'Missing Term'), 'Missing Term')
+
+        # the catalog is loaded once for all the terms of the language
+        queries = self.cr.sql_log_count
+        Translation._get_source(None, ('code',), 'fr_FR', 'Catalog Term')
+        Translation._get_source(None, ('code',), 'fr_FR', 'Another Missing Term')
+        self.assertEqual(self.cr.sql_log_count, queries)
+
+        # and refreshed when a translation is modified
+        self.translation.value = 'Terme modifié'
+        self.assertEqual(Translation._get_source(None, ('code',), 'fr_FR', 'Catalog Term'), 'Terme modifié')
+        self.translation.value = ''
+        self.assertEqual(Translation._get_source(None, ('code',), 'fr_FR', 'Catalog Term'), 'Catalog Term')
+
+    def test_web_catalog(self):
+        Translation = self.env['ir.translation']
+        translations, _lang_params = Translation.get_translations_for_webclient(['base', 'web'], 'fr_FR')
+        self.assertIn({'id': 'Catalog Term', 'string': 'Terme du catalogue'}, translations['base']['messages'])
+
+        translations, _lang_params = Translation.get_translations_for_webclient(['web'], 'fr_FR')
+        self.assertNotIn('base', translations)
+
+        self.translation.value = 'Terme modifié'
+        translations, _lang_params = Translation.get_translations_for_webclient(['base'], 'fr_FR')
+        self.assertIn({'id': 'Catalog Term', 'string': 'Terme modifié'}, translations['base']['messages'])
@@ -2,6 +2,7 @@
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
 from functools import partial
+from unittest.mock import patch
 
 from lxml import etree
 from lxml.builder import E
@@ -2388,6 +2389,67 @@ class TestViewCombined(ViewCase):
             ), arch)
 
 
+class TestViewCombinedPerformance(ViewCase):
+    """ The inheritance tree of a view is fetched at once, and the combined
+    archs are memoized.
+    """
+
+    def create_tree(self, depth, width=3):
+        """ Create a root view with ``width`` chains of ``depth`` inheriting views. """
+        root = self.View.create({'model': 'res.partner', 'arch': '<form><group name="root"/></form>'})
+        for i in range(width):
+            parent_id, tag = root.id, 'root'
+            for j in range(depth):
+                parent_id = self.View.create({
+                    'model': 'res.partner',
+                    'inherit_id': parent_id,
+                    'arch': '<xpath expr="//group[@name=\'%s\']" position="inside"><group name="c%d_%d"/></xpath>' % (tag, i, j),
+                }).id
+                tag = 'c%d_%d' % (i, j)
+        return root
+
+    def read_combined(self, view):
+        """ Return the combined arch of ``view`` and the number of queries to compute it. """
+        self.View.clear_caches()
+        self.View.invalidate_cache()
+        count = self.cr.sql_log_count
+        arch = view.read_combined(['arch'])['arch']
+        return arch, self.cr.sql_log_count - count
+
+    def test_queries_do_not_depend_on_depth(self):
+        small = self.create_tree(2)
+        large = self.create_tree(15)
+
+        small_arch, small_count = self.read_combined(small)
+        large_arch, large_count = self.read_combined(large)
+        self.assertEqual(large_count, small_count)
+
+        arch = etree.fromstring(large_arch)
+        self.assertEqual(len(arch.xpath('//group[starts-with(@name, "c")]')), 3 * 15)
+        self.assertTrue(arch.xpath('//group[@name="root"]/group[@name="c2_0"]/group[@name="c2_1"]/group[@name="c2_2"]'))
+
+    def test_memoized(self):
+        root = self.create_tree(10)
+        arch, _count = self.read_combined(root)
+
+        with patch.object(type(self.View), '_combine_arch') as combine_arch:
+            self.assertEqual(root.read_combined(['arch'])['arch'], arch)
+        combine_arch.assert_not_called()
+
+        # the combined archs are memoized per group set
+        child = self.View.search([('inherit_id', '=', root.id)], limit=1)
+        child.groups_id = self.env.ref('base.group_system')
+        user = self.env['res.users'].create({
+            'name': 'Viewer',
+            'login': 'viewer',
+            'groups_id': [(6, 0, [self.env.ref('base.group_user').id])],
+        })
+        arch_admin = root.with_user(self.env.ref('base.user_admin')).read_combined(['arch'])['arch']
+        arch_user = root.with_user(user).read_combined(['arch'])['arch']
+        self.assertEqual(len(etree.fromstring(arch_admin)[0]), 3)
+        self.assertEqual(len(etree.fromstring(arch_user)[0]), 2)
+
+
 class TestOptionalViews(ViewCase):
     """
     Tests ability to enable/disable inherited views, formerly known as
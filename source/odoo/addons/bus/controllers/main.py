@@ -23,6 +23,10 @@ class BusController(Controller):
         # update the user presence
         if request.session.uid and 'bus_inactivity' in options:
             request.env['bus.presence'].update(options.get('bus_inactivity'))
+        if request.session.uid:
+            # notifications about the reports generated in background
+            channels = list(channels)
+            channels.append((dbname, 'ir.actions.report.job', request.session.uid))
         request.cr.close()
         request._cr = None
         return dispatch.poll(dbname, channels, last, options)
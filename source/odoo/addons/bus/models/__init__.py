@@ -3,4 +3,5 @@ from . import bus
 from . import bus_presence
 from . import res_users
 from . import res_partner
-from . import ir_autovacuum
\ No newline at end of file
+from . import ir_autovacuum
+from . import ir_actions_report_job
@@ -1,22 +1,38 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import bisect
 import datetime
+import functools
 import json
 import logging
 import random
 import select
 import threading
 import time
+from collections import defaultdict, deque
+from operator import itemgetter
+from weakref import WeakKeyDictionary
 
 import odoo
 from odoo import api, fields, models, SUPERUSER_ID
+from odoo.http import request
 from odoo.tools.misc import DEFAULT_SERVER_DATETIME_FORMAT
-from odoo.tools import date_utils
+from odoo.tools import date_utils, split_every
 
 _logger = logging.getLogger(__name__)
 
 # longpolling timeout connection
 TIMEOUT = 50
 
+# maximum size of a NOTIFY payload (PostgreSQL limit is 8000 bytes)
+NOTIFY_PAYLOAD_MAX = 7500
+
+# number of notifications kept in memory by the dispatcher, per database
+BUFFER_SIZE = 5000
+
+# channels to notify after commit, per cursor
+_notify_channels = WeakKeyDictionary()
+
 #----------------------------------------------------------
 # Bus
 #----------------------------------------------------------
@@ -28,6 +44,21 @@ def hashable(key):
         key = tuple(key)
     return key
 
+def notify_payloads(channels):
+    """ Split the list of ``channels`` into JSON payloads that fit in a NOTIFY. """
+    payload = []
+    size = 2
+    for channel in channels:
+        channel_size = len(json_dump(channel)) + 1
+        if payload and size + channel_size > NOTIFY_PAYLOAD_MAX:
+            yield json_dump(payload)
+            payload = []
+            size = 2
+        payload.append(channel)
+        size += channel_size
+    if payload:
+        yield json_dump(payload)
+
 
 class ImBus(models.Model):
 
@@ -46,23 +77,46 @@ class ImBus(models.Model):
     @api.model
     def sendmany(self, notifications):
         channels = set()
+        rows = []
         for channel, message in notifications:
             channels.add(channel)
-            values = {
-                "channel": json_dump(channel),
-                "message": json_dump(message)
-            }
-            self.sudo().create(values)
+            rows.append((json_dump(channel), json_dump(message)))
+
+        # insert the notifications with one query per batch of rows instead of
+        # one create per notification, as a message may be sent to thousands
+        # of channels
+        for batch in split_every(1000, rows):
+            query = """
+                INSERT INTO bus_bus (channel, message, create_uid, create_date, write_uid, write_date)
+                VALUES {}
+            """.format(", ".join(
+                ["(%s, %s, %s, (now() at time zone 'UTC'), %s, (now() at time zone 'UTC'))"] * len(batch)
+            ))
+            params = [value for channel, message in batch for value in (channel, message, self.env.uid, self.env.uid)]
+            self._cr.execute(query, params)
+
         if channels:
             # We have to wait until the notifications are commited in database.
             # When calling `NOTIFY imbus`, some concurrent threads will be
             # awakened and will fetch the notification in the bus table. If the
             # transaction is not commited yet, there will be nothing to fetch,
             # and the longpolling will return no notification.
-            def notify():
-                with odoo.sql_db.db_connect('postgres').cursor() as cr:
-                    cr.execute("notify imbus, %s", (json_dump(list(channels)),))
-            self._cr.after('commit', notify)
+            # The channels of all the notifications sent in the transaction
+            # are coalesced into a single NOTIFY.
+            cr = self._cr
+            pending = _notify_channels.get(cr)
+            if pending is None:
+                pending = _notify_channels[cr] = set()
+
+                def notify():
+                    channels = _notify_channels.pop(cr, ())
+                    with odoo.sql_db.db_connect('postgres').cursor() as cr2:
+                        for payload in notify_payloads(list(channels)):
+                            cr2.execute("notify imbus, %s", (payload,))
+
+                cr.after('commit', notify)
+                cr.after('rollback', lambda: _notify_channels.pop(cr, None))
+            pending.update(channels)
 
     @api.model
     def sendone(self, channel, message):
@@ -95,10 +149,125 @@ class ImBus(models.Model):
 #----------------------------------------------------------
 # Dispatcher
 #----------------------------------------------------------
+class NotificationBuffer(object):
+    """ Bounded in-memory buffer of the latest notifications of a database,
+    indexed by channel. It contains all the committed notifications whose id
+    is in the range (first_id, last_id].
+
+    Ids are given to the notifications when they are inserted, not when they
+    are committed, so a transaction may commit notifications with ids lower
+    than ``last_id``. The ids missing in the buffer are therefore fetched
+    again until they show up, or until they were missing for ``TIMEOUT``
+    seconds.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        self.first_id = None
+        self.last_id = None
+        self.seq = None                         # dispatcher sequence of the last fetch
+        self.ids = deque()                      # [(id, channel)] ordered by id
+        self.channels = defaultdict(dict)       # {channel: {id: message}}
+        self.missing = {}                       # {id: time it was found missing}
+
+    def fetch(self, cr, seq):
+        """ Add the notifications committed since the last fetch to the buffer. """
+        self.seq = seq
+        if self.last_id is None:
+            # start with an empty buffer
+            cr.execute("SELECT COALESCE(MAX(id), 0) FROM bus_bus")
+            self.first_id = self.last_id = cr.fetchone()[0]
+            return
+
+        now = time.time()
+        self.missing = {
+            id_: missing_time
+            for id_, missing_time in self.missing.items()
+            if id_ > self.first_id and now - missing_time < TIMEOUT
+        }
+        if self.missing:
+            cr.execute("""
+                SELECT id, channel, message FROM bus_bus
+                WHERE id > %s OR id IN %s ORDER BY id
+            """, [self.last_id, tuple(self.missing)])
+        else:
+            cr.execute("SELECT id, channel, message FROM bus_bus WHERE id > %s ORDER BY id", [self.last_id])
+
+        last_id = self.last_id
+        for id_, channel, message in cr.fetchall():
+            if id_ > last_id:
+                self.missing.update(dict.fromkeys(range(last_id + 1, id_), now))
+                last_id = id_
+            else:
+                # committed after notifications with greater ids were fetched
+                self.missing.pop(id_, None)
+            if self.ids and id_ < self.ids[-1][0]:
+                bisect.insort(self.ids, (id_, channel))
+            else:
+                self.ids.append((id_, channel))
+            self.channels[channel][id_] = message
+        self.last_id = last_id
+
+        while len(self.ids) > self.size:
+            id_, channel = self.ids.popleft()
+            notifications = self.channels[channel]
+            del notifications[id_]
+            if not notifications:
+                del self.channels[channel]
+            self.first_id = id_
+
+    def read(self, channels, last):
+        """ Return the notifications of the given (JSON-encoded) channels with
+        an id greater than ``last``, or ``None`` if the buffer does not
+        contain all of them. The first poll of a client (``last`` is 0)
+        returns the recent notifications, and is left to the database.
+        """
+        if self.first_id is None or not last or last < self.first_id:
+            return None
+        result = [
+            {'id': id_, 'channel': json.loads(channel), 'message': json.loads(message)}
+            for channel in channels
+            for id_, message in self.channels.get(channel, {}).items()
+            if id_ > last
+        ]
+        result.sort(key=itemgetter('id'))
+        return result
+
+
 class ImDispatch(object):
     def __init__(self):
         self.channels = {}
         self.started = False
+        # whether the loop is listening, the number of notification batches
+        # it received, and the buffers of notifications per database
+        self.listening = False
+        self.seq = 0
+        self.buffers = {}
+
+    def _poll(self, registry, channels, last, options):
+        """ Return the notifications of ``channels`` after ``last``. While the
+        loop is listening, they are read from the buffer of the database, which
+        fetches the new notifications at most once per batch of notifications
+        received by the loop, whatever the number of polling clients. First
+        polls, and clients whose ``last`` id is older than the buffer, fall
+        back to the database.
+        """
+        if self.listening:
+            buffer = self.buffers.get(registry.db_name)
+            if buffer is None:
+                buffer = self.buffers.setdefault(registry.db_name, NotificationBuffer(BUFFER_SIZE))
+            with buffer.lock:
+                seq = self.seq
+                if buffer.seq != seq:
+                    with registry.cursor() as cr:
+                        buffer.fetch(cr, seq)
+                notifications = buffer.read([json_dump(c) for c in channels], last)
+            if notifications is not None:
+                return notifications
+
+        with registry.cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            return env['bus.bus'].poll(channels, last, options)
 
     def poll(self, dbname, channels, last, options=None, timeout=TIMEOUT):
         if options is None:
@@ -115,9 +284,7 @@ class ImDispatch(object):
         registry = odoo.registry(dbname)
 
         # immediatly returns if past notifications exist
-        with registry.cursor() as cr:
-            env = api.Environment(cr, SUPERUSER_ID, {})
-            notifications = env['bus.bus'].poll(channels, last, options)
+        notifications = self._poll(registry, channels, last, options)
 
         # immediatly returns in peek mode
         if options.get('peek'):
@@ -125,6 +292,8 @@ class ImDispatch(object):
 
         # or wait for future ones
         if not notifications:
+            if odoo.asynchronous:
+                return self._defer(registry, channels, last, options, timeout)
             if not self.started:
                 # Lazy start of events listener
                 self.start()
@@ -134,9 +303,7 @@ class ImDispatch(object):
                 self.channels.setdefault(hashable(channel), set()).add(event)
             try:
                 event.wait(timeout=timeout)
-                with registry.cursor() as cr:
-                    env = api.Environment(cr, SUPERUSER_ID, {})
-                    notifications = env['bus.bus'].poll(channels, last, options)
+                notifications = self._poll(registry, channels, last, options)
             except Exception:
                 # timeout
                 pass
@@ -148,6 +315,55 @@ class ImDispatch(object):
                         channel_events.remove(event)
         return notifications
 
+    def _defer(self, registry, channels, last, options, timeout):
+        """ Let the asyncio server wait for the notifications without holding
+        the current thread (see ``AsyncioServer``).
+        """
+        deferred = request and request.httprequest.environ.get('odoo.longpolling.defer')
+        if deferred is not None:
+            deferred.append(functools.partial(self.apoll, registry, channels, last, options, timeout))
+        return []
+
+    async def apoll(self, registry, channels, last, options, timeout):
+        """ Wait for the notifications of ``channels`` after ``last`` in the
+        event loop of the asyncio server.
+        """
+        if not self.started:
+            self.start()
+
+        event = asyncio.Event()
+        for channel in channels:
+            self.channels.setdefault(hashable(channel), set()).add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            # gc pointers to event
+            for channel in channels:
+                channel_events = self.channels.get(hashable(channel))
+                if channel_events and event in channel_events:
+                    channel_events.remove(event)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, self._poll, registry, channels, last, options)
+
+    def _dispatch(self, conn):
+        """ Process the pending notifications of ``conn``, and wake up the
+        clients waiting for them.
+        """
+        conn.poll()
+        channels = []
+        while conn.notifies:
+            channels.extend(json.loads(conn.notifies.pop().payload))
+        # the buffers must fetch the new notifications
+        self.seq += 1
+        # dispatch to local threads/greenlets/coroutines
+        events = set()
+        for channel in channels:
+            events.update(self.channels.pop(hashable(channel), set()))
+        for event in events:
+            event.set()
+
     def loop(self):
         """ Dispatch postgres notifications to the relevant polling threads/greenlets """
         _logger.info("Bus.loop listen imbus on db postgres")
@@ -155,31 +371,63 @@ class ImDispatch(object):
             conn = cr._cnx
             cr.execute("listen imbus")
             cr.commit();
+            # notifications may have been missed while not listening
+            self.seq += 1
+            self.listening = True
             while True:
                 if select.select([conn], [], [], TIMEOUT) == ([], [], []):
                     pass
                 else:
-                    conn.poll()
-                    channels = []
-                    while conn.notifies:
-                        channels.extend(json.loads(conn.notifies.pop().payload))
-                    # dispatch to local threads/greenlets
-                    events = set()
-                    for channel in channels:
-                        events.update(self.channels.pop(hashable(channel), set()))
-                    for event in events:
-                        event.set()
+                    self._dispatch(conn)
 
     def run(self):
         while True:
             try:
                 self.loop()
             except Exception as e:
+                self.listening = False
                 _logger.exception("Bus.loop error, sleep and retry")
                 time.sleep(TIMEOUT)
 
+    async def aloop(self):
+        """ Same as ``loop``, for the event loop of the asyncio server: the
+        connection is watched by the event loop instead of a thread.
+        """
+        _logger.info("Bus.aloop listen imbus on db postgres")
+        loop = asyncio.get_event_loop()
+        with odoo.sql_db.db_connect('postgres').cursor() as cr:
+            conn = cr._cnx
+            cr.execute("listen imbus")
+            cr.commit();
+            # notifications may have been missed while not listening
+            self.seq += 1
+            self.listening = True
+            closed = loop.create_future()
+
+            def on_readable():
+                try:
+                    self._dispatch(conn)
+                except Exception as e:
+                    loop.remove_reader(conn.fileno())
+                    closed.set_exception(e)
+
+            loop.add_reader(conn.fileno(), on_readable)
+            await closed
+
+    async def arun(self):
+        while True:
+            try:
+                await self.aloop()
+            except Exception as e:
+                self.listening = False
+                _logger.exception("Bus.aloop error, sleep and retry")
+                await asyncio.sleep(TIMEOUT)
+
     def start(self):
-        if odoo.evented:
+        if odoo.asynchronous:
+            # asyncio mode, called from the event loop of the server
+            asyncio.get_event_loop().create_task(self.arun())
+        elif odoo.evented:
             # gevent mode
             import gevent
             self.Event = gevent.event.Event
@@ -194,6 +442,6 @@ class ImDispatch(object):
         return self
 
 dispatch = None
-if not odoo.multi_process or odoo.evented:
-    # We only use the event dispatcher in threaded and gevent mode
+if not odoo.multi_process or odoo.evented or odoo.asynchronous:
+    # We only use the event dispatcher in threaded, gevent and asyncio mode
     dispatch = ImDispatch()
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from odoo import models
+
+
+class IrActionsReportJob(models.Model):
+    _inherit = 'ir.actions.report.job'
+
+    def _notify_user(self):
+        super(IrActionsReportJob, self)._notify_user()
+        notifications = []
+        for job in self:
+            message = {
+                'type': 'report_job',
+                'id': job.id,
+                'name': job.name,
+                'state': job.state,
+            }
+            if job.state == 'done':
+                message['url'] = '/web/content/%d?download=true' % job.attachment_id.id
+            else:
+                message['error'] = job.error
+            notifications.append([(self._cr.dbname, self._name, job.user_id.id), message])
+        self.env['bus.bus'].sendmany(notifications)
@@ -0,0 +1,60 @@
+odoo.define('bus.ReportActionManager', function (require) {
+"use strict";
+
+/**
+ * Notifies the user when the reports generated in background are ready.
+ */
+
+var ActionManager = require('web.ActionManager');
+var core = require('web.core');
+require('web.ReportActionManager');
+
+var _t = core._t;
+
+ActionManager.include({
+    //--------------------------------------------------------------------------
+    // Private
+    //--------------------------------------------------------------------------
+
+    /**
+     * Starts listening to the bus before queuing the report, so that the user
+     * is notified when it is ready.
+     *
+     * @override
+     * @private
+     */
+    _enqueueReport: function () {
+        if (!this._listenReportJobs) {
+            this._listenReportJobs = true;
+            this.call('bus_service', 'onNotification', this, this._onReportJobNotification);
+            this.call('bus_service', 'startPolling');
+        }
+        return this._super.apply(this, arguments);
+    },
+
+    //--------------------------------------------------------------------------
+    // Handlers
+    //--------------------------------------------------------------------------
+
+    /**
+     * @private
+     * @param {Array[]} notifications pairs of (channel, message)
+     */
+    _onReportJobNotification: function (notifications) {
+        var self = this;
+        _.each(notifications, function (notification) {
+            var message = notification[1];
+            if (!message || message.type !== 'report_job') {
+                return;
+            }
+            if (message.state === 'done') {
+                var link = _.str.sprintf('<a href="%s">%s</a>', _.escape(message.url), _.escape(message.name));
+                self.do_notify(_t('Your report is ready'), link, true);
+            } else {
+                self.do_warn(_t('Your report could not be generated'), _.escape(message.error), true);
+            }
+        });
+    },
+});
+
+});
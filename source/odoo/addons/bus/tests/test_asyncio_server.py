@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+import asyncio
+import functools
+import json
+from types import SimpleNamespace
+
+from odoo.addons.bus.models.bus import ImDispatch, hashable, json_dump
+from odoo.service.server import AsyncioServer
+from odoo.tests.common import BaseCase
+
+
+class StreamWriter(object):
+    """ In-memory replacement of :class:`asyncio.StreamWriter`. """
+    def __init__(self):
+        self.data = b''
+        self.closed = False
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def get_extra_info(self, name):
+        return ('127.0.0.1', 4242) if name == 'peername' else None
+
+
+def echo_app(environ, start_response):
+    """ WSGI application returning the method, path and body of the request. """
+    length = int(environ.get('CONTENT_LENGTH') or 0)
+    content = json.dumps({
+        'method': environ['REQUEST_METHOD'],
+        'path': environ['PATH_INFO'],
+        'query': environ['QUERY_STRING'],
+        'body': environ['wsgi.input'].read(length).decode(),
+    }).encode()
+    start_response('200 OK', [('Content-Type', 'application/json'), ('Content-Length', str(len(content)))])
+    return [content]
+
+
+class TestAsyncioServer(BaseCase):
+
+    def handle(self, data, app=echo_app, *coroutines):
+        """ Let the server handle the request ``data``, and return its status
+        and body.
+        """
+        server = AsyncioServer(app)
+        server.loop = asyncio.new_event_loop()
+        self.addCleanup(server.loop.close)
+        writer = StreamWriter()
+
+        async def run():
+            reader = asyncio.StreamReader(limit=server.max_headers_size)
+            reader.feed_data(data)
+            reader.feed_eof()
+            await asyncio.gather(server.handle(reader, writer), *coroutines)
+
+        server.loop.run_until_complete(run())
+        self.assertTrue(writer.closed)
+        head, _, body = writer.data.partition(b'\r\n\r\n')
+        return head.split(b'\r\n')[0].decode(), body
+
+    def test_get(self):
+        status, body = self.handle(b'GET /web/foo%20bar?a=1 HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        self.assertEqual(status, 'HTTP/1.1 200 OK')
+        self.assertEqual(json.loads(body), {'method': 'GET', 'path': '/web/foo bar', 'query': 'a=1', 'body': ''})
+
+    def test_post(self):
+        content = b'{"jsonrpc": "2.0", "params": {}}'
+        status, body = self.handle(
+            b'POST /longpolling/poll HTTP/1.1\r\nContent-Type: application/json\r\n'
+            b'Content-Length: %d\r\n\r\n%s' % (len(content), content)
+        )
+        self.assertEqual(status, 'HTTP/1.1 200 OK')
+        self.assertEqual(json.loads(body)['body'], content.decode())
+
+    def test_invalid_requests(self):
+        status, body = self.handle(b'GET /%s HTTP/1.1\r\n\r\n' % (b'x' * AsyncioServer.max_request_line))
+        self.assertEqual(status, 'HTTP/1.1 414 Request-URI Too Long')
+
+        status, body = self.handle(b'GET / HTTP/1.1\r\nCookie: %s\r\n\r\n' % (b'x' * AsyncioServer.max_headers_size))
+        self.assertEqual(status, 'HTTP/1.1 431 Request Header Fields Too Large')
+
+        many_headers = b''.join(b'X-Header-%d: %s\r\n' % (index, b'x' * 1000) for index in range(100))
+        status, body = self.handle(b'GET / HTTP/1.1\r\n%s\r\n' % many_headers)
+        self.assertEqual(status, 'HTTP/1.1 431 Request Header Fields Too Large')
+
+        status, body = self.handle(b'POST / HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % (AsyncioServer.max_body_size + 1))
+        self.assertEqual(status, 'HTTP/1.1 413 Request Entity Too Large')
+
+        status, body = self.handle(b'POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n4\r\nbody\r\n0\r\n\r\n')
+        self.assertEqual(status, 'HTTP/1.1 411 Length Required')
+
+        status, body = self.handle(b'POST / HTTP/1.1\r\nTransfer-Encoding: gzip\r\n\r\n')
+        self.assertEqual(status, 'HTTP/1.1 501 Not Implemented')
+
+        status, body = self.handle(b'GET /\r\n\r\n')
+        self.assertEqual(status, 'HTTP/1.1 400 Bad Request')
+
+    def test_longpolling(self):
+        """ Test a longpolling request woken up by a notification. """
+        dispatcher = ImDispatch()
+        dispatcher.started = True
+        woken = []
+
+        def poll(registry, channels, last, options):
+            return [{'id': last + 1, 'channel': 'a', 'message': 'hello'}] if woken else []
+        dispatcher._poll = poll
+
+        def app(environ, start_response):
+            # no pending notification: defer the result to the event loop
+            environ['odoo.longpolling.defer'].append(
+                functools.partial(dispatcher.apoll, None, ['a'], 1, {}, 10))
+            content = b'{"jsonrpc": "2.0", "id": 42, "result": []}'
+            start_response('200 OK', [('Content-Type', 'application/json'), ('Content-Length', str(len(content)))])
+            return [content]
+
+        async def notify():
+            while hashable('a') not in dispatcher.channels:
+                await asyncio.sleep(0.01)
+            woken.append(True)
+            connection = SimpleNamespace(poll=lambda: None, notifies=[SimpleNamespace(payload=json_dump(['a']))])
+            dispatcher._dispatch(connection)
+
+        content = b'{"jsonrpc": "2.0", "id": 42, "params": {"channels": ["a"], "last": 1}}'
+        status, body = self.handle(
+            b'POST /longpolling/poll HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s' % (len(content), content),
+            app, notify(),
+        )
+        self.assertEqual(status, 'HTTP/1.1 200 OK')
+        self.assertEqual(json.loads(body), {
+            'jsonrpc': '2.0',
+            'id': 42,
+            'result': [{'id': 2, 'channel': 'a', 'message': 'hello'}],
+        })
+        self.assertFalse(dispatcher.channels.get(hashable('a')))
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+from odoo.addons.bus.models.bus import NotificationBuffer, json_dump
+from odoo.tests.common import TransactionCase
+
+
+class TestNotificationBuffer(TransactionCase):
+
+    def test_buffer(self):
+        Bus = self.env['bus.bus']
+        Bus.sendone('z', 0)
+        buffer = NotificationBuffer(3)
+        buffer.fetch(self.cr, 1)
+        last = buffer.last_id
+        self.assertEqual(buffer.read([json_dump('a')], last), [])
+        # notifications older than the buffer are not available
+        self.assertIsNone(buffer.read([json_dump('a')], last - 1))
+
+        Bus.sendmany([['a', 1], ['b', 2], ['a', 3]])
+        # the buffer is not refreshed until the next fetch
+        self.assertEqual(buffer.read([json_dump('a')], last), [])
+        buffer.fetch(self.cr, 2)
+        self.assertEqual(
+            [(notif['channel'], notif['message']) for notif in buffer.read([json_dump('a')], last)],
+            [('a', 1), ('a', 3)],
+        )
+        self.assertEqual(
+            [notif['message'] for notif in buffer.read([json_dump('a'), json_dump('b')], last)],
+            [1, 2, 3],
+        )
+        self.assertEqual(buffer.read([json_dump('a')], buffer.last_id), [])
+
+        # the oldest notifications are evicted from the buffer
+        Bus.sendone('c', 4)
+        buffer.fetch(self.cr, 3)
+        self.assertIsNone(buffer.read([json_dump('a')], last))
+        self.assertEqual(
+            [notif['message'] for notif in buffer.read([json_dump('a'), json_dump('c')], last + 1)],
+            [3, 4],
+        )
+
+    def test_buffer_first_poll(self):
+        """ The first poll of a client is left to the database. """
+        buffer = NotificationBuffer(3)
+        buffer.fetch(self.cr, 1)
+        self.assertIsNone(buffer.read([json_dump('a')], 0))
+
+    def test_buffer_copies(self):
+        Bus = self.env['bus.bus']
+        Bus.sendone('z', 0)
+        buffer = NotificationBuffer(3)
+        buffer.fetch(self.cr, 1)
+        last = buffer.last_id
+        Bus.sendone('a', {'value': 1})
+        buffer.fetch(self.cr, 2)
+        notifications = buffer.read([json_dump('a')], last)
+        notifications[0]['message']['value'] = 2
+        self.assertEqual(buffer.read([json_dump('a')], last)[0]['message'], {'value': 1})
+
+    def test_buffer_late_commit(self):
+        """ Notifications committed after greater ids were fetched are not lost. """
+        Bus = self.env['bus.bus']
+        Bus.sendone('z', 0)
+        buffer = NotificationBuffer(10)
+        buffer.fetch(self.cr, 1)
+        last = buffer.last_id
+
+        # simulate a transaction holding the first id while another one commits
+        Bus.sendmany([['a', 1], ['a', 2]])
+        self.cr.execute("SELECT id, channel, message FROM bus_bus WHERE id > %s ORDER BY id", [last])
+        late_row = self.cr.fetchone()
+        self.cr.execute("DELETE FROM bus_bus WHERE id = %s", [late_row[0]])
+        buffer.fetch(self.cr, 2)
+        self.assertEqual([notif['message'] for notif in buffer.read([json_dump('a')], last)], [2])
+
+        # the late transaction commits
+        self.cr.execute("INSERT INTO bus_bus (id, channel, message) VALUES (%s, %s, %s)", late_row)
+        buffer.fetch(self.cr, 3)
+        self.assertEqual([notif['message'] for notif in buffer.read([json_dump('a')], last)], [1, 2])
+        self.assertFalse(buffer.missing)
+
+        # the buffer does not fetch them twice
+        buffer.fetch(self.cr, 4)
+        self.assertEqual([notif['message'] for notif in buffer.read([json_dump('a')], last)], [1, 2])
@@ -511,6 +511,48 @@ class TestJavascriptAssetsBundle(FileTouchable):
     </body>
 </html>""").encode('utf8'))
 
+    def test_22_prebuild(self):
+        """ Checks that the bundles called by the templates are built beforehand, in every
+        direction, and that rendering them afterwards does not build them again.
+        """
+        IrQweb = self.env['ir.qweb']
+        xmlids = IrQweb._get_asset_bundle_xmlids()
+        self.assertIn(self.jsbundle_xmlid, xmlids)
+        self.assertIn('test_assetsbundle.bundle4', xmlids)
+
+        bundles = [self.jsbundle_xmlid, 'test_assetsbundle.bundle4']
+        with patch.object(type(IrQweb), '_get_asset_bundle_xmlids', lambda self: bundles):
+            IrQweb._prebuild_asset_bundles()
+
+        js_attachments = self.env['ir.attachment'].search([('url', '=like', '/web/content/%-%/test_assetsbundle.bundle%.js')])
+        self.assertEqual(len(js_attachments), 2)
+        css_attachments = self.env['ir.attachment'].search([('url', '=like', '/web/content/%-%/%test_assetsbundle.bundle4.css')])
+        self.assertEqual(len(css_attachments), 2, "the bundle should be built for both directions")
+
+        with patch.object(AssetsBundle, 'save_attachment') as save_attachment:
+            self.env['ir.ui.view'].render_template('test_assetsbundle.template2')
+            self.assertFalse(save_attachment.called)
+
+    def test_23_build_lock(self):
+        """ Checks that a bundle being built by another transaction is not built again, the
+        previous version being served meanwhile.
+        """
+        bundle0 = self._get_asset(self.jsbundle_xmlid)
+        attachment0 = bundle0.js()
+
+        path = get_resource_path('test_assetsbundle', 'static', 'src', 'js', 'test_jsfile1.js')
+        with self._touch(path):
+            bundle1 = self._get_asset(self.jsbundle_xmlid)
+            self.assertNotEqual(bundle0.version, bundle1.version)
+            with patch.object(AssetsBundle, '_try_build_lock', return_value=False):
+                self.assertEqual(bundle1.js(), attachment0)
+            self.assertEqual(len(self._any_ira_for_bundle('js')), 1)
+
+            # once the lock is free, the new version is built
+            attachment1 = bundle1.js()
+            self.assertNotEqual(attachment1, attachment0)
+            self.assertIn(bundle1.version, attachment1.url)
+
 
 class TestAssetsBundleInBrowser(HttpCase):
     def test_01_js_interpretation(self):
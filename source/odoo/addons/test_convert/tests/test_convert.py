@@ -3,6 +3,7 @@
 
 import collections
 import unittest
+from unittest.mock import patch
 
 from lxml import etree as ET
 from lxml.builder import E
@@ -195,3 +196,72 @@ class TestEvalXML(common.TransactionCase):
     @unittest.skip("not tested")
     def test_html(self):
         pass
+
+
+class TestXMLImport(common.TransactionCase):
+    def import_xml(self, doc):
+        obj = xml_import(self.cr, 'test_convert', None, 'init')
+        Partner = type(self.env['res.partner'])
+        load_records = Partner._load_records
+        calls = []
+
+        def _load_records(model, data_list, update=False):
+            calls.append([data['xml_id'] for data in data_list])
+            return load_records(model, data_list, update)
+
+        with patch.object(Partner, '_load_records', _load_records):
+            obj.parse(doc)
+        return calls
+
+    def test_batch_records(self):
+        calls = self.import_xml(E.odoo(
+            E.record(Field('A', name='name'), model='res.partner', id='partner_a'),
+            E.record(Field('B', name='name'), model='res.partner', id='partner_b'),
+            E.record(Field('C', name='name'), model='res.partner', id='partner_c'),
+        ))
+        self.assertEqual(calls, [[
+            'test_convert.partner_a',
+            'test_convert.partner_b',
+            'test_convert.partner_c',
+        ]])
+        self.assertEqual(self.env.ref('test_convert.partner_b').name, 'B')
+
+    def test_batch_records_ref(self):
+        # a reference to a queued record loads the queue first
+        calls = self.import_xml(E.odoo(
+            E.record(Field('A', name='name'), model='res.partner', id='partner_a'),
+            E.record(Field(name='parent_id', ref='partner_a'), model='res.partner', id='partner_b'),
+            E.record(Field(name='parent_id', eval="ref('test_convert.partner_b')"),
+                     model='res.partner', id='partner_c'),
+        ))
+        self.assertEqual(calls, [
+            ['test_convert.partner_a'],
+            ['test_convert.partner_b'],
+            ['test_convert.partner_c'],
+        ])
+        partner_a = self.env.ref('test_convert.partner_a')
+        partner_c = self.env.ref('test_convert.partner_c')
+        self.assertEqual(partner_c.parent_id.parent_id, partner_a)
+
+    def test_batch_records_function(self):
+        # other tags load the queue first
+        calls = self.import_xml(E.odoo(
+            E.record(Field('A', name='name'), model='res.partner', id='partner_a'),
+            E.function(model='res.partner', name='write',
+                       eval="[[ref('partner_a')], {'name': 'AA'}]"),
+            E.record(Field('B', name='name'), model='res.partner', id='partner_b'),
+        ))
+        self.assertEqual(calls, [['test_convert.partner_a'], ['test_convert.partner_b']])
+        self.assertEqual(self.env.ref('test_convert.partner_a').name, 'AA')
+
+    def test_prefetch_xmlids(self):
+        obj = xml_import(self.cr, 'test_convert', None, 'init')
+        obj._prefetch_xmlids(E.odoo(
+            E.record(Field(name='user_id', ref='base.user_admin'),
+                     Field(name='company_id', eval="ref('base.main_company')"),
+                     model='res.partner'),
+        ))
+        queries = self.cr.sql_log_count
+        self.assertEqual(obj.id_get('base.user_admin'), self.env.ref('base.user_admin').id)
+        self.assertEqual(obj.id_get('base.main_company'), self.env.ref('base.main_company').id)
+        self.assertEqual(self.cr.sql_log_count, queries)
@@ -776,3 +776,24 @@ class TestMailPerformancePost(BaseMailPerformance):
         self.assertEqual(self.attachements.mapped('res_model'), [record._name for i in range(3)])
         self.assertEqual(self.attachements.mapped('res_id'), [record.id for i in range(3)])
         # self.assertEqual(record.message_ids[0].notified_partner_ids, [])
+
+
+@tagged('mail_performance')
+class TestBusPerformance(BaseMailPerformance):
+
+    @users('__system__', 'emp')
+    @warmup
+    def test_bus_sendmany(self):
+        """ Send a notification to 1000 channels at once. """
+        notifications = [
+            [(self.cr.dbname, 'res.partner', partner_id), {'type': 'test', 'partner_id': partner_id}]
+            for partner_id in range(1, 1001)
+        ]
+        count = self.env['bus.bus'].sudo().search_count([])
+
+        with self.assertQueryCount(__system__=1, emp=1):
+            self.env['bus.bus'].sendmany(notifications)
+
+        self.assertEqual(self.env['bus.bus'].sudo().search_count([]), count + 1000)
+        notifications = self.env['bus.bus'].poll([(self.cr.dbname, 'res.partner', 42)], last=0)
+        self.assertEqual([notif['message'] for notif in notifications], [{'type': 'test', 'partner_id': 42}])
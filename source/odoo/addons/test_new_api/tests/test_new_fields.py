@@ -5,13 +5,16 @@ import base64
 from collections import OrderedDict
 from datetime import date, datetime, time
 import io
+import os
+import tempfile
+from unittest.mock import patch
 from PIL import Image
 import psycopg2
 
 from odoo import fields
 from odoo.exceptions import AccessError, UserError, ValidationError
 from odoo.tests import common
-from odoo.tools import mute_logger, float_repr
+from odoo.tools import config, mute_logger, float_repr
 from odoo.tools.date_utils import add, subtract, start_of, end_of
 from odoo.tools.image import image_data_uri
 
@@ -219,6 +222,34 @@ class TestFields(common.TransactionCase):
         # setting up models should not crash
         self.registry.setup_models(self.cr)
 
+    def test_10_registry_snapshot(self):
+        """ test the reuse of field triggers saved by a previous setup """
+        registry = self.registry
+        with tempfile.TemporaryDirectory() as data_dir, \
+                patch.dict(config.options, registry_snapshot=True, data_dir=data_dir):
+            registry.setup_models(self.cr)
+            self.assertTrue(os.path.exists(registry._snapshot_path()))
+            triggers = registry.field_triggers
+
+            with patch.object(type(registry), '_compute_field_triggers') as compute:
+                registry.setup_models(self.cr)
+            compute.assert_not_called()
+            self.assertEqual(registry.field_triggers, triggers)
+
+            # changing a field definition invalidates the snapshot
+            self.env['ir.model.fields'].create({
+                'name': 'x_computed_snapshot',
+                'model_id': self.env.ref('test_new_api.model_test_new_api_foo').id,
+                'state': 'manual',
+                'field_description': 'A compute depending on value1',
+                'compute': "for r in self: r['x_computed_snapshot'] = r.value1",
+                'depends': 'value1',
+                'store': False,
+                'ttype': 'integer',
+            })
+            fields = self.env['test_new_api.foo']._fields
+            self.assertIn(fields['x_computed_snapshot'], registry.field_triggers[fields['value1']][None])
+
     def test_10_display_name(self):
         """ test definition of automatic field 'display_name' """
         field = type(self.env['test_new_api.discussion']).display_name
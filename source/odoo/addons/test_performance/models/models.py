@@ -17,6 +17,7 @@ class BaseModel(models.Model):
     line_ids = fields.One2many('test_performance.line', 'base_id')
     total = fields.Integer(compute="_total", store=True)
     tag_ids = fields.Many2many('test_performance.tag')
+    description = fields.Text(prefetch='description')
 
     @api.depends('value')
     def _value_pc(self):
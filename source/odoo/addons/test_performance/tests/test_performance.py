@@ -3,6 +3,7 @@
 
 from collections import defaultdict
 import json
+from unittest.mock import patch
 
 from odoo.tests.common import TransactionCase, users, warmup, tagged
 from odoo.tools import mute_logger, json_default
@@ -32,6 +33,33 @@ class TestPerformance(TransactionCase):
             for record in records:
                 record.value_pc
 
+    @users('__system__', 'demo')
+    @warmup
+    def test_read_base_prefetch_group(self):
+        """ Fields of a prefetch group are only fetched with each other, and
+            wide values are fetched in smaller batches. """
+        records = self.env['test_performance.base'].search([])
+        self.assertEqual(len(records), 5)
+        records.write({'description': 'x' * 100})
+        records.flush()
+        records.invalidate_cache()
+
+        with self.assertQueryCount(__system__=1, demo=1):
+            for record in records:
+                record.name
+
+        with self.assertQueryCount(__system__=1, demo=1):
+            # description is not prefetched with name
+            for record in records:
+                record.description
+
+        records.invalidate_cache(['description'])
+        with patch('odoo.models.PREFETCH_BYTES_MAX', 200), \
+                self.assertQueryCount(__system__=3, demo=3):
+            # two records per query
+            for record in records:
+                record.description
+
     @warmup
     def test_read_base_depends_context(self):
         """ Compute in batch even when in cache in another context. """
@@ -60,6 +88,20 @@ class TestPerformance(TransactionCase):
         with self.assertQueryCount(__system__=1, demo=1):
             records.write({'name': 'X'})
 
+    @users('__system__', 'demo')
+    @warmup
+    def test_write_base_distinct_values(self):
+        """ Write distinct values on records: flushed with a single query. """
+        records = self.env['test_performance.base'].search([])
+        self.assertEqual(len(records), 5)
+
+        with self.assertQueryCount(__system__=1, demo=1):
+            for index, record in enumerate(records):
+                record.write({'name': 'X%d' % index})
+
+        records.invalidate_cache()
+        self.assertEqual(records.mapped('name'), ['X%d' % index for index in range(5)])
+
     @users('__system__', 'demo')
     @warmup
     def test_write_base_with_recomputation(self):
@@ -77,14 +119,14 @@ class TestPerformance(TransactionCase):
         """ Write on one2many field. """
         rec1 = self.env['test_performance.base'].create({'name': 'X'})
 
-        # create N lines on rec1: O(N) queries
+        # create N lines on rec1: O(1) queries
         rec1.invalidate_cache()
         with self.assertQueryCount(2):
             rec1.write({'line_ids': [(0, 0, {'value': 0})]})
         self.assertEqual(len(rec1.line_ids), 1)
 
         rec1.invalidate_cache()
-        with self.assertQueryCount(15):
+        with self.assertQueryCount(5):
             rec1.write({'line_ids': [(0, 0, {'value': val}) for val in range(1, 12)]})
         self.assertEqual(len(rec1.line_ids), 12)
 
@@ -97,7 +139,7 @@ class TestPerformance(TransactionCase):
         self.assertEqual(rec1.line_ids, lines)
 
         rec1.invalidate_cache()
-        with self.assertQueryCount(26):
+        with self.assertQueryCount(16):
             rec1.write({'line_ids': [(1, line.id, {'value': 42 + line.id}) for line in lines[1:]]})
         self.assertEqual(rec1.line_ids, lines)
 
@@ -203,14 +245,14 @@ class TestPerformance(TransactionCase):
         """ Write on many2many field. """
         rec1 = self.env['test_performance.base'].create({'name': 'X'})
 
-        # create N tags on rec1: O(N) queries
+        # create N tags on rec1: O(1) queries
         rec1.invalidate_cache()
         with self.assertQueryCount(4):
             rec1.write({'tag_ids': [(0, 0, {'name': 0})]})
         self.assertEqual(len(rec1.tag_ids), 1)
 
         rec1.invalidate_cache()
-        with self.assertQueryCount(14):
+        with self.assertQueryCount(4):
             rec1.write({'tag_ids': [(0, 0, {'name': val}) for val in range(1, 12)]})
         self.assertEqual(len(rec1.tag_ids), 12)
 
@@ -321,12 +363,35 @@ class TestPerformance(TransactionCase):
     @warmup
     def test_create_base_with_lines(self):
         """ Create records with one2many lines. """
-        with self.assertQueryCount(__system__=12, demo=12):
+        with self.assertQueryCount(__system__=3, demo=3):
             self.env['test_performance.base'].create({
                 'name': 'X',
                 'line_ids': [(0, 0, {'value': val}) for val in range(10)],
             })
 
+    @users('__system__', 'demo')
+    @warmup
+    def test_create_base_batch(self):
+        """ Create records in batch: O(1) queries. """
+        with self.assertQueryCount(__system__=2, demo=2):
+            records = self.env['test_performance.base'].create([
+                {'name': 'X%d' % val} for val in range(10)
+            ])
+        self.assertEqual(records.mapped('name'), ['X%d' % val for val in range(10)])
+
+        # records with different columns are inserted separately
+        with self.assertQueryCount(__system__=3, demo=3):
+            self.env['test_performance.base'].create([
+                {'name': 'X'}, {'name': 'Y'}, {'value': 1}, {'value': 2},
+            ])
+
+        with self.assertQueryCount(__system__=3, demo=3):
+            records = self.env['test_performance.base'].create([
+                {'name': 'X%d' % val, 'line_ids': [(0, 0, {'value': val})]}
+                for val in range(10)
+            ])
+        self.assertEqual(records.mapped('line_ids.value'), list(range(10)))
+
     @users('__system__', 'demo')
     @warmup
     def test_create_base_with_tags(self):
@@ -334,13 +399,21 @@ class TestPerformance(TransactionCase):
         with self.assertQueryCount(2):
             self.env['test_performance.base'].create({'name': 'X'})
 
-        # create N tags: add O(N) queries
-        with self.assertQueryCount(13):
+        # create N tags: add O(1) queries
+        with self.assertQueryCount(4):
             self.env['test_performance.base'].create({
                 'name': 'X',
                 'tag_ids': [(0, 0, {'name': val}) for val in range(10)],
             })
 
+        # create N tags on N records: add O(1) queries
+        with self.assertQueryCount(4):
+            records = self.env['test_performance.base'].create([
+                {'name': 'X', 'tag_ids': [(0, 0, {'name': val})]}
+                for val in range(10)
+            ])
+        self.assertEqual(records.mapped('tag_ids.name'), [str(val) for val in range(10)])
+
         # link N tags: add O(1) queries
         tags = self.env['test_performance.tag'].create([{'name': val} for val in range(10)])
 
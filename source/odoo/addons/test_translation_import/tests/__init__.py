@@ -1,3 +1,4 @@
 # -*- coding: utf-8 -*-
 
 from . import test_term_count
+from . import test_import_performance
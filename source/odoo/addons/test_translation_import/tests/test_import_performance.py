@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+import odoo
+from odoo.tests import common
+
+_logger = logging.getLogger(__name__)
+
+PO_HEADER = '''msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\\n"
+
+'''
+
+PO_ENTRY = '''#. module: test_translation_import
+#: code:addons/test_translation_import/models.py:%(index)d
+#, python-format
+msgid "Benchmark term %(index)d\\twith \\\\ escapes"
+msgstr "Terme %(lang)s %(index)d\\n"
+
+'''
+
+
+class TestTranslationImportPerformance(common.TransactionCase):
+
+    def setUp(self):
+        super(TestTranslationImportPerformance, self).setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def make_po_file(self, lang, count):
+        path = os.path.join(self.tmpdir, '%s.po' % lang)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(PO_HEADER)
+            for index in range(count):
+                f.write(PO_ENTRY % {'index': index, 'lang': lang})
+        return path
+
+    def test_import_benchmark(self):
+        count = 5000
+        path = self.make_po_file('fr', count)
+
+        t0 = time.time()
+        odoo.tools.trans_load(self.cr, path, 'fr_FR', module_name='test_translation_import', verbose=False)
+        _logger.info("Imported %d translations in %.3fs", count, time.time() - t0)
+
+        translations = self.env['ir.translation'].search([
+            ('lang', '=', 'fr_FR'),
+            ('type', '=', 'code'),
+            ('src', '=like', 'Benchmark term %'),
+        ])
+        self.assertEqual(len(translations), count)
+
+        # special characters survive the copy into the staging table
+        translation = translations.filtered(lambda t: t.src == 'Benchmark term 42\twith \\ escapes')
+        self.assertEqual(translation.value, 'Terme fr 42\n')
+        self.assertEqual(translation.res_id, 42)
+        self.assertEqual(translation.module, 'test_translation_import')
+
+    def test_parallel_load(self):
+        """ The files are parsed in a pool of processes when they are many. """
+        paths = {lang: self.make_po_file(lang, 100) for lang in ('fr', 'nl', 'de')}
+        langs = ['fr_FR', 'nl_NL', 'de_DE']
+
+        def get_module_terms_files(self, module_name, langs):
+            return [(lang, paths[lang[:2]], False) for lang in langs]
+
+        IrTranslation = type(self.env['ir.translation'])
+        with patch.object(IrTranslation, '_get_module_terms_files', get_module_terms_files), \
+                patch('odoo.addons.base.models.ir_translation.PO_PARALLEL_MIN_FILES', 2), \
+                patch('odoo.addons.base.models.ir_translation.ProcessPoolExecutor',
+                      wraps=odoo.addons.base.models.ir_translation.ProcessPoolExecutor) as executor:
+            self.env['ir.translation']._load_module_terms(['test_translation_import'], langs)
+        self.assertTrue(executor.called)
+        # the processes do not fork the current one
+        self.assertNotEqual(executor.call_args[1]['mp_context'].get_start_method(), 'fork')
+
+        for lang in langs:
+            translations = self.env['ir.translation'].search([
+                ('lang', '=', lang),
+                ('type', '=', 'code'),
+                ('src', '=like', 'Benchmark term %'),
+            ])
+            self.assertEqual(len(translations), 100)
+            self.assertEqual(translations.filtered(lambda t: t.res_id == 42).value, 'Terme %s 42\n' % lang[:2])
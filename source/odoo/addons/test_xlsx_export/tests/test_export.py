@@ -2,12 +2,13 @@
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
 import json
+import tracemalloc
 from datetime import date
 from unittest.mock import patch
 
 from odoo import http
 from odoo.tests import common
-from odoo.addons.web.controllers.main import ExportXlsxWriter
+from odoo.addons.web.controllers.main import CSVExport, ExcelExport, ExportXlsxWriter
 from odoo.addons.test_mail.tests.common import mail_new_test_user
 
 
@@ -368,3 +369,38 @@ class TestGroupedExport(XlsxCreatorCase):
             ['    1000.0 (1)','1000.000'],
             ['3','1000.0'],
         ])
+
+
+class TestExportMemory(common.BaseCase):
+    """ Check that the peak memory of streamed exports does not grow with the
+    number of exported rows.
+    """
+    fields = ['Name', 'Reference', 'Description', 'Quantity']
+
+    def batches(self, row_count, batch_size=1000):
+        for start in range(0, row_count, batch_size):
+            yield [
+                ['Name %d' % index, 'REF%08d' % index, 'Some description text ' * 4, index]
+                for index in range(start, min(start + batch_size, row_count))
+            ]
+
+    def peak_memory(self, exporter, row_count):
+        tracemalloc.start()
+        try:
+            with exporter.from_data_stream(self.fields, self.batches(row_count), row_count) as fp:
+                self.assertTrue(fp.read(4))
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def assertFlatMemory(self, exporter):
+        small = self.peak_memory(exporter, 5000)
+        large = self.peak_memory(exporter, 50000)
+        # ten times more rows must not take much more memory
+        self.assertLess(large, small * 2)
+
+    def test_csv_export_memory(self):
+        self.assertFlatMemory(CSVExport())
+
+    def test_xlsx_export_memory(self):
+        self.assertFlatMemory(ExcelExport())
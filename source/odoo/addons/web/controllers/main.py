@@ -43,7 +43,7 @@ from odoo.tools.safe_eval import safe_eval
 from odoo import http, tools
 from odoo.http import content_disposition, dispatch_rpc, request, serialize_exception as _serialize_exception, Response
 from odoo.exceptions import AccessError, UserError, AccessDenied
-from odoo.models import check_method_name
+from odoo.models import check_method_name, PREFETCH_MAX
 from odoo.service import db, security
 
 _logger = logging.getLogger(__name__)
@@ -727,10 +727,17 @@ class GroupsTreeNode:
 
 class ExportXlsxWriter:
 
-    def __init__(self, field_names, row_count=0):
+    def __init__(self, field_names, row_count=0, output=None):
         self.field_names = field_names
-        self.output = io.BytesIO()
-        self.workbook = xlsxwriter.Workbook(self.output, {'in_memory': True})
+        self.in_memory = output is None
+        if self.in_memory:
+            self.output = io.BytesIO()
+            self.workbook = xlsxwriter.Workbook(self.output, {'in_memory': True})
+        else:
+            # the rows are flushed to temporary files as soon as a new row is
+            # written, which keeps the memory constant whatever the row count
+            self.output = output
+            self.workbook = xlsxwriter.Workbook(self.output, {'constant_memory': True})
         self.base_style = self.workbook.add_format({'text_wrap': True})
         self.header_style = self.workbook.add_format({'bold': True})
         self.header_bold_style = self.workbook.add_format({'text_wrap': True, 'bold': True, 'bg_color': '#e9ecef'})
@@ -738,7 +745,9 @@ class ExportXlsxWriter:
         self.datetime_style = self.workbook.add_format({'text_wrap': True, 'num_format': 'yyyy-mm-dd hh:mm:ss'})
         self.worksheet = self.workbook.add_worksheet()
         self.value = False
+        self.check_row_count(row_count)
 
+    def check_row_count(self, row_count):
         if row_count > self.worksheet.xls_rowmax:
             raise UserError(_('There are too many rows (%s rows, limit: %s) to export as Excel 2007-2013 (.xlsx) format. Consider splitting the export.') % (row_count, self.worksheet.xls_rowmax))
 
@@ -757,8 +766,9 @@ class ExportXlsxWriter:
 
     def close(self):
         self.workbook.close()
-        with self.output:
-            self.value = self.output.getvalue()
+        if self.in_memory:
+            with self.output:
+                self.value = self.output.getvalue()
 
     def write(self, row, column, cell_value, style=None):
         self.worksheet.write(row, column, cell_value, style)
@@ -1406,11 +1416,14 @@ class Binary(http.Controller):
                        filename=None, filename_field='name', unique=None, mimetype=None,
                        download=None, data=None, token=None, access_token=None, **kw):
 
-        status, headers, content = request.env['ir.http'].binary_content(
+        # contents stored in the filestore are streamed from the disk
+        status, headers, content, attachment = request.env['ir.http'].binary_file(
             xmlid=xmlid, model=model, id=id, field=field, unique=unique, filename=filename,
             filename_field=filename_field, download=download, mimetype=mimetype, access_token=access_token)
 
-        if status != 200:
+        if attachment:
+            response = request.env['ir.http']._binary_file_response(status, headers, attachment)
+        elif status != 200:
             return request.env['ir.http']._response_by_status(status, headers, content)
         else:
             content_base64 = base64.b64decode(content)
@@ -1467,6 +1480,8 @@ class Binary(http.Controller):
 
         if status in [301, 304] or (status != 200 and download):
             return request.env['ir.http']._response_by_status(status, headers, image_base64)
+
+        etag = None
         if not image_base64:
             # Since we set a placeholder for any missing image, the status must be 200. In case one
             # wants to configure a specific 404 page (e.g. though nginx), a 404 status will cause
@@ -1475,13 +1490,33 @@ class Binary(http.Controller):
             image_base64 = base64.b64encode(self.placeholder(image=placeholder))
             if not (width or height):
                 width, height = odoo.tools.image_guess_size_from_field_name(field)
+        elif (width or height or quality or crop) and status == 200:
+            # the resized variants of an image are cached in the filestore
+            etag = dict(headers).get('ETag')
 
         try:
-            image_base64 = image_process(image_base64, size=(int(width), int(height)), crop=crop, quality=int(quality))
-        except Exception:
+            width, height, quality = int(width or 0), int(height or 0), int(quality or 0)
+        except ValueError:
             return request.not_found()
 
-        content = base64.b64decode(image_base64)
+        content = None
+        if etag:
+            params = '%s:%s:%s:%s:%s' % (etag, width, height, crop, quality)
+            key = hashlib.sha1(params.encode()).hexdigest()
+            headers = [(k, v) for k, v in headers if k != 'ETag'] + [('ETag', '"%s"' % key)]
+            if request.httprequest.headers.get('If-None-Match') == '"%s"' % key:
+                return request.env['ir.http']._response_by_status(304, headers, None)
+            content = request.env['ir.attachment']._image_cache_get(key)
+
+        if content is None:
+            try:
+                image_base64 = image_process(image_base64, size=(width, height), crop=crop, quality=quality)
+            except Exception:
+                return request.not_found()
+            content = base64.b64decode(image_base64)
+            if etag:
+                request.env['ir.attachment']._image_cache_set(key, content)
+
         headers = http.set_safe_image_headers(headers, content)
         response = request.make_response(content, headers)
         response.status_code = status
@@ -1847,6 +1882,30 @@ class ExportFormat(object):
     def from_group_data(self, fields, groups):
         raise NotImplementedError()
 
+    def from_data_stream(self, fields, batches, row_count):
+        """ Conversion method from Odoo's export data to a temporary file in
+        the current export format
+
+        :params list fields: a list of fields to export
+        :params batches: an iterable of lists of rows to export
+        :params int row_count: the number of records to export
+        :returns: the file, positioned at its beginning
+        """
+        fp = tempfile.TemporaryFile()
+        fp.write(self.from_data(fields, [row for rows in batches for row in rows]))
+        fp.seek(0)
+        return fp
+
+    def export_batches(self, records, field_names):
+        """ Generate the export data of ``records`` by batches of prefetch
+        size, and invalidate the cache after each batch so that the records
+        of a batch are not kept in memory.
+        """
+        for ids in tools.split_every(PREFETCH_MAX, records.ids):
+            batch = records.browse(ids)
+            yield batch.export_data(field_names).get('datas', [])
+            batch.invalidate_cache()
+
     def base(self, data, token):
         params = json.loads(data)
         model, fields, ids, domain, import_compat = \
@@ -1879,8 +1938,16 @@ class ExportFormat(object):
             Model = Model.with_context(import_compat=import_compat)
             records = Model.browse(ids) if ids else Model.search(domain, offset=0, limit=False, order=False)
 
-            export_data = records.export_data(field_names).get('datas',[])
-            response_data = self.from_data(columns_headers, export_data)
+            # the records are exported by batches and written in a temporary
+            # file, which is then streamed to the client
+            batches = self.export_batches(records, field_names)
+            fp = self.from_data_stream(columns_headers, batches, len(records))
+            return request.make_response(werkzeug.wsgi.wrap_file(request.httprequest.environ, fp),
+                headers=[('Content-Disposition',
+                                content_disposition(self.filename(model))),
+                         ('Content-Type', self.content_type),
+                         ('Content-Length', os.fstat(fp.fileno()).st_size)],
+                cookies={'fileToken': token})
 
         return request.make_response(response_data,
             headers=[('Content-Disposition',
@@ -1907,21 +1974,30 @@ class CSVExport(ExportFormat, http.Controller):
 
     def from_data(self, fields, rows):
         fp = io.BytesIO()
+        self._write_data(fp, fields, [rows])
+        return fp.getvalue()
+
+    def from_data_stream(self, fields, batches, row_count):
+        fp = tempfile.TemporaryFile()
+        self._write_data(fp, fields, batches)
+        fp.seek(0)
+        return fp
+
+    def _write_data(self, fp, fields, batches):
         writer = pycompat.csv_writer(fp, quoting=1)
 
         writer.writerow(fields)
 
-        for data in rows:
-            row = []
-            for d in data:
-                # Spreadsheet apps tend to detect formulas on leading =, + and -
-                if isinstance(d, str) and d.startswith(('=', '-', '+')):
-                    d = "'" + d
-
-                row.append(pycompat.to_text(d))
-            writer.writerow(row)
+        for rows in batches:
+            for data in rows:
+                row = []
+                for d in data:
+                    # Spreadsheet apps tend to detect formulas on leading =, + and -
+                    if isinstance(d, str) and d.startswith(('=', '-', '+')):
+                        d = "'" + d
 
-        return fp.getvalue()
+                    row.append(pycompat.to_text(d))
+                writer.writerow(row)
 
 class ExcelExport(ExportFormat, http.Controller):
 
@@ -1947,14 +2023,33 @@ class ExcelExport(ExportFormat, http.Controller):
 
     def from_data(self, fields, rows):
         with ExportXlsxWriter(fields, len(rows)) as xlsx_writer:
-            for row_index, row in enumerate(rows):
-                for cell_index, cell_value in enumerate(row):
-                    if isinstance(cell_value, (list, tuple)):
-                        cell_value = pycompat.to_text(cell_value)
-                    xlsx_writer.write_cell(row_index + 1, cell_index, cell_value)
+            self._write_rows(xlsx_writer, rows)
 
         return xlsx_writer.value
 
+    def from_data_stream(self, fields, batches, row_count):
+        fp = tempfile.TemporaryFile()
+        with ExportXlsxWriter(fields, row_count, output=fp) as xlsx_writer:
+            row_index = 0
+            for rows in batches:
+                # one2many values may produce several rows per record
+                xlsx_writer.check_row_count(row_index + len(rows))
+                row_index = self._write_rows(xlsx_writer, rows, row_index)
+        fp.seek(0)
+        return fp
+
+    def _write_rows(self, xlsx_writer, rows, row_index=0):
+        """ Write ``rows`` after the row ``row_index``, and return the index
+        of the last written row.
+        """
+        for row in rows:
+            row_index += 1
+            for cell_index, cell_value in enumerate(row):
+                if isinstance(cell_value, (list, tuple)):
+                    cell_value = pycompat.to_text(cell_value)
+                xlsx_writer.write_cell(row_index, cell_index, cell_value)
+        return row_index
+
 
 class ReportController(http.Controller):
 
@@ -2078,6 +2173,21 @@ class ReportController(http.Controller):
             }
             return request.make_response(html_escape(json.dumps(error)))
 
+    @http.route(['/report/enqueue'], type='json', auth="user")
+    def report_enqueue(self, reportname, docids=None, data=None, context=None):
+        """This function is used by 'action_manager_report.js' in order to queue the
+        generation of a report flagged to be generated in background.
+
+        :param reportname: the report_name of the report
+        :param docids: ids of the records to print
+        :param data: optional data given to the report
+        :returns: the id of the queued ir.actions.report.job
+        """
+        report = request.env['ir.actions.report'].with_context(context or {})._get_report_from_name(reportname)
+        if not report:
+            raise werkzeug.exceptions.NotFound()
+        return report._enqueue(docids or [], data=data).id
+
     @http.route(['/report/check_wkhtmltopdf'], type='json', auth="user")
     def check_wkhtmltopdf(self):
         return request.env['ir.actions.report'].get_wkhtmltopdf_state()
@@ -72,6 +72,36 @@ ActionManager.include({
         });
     },
 
+    /**
+     * Queues the generation of a report flagged to be generated in background.
+     * The user is notified once the document is ready.
+     *
+     * @private
+     * @param {Object} action the description of the action to execute
+     * @param {Object} options @see doAction for details
+     * @returns {Promise} resolved when the report has been queued
+     */
+    _enqueueReport: function (action, options) {
+        var self = this;
+        return this._rpc({
+            route: '/report/enqueue',
+            params: {
+                reportname: action.report_name,
+                docids: action.context && action.context.active_ids,
+                data: action.data,
+                context: _.extend({}, session.user_context, action.context),
+            },
+        }).then(function () {
+            self.do_notify(_t('Report'), _t('Your report is being generated. You will be ' +
+                                            'notified as soon as it is ready.'));
+            if (action.close_on_report_download) {
+                var closeAction = { type: 'ir.actions.act_window_close' };
+                return self.doAction(closeAction, _.pick(options, 'on_close'));
+            } else {
+                return options.on_close();
+            }
+        });
+    },
     /**
      * Launch download action of the report
      *
@@ -82,6 +112,9 @@ ActionManager.include({
      */
     _triggerDownload: function (action, options, type){
         var self = this;
+        if (action.background) {
+            return this._enqueueReport(action, options);
+        }
         var reportUrls = this._makeReportUrls(action);
         return this._downloadReport(reportUrls[type]).then(function () {
             if (action.close_on_report_download) {
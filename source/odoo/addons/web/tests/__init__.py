@@ -2,6 +2,7 @@
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
 from . import test_image
+from . import test_binary_content
 from . import test_js
 from . import test_menu
 from . import test_serving_base
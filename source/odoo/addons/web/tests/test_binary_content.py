@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+
+import base64
+from unittest.mock import patch
+
+from odoo.tests.common import HttpCase
+from odoo.tools import config
+
+
+class TestBinaryContent(HttpCase):
+
+    def setUp(self):
+        super(TestBinaryContent, self).setUp()
+        self.content = bytes(range(256)) * 1024
+        self.attachment = self.env['ir.attachment'].create({
+            'datas': base64.b64encode(self.content),
+            'name': 'test_binary_content.bin',
+            'public': True,
+            'mimetype': 'application/octet-stream',
+        })
+        self.assertTrue(self.attachment.store_fname, "the attachment should be stored in the filestore")
+        self.url = '/web/content/%s' % self.attachment.id
+
+    def test_01_stream_file(self):
+        response = self.url_open(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.content)
+        self.assertEqual(response.headers['Content-Length'], str(len(self.content)))
+        self.assertEqual(response.headers['ETag'].strip('"'), self.attachment.checksum)
+
+        response = self.url_open(self.url + '?download=true')
+        self.assertIn('test_binary_content.bin', response.headers['Content-Disposition'])
+
+        response = self.url_open(self.url, headers={'If-None-Match': self.attachment.checksum})
+        self.assertEqual(response.status_code, 304)
+
+    def test_02_range(self):
+        response = self.url_open(self.url, headers={'Range': 'bytes=1000-1999'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, self.content[1000:2000])
+        self.assertEqual(response.headers['Content-Range'], 'bytes 1000-1999/%s' % len(self.content))
+
+    def test_03_x_sendfile(self):
+        full_path = self.attachment._full_path(self.attachment.store_fname)
+        with patch.dict(config.options, {'x_sendfile': 'x-sendfile'}):
+            response = self.url_open(self.url)
+        self.assertEqual(response.headers['X-Sendfile'], full_path)
+        self.assertFalse(response.content)
+
+        with patch.dict(config.options, {'x_sendfile': 'x-accel'}):
+            response = self.url_open(self.url)
+        self.assertEqual(
+            response.headers['X-Accel-Redirect'],
+            '/web/filestore/%s/%s' % (self.env.cr.dbname, self.attachment.store_fname),
+        )
+
+    def test_04_database_content(self):
+        """ Contents stored in the database are served after a single check. """
+        self.env['ir.config_parameter'].sudo().set_param('ir_attachment.location', 'db')
+        attachment = self.env['ir.attachment'].create({
+            'datas': base64.b64encode(self.content),
+            'name': 'test_binary_content.bin',
+            'public': True,
+        })
+        self.assertFalse(attachment.store_fname)
+
+        IrHttp = type(self.env['ir.http'])
+        get_record_and_check = IrHttp._get_record_and_check
+        checks = []
+
+        def _get_record_and_check(self, *args, **kwargs):
+            checks.append(kwargs.get('id'))
+            return get_record_and_check(self, *args, **kwargs)
+
+        self.patch(IrHttp, '_get_record_and_check', _get_record_and_check)
+        response = self.url_open('/web/content/%s' % attachment.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.content)
+        self.assertEqual(len(checks), 1)
+
+        response = self.url_open('/web/content/%s' % (attachment.id + 1000000))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(len(checks), 2)
+
+    def test_05_mimetype(self):
+        """ The given mimetype is used when the attachment has none. """
+        self.cr.execute("UPDATE ir_attachment SET mimetype = NULL WHERE id = %s", [self.attachment.id])
+        self.attachment.invalidate_cache(['mimetype'])
+        response = self.url_open(self.url + '?mimetype=text/plain')
+        self.assertEqual(response.headers['Content-Type'].split(';')[0], 'text/plain')
@@ -57,3 +57,37 @@ class TestImage(HttpCase):
         response2 = self.url_open('/web/image/%s' % attachment.id, headers={"If-None-Match": etag})
         self.assertEqual(response2.status_code, 304)
         self.assertEqual(len(response2.content), 0)
+
+    def test_03_content_image_resize_cache(self):
+        """Resized variants of an image are served from the filestore cache."""
+        image = Image.new('RGB', (400, 300), color='red')
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG')
+        attachment = self.env['ir.attachment'].create({
+            'datas': base64.b64encode(buffer.getvalue()),
+            'name': 'testCache.png',
+            'public': True,
+            'mimetype': 'image/png',
+        })
+
+        response = self.url_open('/web/image/%s/200x150' % attachment.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Image.open(io.BytesIO(response.content)).size, (200, 150))
+        etag = response.headers.get('ETag')
+        self.assertNotEqual(etag, attachment.checksum)
+        key = etag.strip('"')
+        self.assertEqual(self.env['ir.attachment']._image_cache_get(key), response.content)
+
+        # the variant is served from the cache
+        self.env['ir.attachment']._image_cache_set(key, b'cached')
+        response = self.url_open('/web/image/%s/200x150' % attachment.id)
+        self.assertEqual(response.content, b'cached')
+        self.assertEqual(response.headers.get('ETag'), etag)
+
+        # another variant has another key
+        response = self.url_open('/web/image/%s/100x75' % attachment.id)
+        self.assertEqual(Image.open(io.BytesIO(response.content)).size, (100, 75))
+        self.assertNotEqual(response.headers.get('ETag'), etag)
+
+        response = self.url_open('/web/image/%s/200x150' % attachment.id, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
@@ -319,10 +319,8 @@ class Http(models.AbstractModel):
             return env['ir.ui.view'].render_template(values['force_template'], values)
         return super(Http, cls)._get_error_html(env, code, values)
 
-    def binary_content(self, xmlid=None, model='ir.attachment', id=None, field='datas',
-                       unique=False, filename=None, filename_field='name', download=False,
-                       mimetype=None, default_mimetype='application/octet-stream',
-                       access_token=None):
+    def _binary_published_sudo(self, xmlid=None, model='ir.attachment', id=None):
+        """ Return ``self`` as superuser if the requested record is published. """
         obj = None
         if xmlid:
             obj = self._xmlid_to_obj(self.env, xmlid)
@@ -330,12 +328,29 @@ class Http(models.AbstractModel):
             obj = self.env[model].browse(int(id))
         if obj and 'website_published' in obj._fields:
             if self.env[obj._name].sudo().search([('id', '=', obj.id), ('website_published', '=', True)]):
-                self = self.sudo()
+                return self.sudo()
+        return self
+
+    def binary_content(self, xmlid=None, model='ir.attachment', id=None, field='datas',
+                       unique=False, filename=None, filename_field='name', download=False,
+                       mimetype=None, default_mimetype='application/octet-stream',
+                       access_token=None):
+        self = self._binary_published_sudo(xmlid=xmlid, model=model, id=id)
         return super(Http, self).binary_content(
             xmlid=xmlid, model=model, id=id, field=field, unique=unique, filename=filename,
             filename_field=filename_field, download=download, mimetype=mimetype,
             default_mimetype=default_mimetype, access_token=access_token)
 
+    def binary_file(self, xmlid=None, model='ir.attachment', id=None, field='datas',
+                    unique=False, filename=None, filename_field='name', download=False,
+                    mimetype=None, default_mimetype='application/octet-stream',
+                    access_token=None):
+        self = self._binary_published_sudo(xmlid=xmlid, model=model, id=id)
+        return super(Http, self).binary_file(
+            xmlid=xmlid, model=model, id=id, field=field, unique=unique, filename=filename,
+            filename_field=filename_field, download=download, mimetype=mimetype,
+            default_mimetype=default_mimetype, access_token=access_token)
+
     @classmethod
     def _xmlid_to_obj(cls, env, xmlid):
         website_id = env['website'].get_current_website()
@@ -351,6 +366,24 @@ class Http(models.AbstractModel):
 
         return super(Http, cls)._xmlid_to_obj(env, xmlid)
 
+    @api.model
+    def _warmup_contexts(self):
+        contexts = super(Http, self)._warmup_contexts()
+        for website in self.env['website'].search([]):
+            # same context as _add_dispatch_parameters() for anonymous visitors
+            user = website.user_id
+            if website.company_id in user.company_ids:
+                company_ids = website.company_id.ids
+            else:
+                company_ids = user.company_id.ids
+            for lang in website.language_ids:
+                contexts.append((user.id, {
+                    'lang': lang.code,
+                    'website_id': website.id,
+                    'allowed_company_ids': company_ids,
+                }))
+        return contexts
+
     @api.model
     def get_frontend_session_info(self):
         session_info = super(Http, self).get_frontend_session_info()
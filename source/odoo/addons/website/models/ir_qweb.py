@@ -44,6 +44,15 @@ class QWeb(models.AbstractModel):
     def get_asset_bundle(self, xmlid, files, env=None):
         return AssetsBundleMultiWebsite(xmlid, files, env=env)
 
+    def _get_asset_build_contexts(self):
+        # the bundles of each website have their own urls and custom assets
+        contexts = super(QWeb, self)._get_asset_build_contexts()
+        return contexts + [
+            dict(context, website_id=website.id)
+            for website in self.env['website'].search([])
+            for context in contexts
+        ]
+
     def _post_processing_att(self, tagName, atts, options):
         if atts.get('data-no-post-process'):
             return atts
@@ -267,13 +267,13 @@ class View(models.Model):
 
         get_inheriting_self = self.with_context(active_test=False)
         if self.pool._init and not self._context.get('load_all_views'):
-            view = self.browse(view_id)
-            if view.website_id:
+            check_view_ids = list(self._context.get('check_view_ids') or ())
+            for view in self.browse(view_id).filtered('website_id'):
                 original_view = view._get_original_view()
                 original_keys = self.with_context(website_id=False)._get_inheriting_views(original_view.id, model).mapped('key')
                 specific_views = self.search([('key', 'in', original_keys), ('website_id', '=', self._context.get('website_id'))])
-                check_view_ids = list(self._context.get('check_view_ids') or ()) + specific_views.ids
-                get_inheriting_self = self.with_context(check_view_ids=check_view_ids)
+                check_view_ids += specific_views.ids
+            get_inheriting_self = self.with_context(check_view_ids=check_view_ids)
         inheriting_views = super(View, get_inheriting_self).get_inheriting_views_arch(view_id, model)
 
         # prefer inactive website-specific views over active generic ones
@@ -282,7 +282,7 @@ class View(models.Model):
         return [(view.arch, view.id) for view in inheriting_views]
 
     @api.model
-    @tools.ormcache_context('self.env.uid', 'self.env.su', 'xml_id', keys=('website_id',))
+    @tools.ormcache_context('self.env.uid', 'self.env.su', 'xml_id', keys=('website_id',), cache='templates')
     def get_view_id(self, xml_id):
         """If a website_id is in the context and the given xml_id is not an int
         then try to get the id of the specific view for that website, but
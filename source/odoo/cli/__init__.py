@@ -6,6 +6,7 @@ import odoo
 
 from .command import Command, main
 
+from . import assets
 from . import cloc
 from . import deploy
 from . import scaffold
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+# Part of Odoo. See LICENSE file for full copyright and licensing details.
+import sys
+
+import odoo
+from odoo.tools import config
+from . import Command
+
+
+class Assets(Command):
+    """Build the asset bundles of databases"""
+
+    def run(self, args):
+        config.parse_config(args)
+        if not config['db_name']:
+            sys.exit("No database given, use `%s assets -d dbname`." % sys.argv[0])
+        odoo.cli.server.report_configuration()
+
+        with odoo.api.Environment.manage():
+            for db_name in config['db_name'].split(','):
+                registry = odoo.registry(db_name)
+                with registry.cursor() as cr:
+                    env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {})
+                    env['ir.qweb']._prebuild_asset_bundles()
@@ -156,6 +156,13 @@ class Field(MetaField('DummyField', (object,), {})):
     :param bool store: whether the field is stored in database
         (default:``True``, ``False`` for computed fields)
 
+    :param prefetch: whether the field is prefetched together with the other
+        fields of the model when one of them is fetched (default: ``True``
+        for stored column fields); ``False`` means that the field is only
+        read when accessed, and a string names a prefetch group: the field is
+        then fetched together with the fields of the same group only.
+    :type prefetch: bool or str
+
     :param str group_operator: aggregate function used by :meth:`~odoo.models.Model.read_group`
         when grouping on this field.
 
@@ -254,7 +261,7 @@ class Field(MetaField('DummyField', (object,), {})):
         'related_field': None,          # corresponding related field
         'group_operator': None,         # operator for aggregating values
         'group_expand': None,           # name of method to expand groups in read_group()
-        'prefetch': True,               # whether the field is prefetched
+        'prefetch': True,               # whether the field is prefetched, or its prefetch group
     }
 
     def __init__(self, string=Default, **kwargs):
@@ -3392,20 +3399,19 @@ class Many2many(_RelationalMulti):
         comodel._flush_search(domain)
         wquery = comodel._where_calc(domain)
         comodel._apply_ir_rules(wquery, 'read')
-        order_by = comodel._generate_order_by(None, wquery)
-        from_c, where_c, where_params = wquery.get_sql()
-        query = """ SELECT {rel}.{id1}, {rel}.{id2} FROM {rel}, {from_c}
-                    WHERE {where_c} AND {rel}.{id1} IN %s AND {rel}.{id2} = {tbl}.id
-                    {order_by} {limit} OFFSET {offset}
-                """.format(rel=self.relation, id1=self.column1, id2=self.column2,
-                           tbl=comodel._table, from_c=from_c, where_c=where_c or '1=1',
-                           limit=(' LIMIT %d' % self.limit) if self.limit else '',
-                           offset=0, order_by=order_by)
-        where_params.append(tuple(records.ids))
+        order_by = ','.join(comodel._generate_order_by_inner(comodel._table, comodel._order, wquery)) if comodel._order else ''
+        wquery.add_tables(['"%s"' % self.relation])
+        wquery.add_where('"%s"."%s" IN %%s' % (self.relation, self.column1), [tuple(records.ids)])
+        wquery.add_where('"%s"."%s" = "%s".id' % (self.relation, self.column2, comodel._table))
+        query, params = wquery.select(
+            '"%s"."%s"' % (self.relation, self.column1),
+            '"%s"."%s"' % (self.relation, self.column2),
+            order_by=order_by, limit=self.limit,
+        )
 
         # retrieve lines and group them by record
         group = defaultdict(list)
-        records._cr.execute(query, where_params)
+        records._cr.execute(query, params)
         for row in records._cr.fetchall():
             group[row[0]].append(row[1])
 
@@ -3464,6 +3470,10 @@ class Many2many(_RelationalMulti):
             for ys1 in new_relation.values():
                 ys1 -= ys
 
+        # lines to create for all records, when creating them: they appear in
+        # records_commands_list only once, so their lines can be created last
+        all_to_create = []
+
         for recs, commands in records_commands_list:
             to_create = []  # line vals to create
             to_delete = []  # line ids to delete
@@ -3485,7 +3495,9 @@ class Many2many(_RelationalMulti):
                     to_create = [(set(ids) - set(recs._ids), vals) for (ids, vals) in to_create]
                     relation_set(recs._ids, command[2] if command[0] == 6 else ())
 
-            if to_create:
+            if to_create and create:
+                all_to_create.extend(to_create)
+            elif to_create:
                 # create lines in batch, and link them
                 lines = comodel.create([vals for ids, vals in to_create])
                 for line, (ids, vals) in zip(lines, to_create):
@@ -3496,6 +3508,12 @@ class Many2many(_RelationalMulti):
                 comodel.browse(to_delete).unlink()
                 relation_delete(to_delete)
 
+        if all_to_create:
+            # create the lines of all records in batch, and link them
+            lines = comodel.create([vals for ids, vals in all_to_create])
+            for line, (ids, vals) in zip(lines, all_to_create):
+                relation_add(ids, line.id)
+
         # update the cache of self
         cache = records.env.cache
         for record in records:
@@ -5,6 +5,7 @@
 import ast
 import collections
 import contextlib
+import copy
 import datetime
 import functools
 import hashlib
@@ -13,6 +14,7 @@ import inspect
 import logging
 import mimetypes
 import os
+import pickle
 import pprint
 import random
 import re
@@ -50,6 +52,7 @@ from .service.server import memory_info
 from .service import security, model as service_model
 from .sql_db import flush_env
 from .tools.func import lazy_property
+from .tools.lru import LRU
 from .tools import ustr, consteq, frozendict, pycompat, unique, date_utils
 from .tools.mimetypes import guess_mimetype
 
@@ -1154,17 +1157,135 @@ class OpenERPSession(werkzeug.contrib.sessions.Session):
                     pass
 
 
+# we keep session one week
+SESSION_LIFETIME = 60*60*24*7
+
+
 def session_gc(session_store):
     if random.random() < 0.001:
-        # we keep session one week
-        last_week = time.time() - 60*60*24*7
-        for fname in os.listdir(session_store.path):
-            path = os.path.join(session_store.path, fname)
+        session_store.gc()
+
+
+def _remove_stale_files(path):
+    """ Remove the files in directory ``path`` that were not modified since
+    :data:`SESSION_LIFETIME` seconds.
+    """
+    last_week = time.time() - SESSION_LIFETIME
+    for fname in os.listdir(path):
+        fpath = os.path.join(path, fname)
+        try:
+            if os.path.getmtime(fpath) < last_week:
+                os.unlink(fpath)
+        except OSError:
+            pass
+
+
+class FilesystemSessionStore(werkzeug.contrib.sessions.FilesystemSessionStore):
+    """ Session store keeping one file per session in the sessions directory. """
+
+    def gc(self):
+        """ Remove the sessions and request data files that were not saved
+        since :data:`SESSION_LIFETIME` seconds.
+        """
+        _remove_stale_files(self.path)
+
+
+class PostgreSQLSessionStore(werkzeug.contrib.sessions.SessionStore):
+    """ Session store keeping the sessions in the table ``http_session`` of a
+    dedicated database, shared by all the workers and servers using it.
+
+    Every worker keeps the sessions it recently read or saved in memory,
+    together with their version number: reading an unchanged session only
+    checks its version in the database, and copies the cached session
+    instead of transferring and unpickling its data again.
+
+    The files of the requests saved in sessions are still stored in the
+    directory ``path``, like with :class:`FilesystemSessionStore`.
+    """
+    cache_size = 4096
+
+    def __init__(self, db_name, path, session_class=None, renew_missing=False):
+        super(PostgreSQLSessionStore, self).__init__(session_class)
+        self.db_name = db_name
+        self.path = path
+        self.renew_missing = renew_missing
+        self.cache = LRU(self.cache_size)       # {sid: (version, session data)}
+        with self.cursor() as cr:
+            cr.execute("""
+                CREATE TABLE IF NOT EXISTS http_session (
+                    sid VARCHAR PRIMARY KEY,
+                    version INTEGER NOT NULL DEFAULT 1,
+                    write_date TIMESTAMP NOT NULL DEFAULT (now() at time zone 'UTC'),
+                    data BYTEA NOT NULL
+                )
+            """)
+            cr.execute("CREATE INDEX IF NOT EXISTS http_session_write_date_index ON http_session (write_date)")
+
+    def cursor(self):
+        return odoo.sql_db.db_connect(self.db_name, allow_uri=True).cursor()
+
+    def save(self, session):
+        values = copy.deepcopy(dict(session))
+        data = pickle.dumps(values, pickle.HIGHEST_PROTOCOL)
+        with self.cursor() as cr:
+            cr.execute("""
+                INSERT INTO http_session (sid, data) VALUES (%s, %s)
+                ON CONFLICT (sid) DO UPDATE
+                SET data = EXCLUDED.data,
+                    version = http_session.version + 1,
+                    write_date = now() at time zone 'UTC'
+                RETURNING version
+            """, [session.sid, psycopg2.Binary(data)])
+            version = cr.fetchone()[0]
+        self.cache[session.sid] = (version, values)
+
+    def delete(self, session):
+        self._uncache(session.sid)
+        with self.cursor() as cr:
+            cr.execute("DELETE FROM http_session WHERE sid = %s", [session.sid])
+
+    def _uncache(self, sid):
+        try:
+            del self.cache[sid]
+        except KeyError:
+            pass
+
+    def get(self, sid):
+        if not self.is_valid_key(sid):
+            return self.new()
+        version, values = self.cache.get(sid, (0, None))
+        with self.cursor() as cr:
+            # only fetch the data if the session changed since it was cached
+            cr.execute("""
+                SELECT version, CASE WHEN version = %s THEN NULL ELSE data END
+                FROM http_session WHERE sid = %s
+            """, [version, sid])
+            row = cr.fetchone()
+        if row is None:
+            self._uncache(sid)
+            if self.renew_missing:
+                return self.new()
+            return self.session_class({}, sid, False)
+        if row[1] is not None:
             try:
-                if os.path.getmtime(path) < last_week:
-                    os.unlink(path)
-            except OSError:
-                pass
+                values = pickle.loads(bytes(row[1]))
+            except Exception:
+                self._uncache(sid)
+                return self.session_class({}, sid, False)
+            self.cache[sid] = (row[0], values)
+        # the request may modify the session in place, keep the cache intact
+        return self.session_class(copy.deepcopy(values), sid, False)
+
+    def gc(self):
+        """ Remove the sessions that were not saved since
+        :data:`SESSION_LIFETIME` seconds, and the stale request data files.
+        """
+        with self.cursor() as cr:
+            cr.execute("""
+                DELETE FROM http_session
+                WHERE write_date < (now() at time zone 'UTC') - %s * interval '1 second'
+            """, [SESSION_LIFETIME])
+        _remove_stale_files(self.path)
 
 #----------------------------------------------------------
 # WSGI Layer
@@ -1266,8 +1387,15 @@ class Root(object):
     def session_store(self):
         # Setup http sessions
         path = odoo.tools.config.session_dir
+        if odoo.tools.config['session_store'] == 'postgresql':
+            db_name = odoo.tools.config['session_db']
+            if not db_name:
+                raise ValueError("The option session_db is required to store the sessions in PostgreSQL")
+            _logger.debug('HTTP sessions stored in database: %s', db_name)
+            return PostgreSQLSessionStore(
+                db_name, path, session_class=OpenERPSession, renew_missing=True)
         _logger.debug('HTTP sessions stored in: %s', path)
-        return werkzeug.contrib.sessions.FilesystemSessionStore(
+        return FilesystemSessionStore(
             path, session_class=OpenERPSession, renew_missing=True)
 
     @lazy_property
@@ -56,7 +56,7 @@ from .tools import frozendict, lazy_classproperty, lazy_property, ormcache, \
                    groupby
 from .tools.config import config
 from .tools.func import frame_codeinfo
-from .tools.misc import CountingStream, clean_context, DEFAULT_SERVER_DATETIME_FORMAT, DEFAULT_SERVER_DATE_FORMAT, get_lang
+from .tools.misc import CountingStream, clean_context, DEFAULT_SERVER_DATETIME_FORMAT, DEFAULT_SERVER_DATE_FORMAT, get_lang, split_every
 from .tools.safe_eval import safe_eval
 from .tools.translate import _
 from .tools import date_utils
@@ -238,6 +238,18 @@ IdType = (int, str, NewId)
 # maximum number of prefetched records
 PREFETCH_MAX = 1000
 
+# estimated maximum number of bytes fetched by a single prefetching query
+PREFETCH_BYTES_MAX = 4 * 1024 * 1024
+
+# column types whose values have a variable width
+VARIABLE_WIDTH_TYPES = ('varchar', 'text', 'bytea')
+
+# number of values measured by a read to estimate the width of such columns
+READ_STATS_SAMPLE = 10
+
+# maximum number of records inserted by a single query
+INSERT_BATCH_SIZE = 100
+
 # special columns automatically created by the ORM
 LOG_ACCESS_COLUMNS = ['create_uid', 'create_date', 'write_uid', 'write_date']
 MAGIC_COLUMNS = ['id'] + LOG_ACCESS_COLUMNS
@@ -2288,36 +2300,22 @@ class BaseModel(MetaModel('DummyModel', (object,), {'_register': False})):
         self._flush_search(domain, fields=fnames + groupby_fields)
 
         groupby_terms, orderby_terms = self._read_group_prepare(order, aggregated_fields, annotated_groupbys, query)
-        from_clause, where_clause, where_clause_params = query.get_sql()
         if lazy and (len(groupby_fields) >= 2 or not self._context.get('group_by_no_leaf')):
             count_field = groupby_fields[0] if len(groupby_fields) >= 1 else '_'
         else:
             count_field = '_'
         count_field += '_count'
 
-        prefix_terms = lambda prefix, terms: (prefix + " " + ",".join(terms)) if terms else ''
-        prefix_term = lambda prefix, term: ('%s %s' % (prefix, term)) if term else ''
-
-        query = """
-            SELECT min("%(table)s".id) AS id, count("%(table)s".id) AS "%(count_field)s" %(extra_fields)s
-            FROM %(from)s
-            %(where)s
-            %(groupby)s
-            %(orderby)s
-            %(limit)s
-            %(offset)s
-        """ % {
-            'table': self._table,
-            'count_field': count_field,
-            'extra_fields': prefix_terms(',', select_terms),
-            'from': from_clause,
-            'where': prefix_term('WHERE', where_clause),
-            'groupby': prefix_terms('GROUP BY', groupby_terms),
-            'orderby': prefix_terms('ORDER BY', orderby_terms),
-            'limit': prefix_term('LIMIT', int(limit) if limit else None),
-            'offset': prefix_term('OFFSET', int(offset) if limit else None),
-        }
-        self._cr.execute(query, where_clause_params)
+        query_str, params = query.select(
+            'min("%s".id) AS id' % self._table,
+            'count("%s".id) AS "%s"' % (self._table, count_field),
+            *select_terms,
+            group_by=",".join(groupby_terms),
+            order_by=",".join(orderby_terms),
+            limit=int(limit) if limit else None,
+            offset=int(offset) if limit and offset else None,
+        )
+        self._cr.execute(query_str, params)
         fetched_data = self._cr.dictfetchall()
 
         if not groupby_fields:
@@ -2987,8 +2985,8 @@ Fields:
             fnames = [
                 name
                 for name, f in self._fields.items()
-                # select fields that can be prefetched
-                if f.prefetch
+                # select fields that are prefetched with field
+                if f.prefetch == field.prefetch
                 # discard fields with groups that the user may not access
                 if not (f.groups and not self.user_has_groups(f.groups))
                 # discard fields that must be recomputed
@@ -2997,10 +2995,30 @@ Fields:
             if field.name not in fnames:
                 fnames.append(field.name)
                 self = self - self.env.records_to_compute(field)
+            # limit the amount of data fetched from wide columns; the first
+            # record is the one being accessed, and is therefore kept
+            limit = self._prefetch_limit(fnames)
+            if len(self) > limit:
+                self = self[:limit]
         else:
             fnames = [field.name]
         self._read(fnames)
 
+    def _prefetch_limit(self, fnames):
+        """ Return the number of records of which the fields ``fnames`` can be
+            fetched in a single query, given the average width of their values
+            observed by previous reads.
+        """
+        stats = self.pool.read_stats
+        width = 0
+        for fname in fnames:
+            rows, size = stats.get((self._name, fname), (0, 0))
+            if rows:
+                width += size / rows
+        if width * PREFETCH_MAX <= PREFETCH_BYTES_MAX:
+            return PREFETCH_MAX
+        return max(1, int(PREFETCH_BYTES_MAX / width))
+
     def _read(self, fields):
         """ Read the given fields of the records in ``self`` from the database,
             and store them in cache. Access errors are also stored in cache.
@@ -3069,7 +3087,8 @@ Fields:
             param_pos = params.index(param_ids)
 
             result = []
-            for sub_ids in cr.split_for_in_conditions(self.ids):
+            limit = self._prefetch_limit([field.name for field in fields_pre])
+            for sub_ids in cr.split_for_in_conditions(self.ids, limit):
                 params[param_pos] = tuple(sub_ids)
                 cr.execute(query_str, params)
                 result += cr.fetchall()
@@ -3082,9 +3101,21 @@ Fields:
             cols = zip(*result)
             ids = next(cols)
             fetched = self.browse(ids)
+            stats = self.pool.read_stats
 
             for field in fields_pre:
                 values = next(cols)
+                if field.base_field.column_type[0] in VARIABLE_WIDTH_TYPES:
+                    # estimate the amount of data fetched for the field, in
+                    # bytes, from a sample of its values
+                    sample = values[:READ_STATS_SAMPLE]
+                    size = sum(
+                        len(value.encode()) if isinstance(value, str) else len(value)
+                        for value in sample if value
+                    )
+                    stat = stats[self._name, field.name]
+                    stat[0] += len(values)
+                    stat[1] += size * len(values) // len(sample)
                 if context.get('lang') and not field.inherited and callable(field.translate):
                     translate = field.get_trans_func(fetched)
                     values = list(values)
@@ -3721,6 +3752,75 @@ Fields:
 
         return True
 
+    def _write_multi(self, vals_list):
+        """ Low-level implementation of writing ``vals_list[i]`` on ``self[i]``
+        for every ``i``. The dicts in ``vals_list`` must have the same keys.
+        The records are updated with a query per chunk of records, whatever
+        their values are.
+        """
+        if not self:
+            return True
+
+        fnames = set(vals_list[0])
+        if (type(self)._write is not BaseModel._write
+                or (self._parent_store and self._parent_name in fnames)
+                or (self._log_access and not fnames.isdisjoint(('create_uid', 'create_date')))):
+            # those require the specific processing of _write()
+            updates = defaultdict(list)
+            for record, vals in zip(self, vals_list):
+                updates[frozendict(vals)].append(record.id)
+            for vals, ids in updates.items():
+                self.browse(ids)._write(vals)
+            return True
+
+        self._check_concurrency()
+        cr = self._cr
+
+        # determine SQL columns: list of (column_name, format)
+        columns = []
+        for name in vals_list[0]:
+            field = self._fields[name]
+            assert field.store
+            if field.deprecated:
+                _logger.warning('Field %s is deprecated: %s', field, field.deprecated)
+            assert field.column_type
+            # values are typed explicitly, as they may be NULL in every row
+            columns.append((name, '%s::%s' % (field.column_format, field.column_type[0])))
+
+        if self._log_access:
+            for name, column_format in (('write_uid', '%s::int4'), ('write_date', '%s::timestamp')):
+                if name not in fnames:
+                    columns.append((name, column_format))
+
+        def row_params(record_id, vals):
+            params = [record_id]
+            for name, column_format in columns:
+                val = vals.get(name)
+                if not val and name == 'write_uid':
+                    val = self._uid
+                elif not val and name == 'write_date':
+                    val = AsIs("(now() at time zone 'UTC')")
+                params.append(val)
+            return params
+
+        row_format = '(%%s, %s)' % ', '.join(column[1] for column in columns)
+        query_format = 'UPDATE "{table}" SET {assignments} FROM (VALUES {{rows}}) AS "__vals"(id, {names}) WHERE "{table}".id = "__vals".id'.format(
+            table=self._table,
+            assignments=','.join('"{0}"="__vals"."{0}"'.format(column[0]) for column in columns),
+            names=','.join('"%s"' % column[0] for column in columns),
+        )
+        id_vals = dict(zip(self._ids, vals_list))
+        for sub_ids in cr.split_for_in_conditions(id_vals):
+            params = [param for rid in sub_ids for param in row_params(rid, id_vals[rid])]
+            cr.execute(query_format.format(rows=','.join([row_format] * len(sub_ids))), params)
+            if cr.rowcount != len(sub_ids):
+                raise MissingError(
+                    _('One of the records you are trying to modify has already been deleted (Document type: %s).') % self._description
+                    + '\n\n({} {}, {} {})'.format(_('Records:'), sub_ids[:6], _('User:'), self._uid)
+                )
+
+        return True
+
     @api.model_create_multi
     @api.returns('self', lambda value: value.id)
     def create(self, vals_list):
@@ -3885,6 +3985,7 @@ Fields:
             columns0.append(('write_uid', "%s", self._uid))
             columns0.append(('write_date', "%s", AsIs("(now() at time zone 'UTC')")))
 
+        rows = []                       # columns of each record
         for data in data_list:
             # determine column values
             stored = data['stored']
@@ -3900,36 +4001,26 @@ Fields:
                         translated_fields.add(field)
                 else:
                     other_fields.add(field)
-
-            # Insert rows one by one
-            # - as records don't all specify the same columns, code building batch-insert query
-            #   was very complex
-            # - and the gains were low, so not worth spending so much complexity
-            #
-            # It also seems that we have to be careful with INSERTs in batch, because they have the
-            # same problem as SELECTs:
-            # If we inject a lot of data in a single query, we fall into pathological perfs in
-            # terms of SQL parser and the execution of the query itself.
-            # In SELECT queries, we inject max 1000 ids (integers) when we can, because we know
-            # that this limit is well managed by PostgreSQL.
-            # In INSERT queries, we inject integers (small) and larger data (TEXT blocks for
-            # example).
-            # 
-            # The problem then becomes: how to "estimate" the right size of the batch to have
-            # good performance?
-            #
-            # This requires extensive testing, and it was prefered not to introduce INSERTs in
-            # batch, to avoid regressions as much as possible.
-            #
-            # That said, we haven't closed the door completely.
-            query = "INSERT INTO {} ({}) VALUES ({}) RETURNING id".format(
-                quote(self._table),
-                ", ".join(quote(name) for name, fmt, val in columns),
-                ", ".join(fmt for name, fmt, val in columns),
-            )
-            params = [val for name, fmt, val in columns]
-            cr.execute(query, params)
-            ids.append(cr.fetchone()[0])
+            rows.append(columns)
+
+        # Insert rows in batch: consecutive rows with the same columns are
+        # inserted by a single query. The number of rows per query is limited,
+        # as PostgreSQL parses and plans huge queries (with large text values
+        # for instance) pathologically slowly, like SELECTs with too many ids.
+        def columns_key(columns):
+            return tuple((name, fmt) for name, fmt, val in columns)
+
+        for key, group in itertools.groupby(rows, key=columns_key):
+            for sub_rows in split_every(INSERT_BATCH_SIZE, group):
+                query = "INSERT INTO {} ({}) VALUES {} RETURNING id".format(
+                    quote(self._table),
+                    ", ".join(quote(name) for name, fmt in key),
+                    ", ".join(["({})".format(", ".join(fmt for name, fmt in key))] * len(sub_rows)),
+                )
+                params = [val for columns in sub_rows for name, fmt, val in columns]
+                cr.execute(query, params)
+                # the ids are generated in the order of the rows
+                ids.extend(sorted(row[0] for row in cr.fetchall()))
 
         # put the new records in cache, and update inverse fields, for many2one
         #
@@ -4212,13 +4303,16 @@ Fields:
 
         if domain:
             e = expression.expression(domain, self)
-            tables = e.get_tables()
-            where_clause, where_params = e.to_sql()
-            where_clause = [where_clause] if where_clause else []
+            query = Query(e.get_tables())
+            # keep join conditions apart, so that they are not repeated
+            for join in e.joins:
+                query.add_where(join)
+            where_clause, where_params = e.to_sql(joins=False)
+            if where_clause:
+                query.add_where(where_clause, where_params)
+            return query
         else:
-            where_clause, where_params, tables = [], [], ['"%s"' % self._table]
-
-        return Query(tables, where_clause, where_params)
+            return Query(['"%s"' % self._table])
 
     def _check_qorder(self, word):
         if not regex_order.match(word):
@@ -4246,8 +4340,9 @@ Fields:
                     parent_table = '"%s"' % self.env[parent_model]._table
                     parent_alias = '"%s"' % self._inherits_join_add(self, parent_model, query)
                     # inherited rules are applied on the external table, replace
-                    # parent_table by parent_alias
-                    clauses = [clause.replace(parent_table, parent_alias) for clause in clauses]
+                    # parent_table by parent_alias in column references only,
+                    # as subqueries may select from parent_table itself
+                    clauses = [clause.replace(parent_table + '.', parent_alias + '.') for clause in clauses]
                     # replace parent_table by parent_alias, and introduce
                     # parent_alias if needed
                     tables = [
@@ -4255,11 +4350,11 @@ Fields:
                             else table.replace(parent_table, parent_alias)
                         for table in tables
                     ]
-                query.where_clause += clauses
+                # join conditions already present in query are not repeated
+                for clause in clauses:
+                    query.add_where(clause)
                 query.where_clause_params += params
-                for table in tables:
-                    if table not in query.tables:
-                        query.tables.append(table)
+                query.add_tables(tables)
 
         if self._transient:
             # One single implicit access rule for transient models: owner only!
@@ -4493,23 +4588,21 @@ Fields:
 
         query = self._where_calc(args)
         self._apply_ir_rules(query, 'read')
-        order_by = self._generate_order_by(order, query)
-        from_clause, where_clause, where_clause_params = query.get_sql()
-
-        where_str = where_clause and (" WHERE %s" % where_clause) or ''
+        order_spec = order or self._order
+        order_by = ','.join(self._generate_order_by_inner(self._table, order_spec, query)) if order_spec else ''
 
         if count:
             # Ignore order, limit and offset when just counting, they don't make sense and could
             # hurt performance
-            query_str = 'SELECT count(1) FROM ' + from_clause + where_str
-            self._cr.execute(query_str, where_clause_params)
+            query_str, params = query.select('count(1)')
+            self._cr.execute(query_str, params)
             res = self._cr.fetchone()
             return res[0]
 
-        limit_str = limit and ' limit %d' % limit or ''
-        offset_str = offset and ' offset %d' % offset or ''
-        query_str = 'SELECT "%s".id FROM ' % self._table + from_clause + where_str + order_by + limit_str + offset_str
-        self._cr.execute(query_str, where_clause_params)
+        query_str, params = query.select(
+            '"%s".id' % self._table, order_by=order_by, limit=limit, offset=offset,
+        )
+        self._cr.execute(query_str, params)
         res = self._cr.fetchall()
 
         # TDE note: with auto_join, we could have several lines about the same result
@@ -5502,12 +5595,28 @@ Fields:
             for rid, vals in id_vals.items():
                 updates[frozendict(vals)].append(rid)
 
+            # group the latter by field names: the records with distinct
+            # values for the same fields are updated together
+            groups = defaultdict(list)
             for vals, ids in updates.items():
-                recs = model.browse(ids)
-                try:
-                    recs._write(vals)
-                except MissingError:
-                    recs.exists()._write(vals)
+                groups[frozenset(vals)].append((vals, ids))
+
+            for items in groups.values():
+                if len(items) == 1:
+                    vals, ids = items[0]
+                    recs = model.browse(ids)
+                    try:
+                        recs._write(vals)
+                    except MissingError:
+                        recs.exists()._write(vals)
+                else:
+                    ids = [rid for vals, ids in items for rid in ids]
+                    recs = model.browse(ids)
+                    try:
+                        recs._write_multi([id_vals[rid] for rid in ids])
+                    except MissingError:
+                        recs = recs.exists()
+                        recs._write_multi([id_vals[rid] for rid in recs._ids])
 
         if fnames is None:
             # flush everything
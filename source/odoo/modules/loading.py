@@ -7,9 +7,11 @@
 
 import itertools
 import logging
+import os
 import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import odoo
 import odoo.modules.db
@@ -25,7 +27,7 @@ _logger = logging.getLogger(__name__)
 _test_logger = logging.getLogger('odoo.tests')
 
 
-def load_data(cr, idref, mode, kind, package, report):
+def load_data(cr, idref, mode, kind, package, report, parsed=None):
     """
 
     kind: data, demo, test, init_xml, update_xml, demo_xml.
@@ -33,6 +35,9 @@ def load_data(cr, idref, mode, kind, package, report):
     noupdate is False, unless it is demo data or it is csv data in
     init mode.
 
+    parsed: optional dict {filename: future} of the xml files already
+    submitted for parsing, see ``_parse_data_files``.
+
     """
 
     def _get_files_of_kind(kind):
@@ -65,13 +70,46 @@ def load_data(cr, idref, mode, kind, package, report):
             noupdate = False
             if kind in ('demo', 'demo_xml') or (filename.endswith('.csv') and kind in ('init', 'init_xml')):
                 noupdate = True
-            tools.convert_file(cr, package.name, filename, idref, mode, noupdate, kind, report)
+            future = parsed and parsed.pop(filename, None)
+            doc = future.result() if future else None
+            tools.convert_file(cr, package.name, filename, idref, mode, noupdate, kind, report, doc=doc)
     finally:
         if kind in ('demo', 'test'):
             threading.currentThread().testing = False
 
 
-def load_demo(cr, package, idref, mode, report=None):
+def _parse_data_file(module, filename):
+    with tools.file_open(os.path.join(module, filename), 'rb') as fp:
+        return tools.convert.parse_xml_file(fp)
+
+
+def _parse_data_files(executor, packages):
+    """ Submit the parsing of the xml data files of ``packages`` to
+    ``executor``, and return the corresponding futures as a dict
+    ``{module: {filename: future}}``.
+    """
+    parsed = {}
+    for package in packages:
+        kinds = ['init_xml', 'update_xml', 'data']
+        if package.should_have_demo():
+            kinds += ['demo_xml', 'demo']
+        futures = parsed[package.name] = {}
+        for kind in kinds:
+            for filename in package.data.get(kind, ()):
+                if filename.lower().endswith('.xml') and filename not in futures:
+                    futures[filename] = executor.submit(_parse_data_file, package.name, filename)
+    return parsed
+
+
+def _needs_update(package):
+    return (
+        hasattr(package, "init")
+        or hasattr(package, "update")
+        or package.state in ("to install", "to upgrade")
+    )
+
+
+def load_demo(cr, package, idref, mode, report=None, parsed=None):
     """
     Loads demo data for the specified package.
     """
@@ -81,7 +119,7 @@ def load_demo(cr, package, idref, mode, report=None):
     try:
         _logger.info("Module %s: loading demo", package.name)
         with cr.savepoint(flush=False):
-            load_data(cr, idref, mode, kind='demo', package=package, report=report)
+            load_data(cr, idref, mode, kind='demo', package=package, report=report, parsed=parsed)
         return True
     except Exception as e:
         # If we could not install demo data for this module
@@ -157,125 +195,138 @@ def load_module_graph(cr, graph, status=None, perform_checks=True,
 
     models_updated = set()
 
-    for index, package in enumerate(graph, 1):
-        module_name = package.name
-        module_id = package.id
+    # The xml data files of the modules to update are parsed ahead of their
+    # loading, concurrently for all the modules at the same depth of the graph
+    # (those modules do not depend on each other). Loading the data into the
+    # database remains sequential.
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        parsed = {}
+        parsed_depth = None
+
+        for index, package in enumerate(graph, 1):
+            module_name = package.name
+            module_id = package.id
+
+            if skip_modules and module_name in skip_modules:
+                continue
+
+            _logger.debug('loading module %s (%d/%d)', module_name, index, module_count)
+
+            if package.depth != parsed_depth:
+                parsed_depth = package.depth
+                parsed = _parse_data_files(executor, [
+                    p for p in graph
+                    if p.depth == parsed_depth and _needs_update(p)
+                    and not (skip_modules and p.name in skip_modules)
+                ])
+
+            needs_update = _needs_update(package)
+            if needs_update:
+                if package.name != 'base':
+                    registry.setup_models(cr)
+                migrations.migrate_module(package, 'pre')
+                if package.name != 'base':
+                    env = api.Environment(cr, SUPERUSER_ID, {})
+                    env['base'].flush()
+
+            load_openerp_module(package.name)
+
+            new_install = package.state == 'to install'
+            if new_install:
+                py_module = sys.modules['odoo.addons.%s' % (module_name,)]
+                pre_init = package.info.get('pre_init_hook')
+                if pre_init:
+                    getattr(py_module, pre_init)(cr)
 
-        if skip_modules and module_name in skip_modules:
-            continue
+            model_names = registry.load(cr, package)
 
-        _logger.debug('loading module %s (%d/%d)', module_name, index, module_count)
+            mode = 'update'
+            if hasattr(package, 'init') or package.state == 'to install':
+                mode = 'init'
 
-        needs_update = (
-            hasattr(package, "init")
-            or hasattr(package, "update")
-            or package.state in ("to install", "to upgrade")
-        )
-        if needs_update:
-            if package.name != 'base':
+            loaded_modules.append(package.name)
+            if needs_update:
+                models_updated |= set(model_names)
+                models_to_check -= set(model_names)
                 registry.setup_models(cr)
-            migrations.migrate_module(package, 'pre')
-            if package.name != 'base':
+                registry.init_models(cr, model_names, {'module': package.name}, new_install)
+            elif package.state != 'to remove':
+                # The current module has simply been loaded. The models extended by this module
+                # and for which we updated the schema, must have their schema checked again.
+                # This is because the extension may have changed the model,
+                # e.g. adding required=True to an existing field, but the schema has not been
+                # updated by this module because it's not marked as 'to upgrade/to install'.
+                models_to_check |= set(model_names) & models_updated
+
+            idref = {}
+
+            if needs_update:
                 env = api.Environment(cr, SUPERUSER_ID, {})
-                env['base'].flush()
+                # Can't put this line out of the loop: ir.module.module will be
+                # registered by init_models() above.
+                module = env['ir.module.module'].browse(module_id)
 
-        load_openerp_module(package.name)
+                if perform_checks:
+                    module._check()
 
-        new_install = package.state == 'to install'
-        if new_install:
-            py_module = sys.modules['odoo.addons.%s' % (module_name,)]
-            pre_init = package.info.get('pre_init_hook')
-            if pre_init:
-                getattr(py_module, pre_init)(cr)
+                if package.state == 'to upgrade':
+                    # upgrading the module information
+                    module.write(module.get_values_from_terp(package.data))
+                package_parsed = parsed.pop(module_name, {})
+                load_data(cr, idref, mode, kind='data', package=package, report=report, parsed=package_parsed)
+                demo_loaded = package.dbdemo = load_demo(cr, package, idref, mode, report, parsed=package_parsed)
+                cr.execute('update ir_module_module set demo=%s where id=%s', (demo_loaded, module_id))
+                module.invalidate_cache(['demo'])
 
-        model_names = registry.load(cr, package)
+                migrations.migrate_module(package, 'post')
 
-        mode = 'update'
-        if hasattr(package, 'init') or package.state == 'to install':
-            mode = 'init'
+                # Update translations for all installed languages
+                overwrite = odoo.tools.config["overwrite_existing_translations"]
+                module.with_context(overwrite=overwrite)._update_translations()
 
-        loaded_modules.append(package.name)
-        if needs_update:
-            models_updated |= set(model_names)
-            models_to_check -= set(model_names)
-            registry.setup_models(cr)
-            registry.init_models(cr, model_names, {'module': package.name}, new_install)
-        elif package.state != 'to remove':
-            # The current module has simply been loaded. The models extended by this module
-            # and for which we updated the schema, must have their schema checked again.
-            # This is because the extension may have changed the model,
-            # e.g. adding required=True to an existing field, but the schema has not been
-            # updated by this module because it's not marked as 'to upgrade/to install'.
-            models_to_check |= set(model_names) & models_updated
-
-        idref = {}
-
-        if needs_update:
-            env = api.Environment(cr, SUPERUSER_ID, {})
-            # Can't put this line out of the loop: ir.module.module will be
-            # registered by init_models() above.
-            module = env['ir.module.module'].browse(module_id)
+                if package.name is not None:
+                    registry._init_modules.add(package.name)
 
-            if perform_checks:
-                module._check()
+                if new_install:
+                    post_init = package.info.get('post_init_hook')
+                    if post_init:
+                        getattr(py_module, post_init)(cr, registry)
 
-            if package.state == 'to upgrade':
-                # upgrading the module information
-                module.write(module.get_values_from_terp(package.data))
-            load_data(cr, idref, mode, kind='data', package=package, report=report)
-            demo_loaded = package.dbdemo = load_demo(cr, package, idref, mode, report)
-            cr.execute('update ir_module_module set demo=%s where id=%s', (demo_loaded, module_id))
-            module.invalidate_cache(['demo'])
+                if mode == 'update':
+                    # validate the views that have not been checked yet
+                    env['ir.ui.view']._validate_module_views(module_name)
 
-            migrations.migrate_module(package, 'post')
+                # need to commit any modification the module's installation or
+                # update made to the schema or data so the tests can run
+                # (separately in their own transaction)
+                cr.commit()
 
-            # Update translations for all installed languages
-            overwrite = odoo.tools.config["overwrite_existing_translations"]
-            module.with_context(overwrite=overwrite)._update_translations()
+                if tools.config.options['test_enable']:
+                    report.record_result(load_test(idref, mode))
+                    # Python tests
+                    env['ir.http']._clear_routing_map()     # force routing map to be rebuilt
+                    report.record_result(odoo.modules.module.run_unit_tests(module_name))
+                    # tests may have reset the environment
+                    env = api.Environment(cr, SUPERUSER_ID, {})
+                    module = env['ir.module.module'].browse(module_id)
+
+                processed_modules.append(package.name)
+
+                ver = adapt_version(package.data['version'])
+                # Set new modules and dependencies
+                module.write({'state': 'installed', 'latest_version': ver})
+
+                package.load_state = package.state
+                package.load_version = package.installed_version
+                package.state = 'installed'
+                for kind in ('init', 'demo', 'update'):
+                    if hasattr(package, kind):
+                        delattr(package, kind)
+                module.flush()
 
             if package.name is not None:
                 registry._init_modules.add(package.name)
 
-            if new_install:
-                post_init = package.info.get('post_init_hook')
-                if post_init:
-                    getattr(py_module, post_init)(cr, registry)
-
-            if mode == 'update':
-                # validate the views that have not been checked yet
-                env['ir.ui.view']._validate_module_views(module_name)
-
-            # need to commit any modification the module's installation or
-            # update made to the schema or data so the tests can run
-            # (separately in their own transaction)
-            cr.commit()
-
-            if tools.config.options['test_enable']:
-                report.record_result(load_test(idref, mode))
-                # Python tests
-                env['ir.http']._clear_routing_map()     # force routing map to be rebuilt
-                report.record_result(odoo.modules.module.run_unit_tests(module_name))
-                # tests may have reset the environment
-                env = api.Environment(cr, SUPERUSER_ID, {})
-                module = env['ir.module.module'].browse(module_id)
-
-            processed_modules.append(package.name)
-
-            ver = adapt_version(package.data['version'])
-            # Set new modules and dependencies
-            module.write({'state': 'installed', 'latest_version': ver})
-
-            package.load_state = package.state
-            package.load_version = package.installed_version
-            package.state = 'installed'
-            for kind in ('init', 'demo', 'update'):
-                if hasattr(package, kind):
-                    delattr(package, kind)
-            module.flush()
-
-        if package.name is not None:
-            registry._init_modules.add(package.name)
-
     _logger.log(25, "%s modules loaded in %.2fs, %s queries", len(graph), time.time() - t0, odoo.sql_db.sql_counter - t0_sql)
 
     return loaded_modules, processed_modules
@@ -544,6 +595,10 @@ def load_modules(db, force_demo=False, status=None, update_module=False):
             model._register_hook()
         env['base'].flush()
 
+        # STEP 8.5: build the asset bundles, instead of the first requests
+        if update_module and tools.config['prebuild_assets']:
+            env['ir.qweb']._prebuild_asset_bundles()
+
         # STEP 9: save installed/updated modules for post-install tests
         registry.updated_modules += processed_modules
 
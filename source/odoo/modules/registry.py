@@ -9,20 +9,44 @@ from contextlib import closing, contextmanager
 from functools import partial
 from operator import attrgetter
 from weakref import WeakValueDictionary
+import hashlib
 import logging
 import os
+import pickle
+import select
 import threading
+import time
+import uuid
 
 import odoo
 from .. import SUPERUSER_ID
 from odoo.sql_db import TestCursor
 from odoo.tools import (assertion_report, config, existing_tables, ignore,
                         lazy_classproperty, lazy_property, OrderedSet)
-from odoo.tools.lru import LRU
+from odoo.tools.cache import STAT
+from odoo.tools.lru import LRU, SizedLRU
 
 _logger = logging.getLogger(__name__)
 _schema = logging.getLogger('odoo.schema')
 
+# The named caches (or regions) of the registry, with their share of the
+# memory given by the option `ormcache_size`. Methods decorated with
+# ``tools.ormcache`` store their results in one of them. Each cache is
+# invalidated and signaled to other processes independently of the others, so
+# that modifying a view does not flush access rights, and vice versa.
+CACHES = {
+    'default': 0.4,
+    'templates': 0.4,
+    'translations': 0.2,
+}
+
+
+def _cache_signaling_sequence(cache_name):
+    """ Return the name of the signaling sequence of the given cache. """
+    if cache_name == 'default':
+        return 'base_cache_signaling'
+    return 'base_cache_signaling_%s' % cache_name
+
 
 class Registry(Mapping):
     """ Model registry for a particular database.
@@ -118,6 +142,10 @@ class Registry(Mapping):
         self.updated_modules = []       # installed/updated modules
         self.loaded_xmlids = set()
 
+        # number of rows and bytes fetched from variable-width columns, per
+        # (model name, field name); used to size prefetching queries
+        self.read_stats = defaultdict(lambda: [0, 0])
+
         self.db_name = db_name
         self._db = odoo.sql_db.db_connect(db_name)
 
@@ -132,10 +160,11 @@ class Registry(Mapping):
         # Inter-process signaling:
         # The `base_registry_signaling` sequence indicates the whole registry
         # must be reloaded.
-        # The `base_cache_signaling sequence` indicates all caches must be
-        # invalidated (i.e. cleared).
+        # The `base_cache_signaling sequence` indicates the default cache must
+        # be invalidated (i.e. cleared), and `base_cache_signaling_<name>` the
+        # same for the other named caches.
         self.registry_sequence = None
-        self.cache_sequence = None
+        self.cache_sequences = {}
 
         # Flags indicating invalidation of the registry or the cache.
         self._invalidation_flags = threading.local()
@@ -261,6 +290,33 @@ class Registry(Mapping):
         for model in models:
             model._setup_fields()
 
+        # determine field triggers, or reuse the ones of a previous setup with
+        # the same models and fields
+        if config.get('registry_snapshot'):
+            signature = self._fields_signature(models)
+            triggers = self._load_field_triggers(signature)
+            if triggers is None:
+                triggers = self._compute_field_triggers(models)
+                self._save_field_triggers(signature, models, triggers)
+        else:
+            triggers = self._compute_field_triggers(models)
+
+        self.field_triggers = triggers
+
+        for model in models:
+            model._setup_complete()
+
+        self.registry_invalidated = True
+
+        # Reinstall registry hooks. Because of the condition, this only happens
+        # on a fully loaded registry, and not on a registry being loaded.
+        if self.ready:
+            for model in env.values():
+                model._register_hook()
+            env['base'].flush()
+
+    def _compute_field_triggers(self, models):
+        """ Return the tree of field triggers of the given models. """
         # determine field dependencies
         dependencies = {}
         for model in models:
@@ -299,19 +355,96 @@ class Registry(Mapping):
                         tree = tree.setdefault(label, {})
                     tree.setdefault(None, set()).add(field)
 
-        self.field_triggers = triggers
-
-        for model in models:
-            model._setup_complete()
-
-        self.registry_invalidated = True
+        return triggers
 
-        # Reinstall registry hooks. Because of the condition, this only happens
-        # on a fully loaded registry, and not on a registry being loaded.
-        if self.ready:
-            for model in env.values():
-                model._register_hook()
-            env['base'].flush()
+    #
+    # The field triggers are the most expensive part of the setup of models,
+    # and they only depend on the definition of the fields. With the option
+    # --registry-snapshot, they are saved in the data directory, and reused by
+    # the next setups (in other workers, or after a restart) with the same
+    # field definitions.
+    #
+    SNAPSHOT_VERSION = 1
+
+    def _snapshot_path(self):
+        return os.path.join(config['data_dir'], 'registry', '%s.pickle' % self.db_name)
+
+    def _fields_signature(self, models):
+        """ Return a hash of everything the field triggers depend on. """
+        signature = hashlib.sha1()
+        signature.update(repr((self.SNAPSHOT_VERSION, odoo.release.version)).encode())
+        for model in sorted(models, key=attrgetter('_name')):
+            signature.update(repr((model._name, model._abstract, model._transient)).encode())
+            for name, field in sorted(model._fields.items()):
+                signature.update(repr((
+                    name, field.type, field.comodel_name, field.depends,
+                    getattr(field, 'inverse_name', None), getattr(field, 'relation', None),
+                    getattr(field, 'column1', None), getattr(field, 'column2', None),
+                )).encode())
+        return signature.hexdigest()
+
+    def _load_field_triggers(self, signature):
+        """ Return the field triggers saved with the given signature, if any. """
+        path = self._snapshot_path()
+        try:
+            with open(path, 'rb') as fp:
+                snapshot = pickle.load(fp)
+            if snapshot['signature'] != signature:
+                return None
+
+            def field(key):
+                return self[key[0]]._fields[key[1]]
+
+            def load(tree):
+                return {
+                    None if key is None else field(key):
+                        set(map(field, subtree)) if key is None else load(subtree)
+                    for key, subtree in tree.items()
+                }
+
+            triggers = load(snapshot['triggers'])
+            for key in snapshot['recursive']:
+                field(key).recursive = True
+        except FileNotFoundError:
+            return None
+        except Exception:
+            _logger.warning("Invalid registry snapshot %s", path, exc_info=True)
+            return None
+        _logger.debug("Field triggers loaded from %s", path)
+        return triggers
+
+    def _save_field_triggers(self, signature, models, triggers):
+        """ Save the given field triggers with their signature. """
+        def key(field):
+            return (field.model_name, field.name)
+
+        def dump(tree):
+            return {
+                None if label is None else key(label):
+                    [key(field) for field in subtree] if label is None else dump(subtree)
+                for label, subtree in tree.items()
+            }
+
+        snapshot = {
+            'signature': signature,
+            'triggers': dump(triggers),
+            'recursive': [
+                key(field)
+                for model in models
+                for field in model._fields.values()
+                if field.recursive
+            ],
+        }
+        path = self._snapshot_path()
+        try:
+            os.makedirs(os.path.dirname(path), 0o700, exist_ok=True)
+            # write then rename, as other workers may read the file
+            tmp_path = '%s.%s' % (path, uuid.uuid4().hex)
+            with open(tmp_path, 'wb') as fp:
+                pickle.dump(snapshot, fp, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError:
+            _logger.warning("Cannot save registry snapshot %s", path, exc_info=True)
 
     def post_init(self, func, *args, **kwargs):
         """ Register a function to call at the end of :meth:`~.init_models`. """
@@ -402,15 +535,39 @@ class Registry(Mapping):
                 _logger.error("Model %s has no table.", table2model[table])
 
     @lazy_property
-    def cache(self):
-        """ A cache for model methods. """
+    def _caches(self):
+        """ The named caches for model methods, see :data:`CACHES`. """
+        # this lazy_property is automatically reset by lazy_property.reset_all()
+        size = config['ormcache_size']
+        return {
+            name: SizedLRU(int(size * share), on_evict=self._count_cache_eviction)
+            for name, share in CACHES.items()
+        }
+
+    @lazy_property
+    def _expression_cache(self):
+        """ Parsed domains, see :class:`odoo.osv.expression.expression`. """
         # this lazy_property is automatically reset by lazy_property.reset_all()
         return LRU(8192)
 
-    def _clear_cache(self):
-        """ Clear the cache and mark it as invalidated. """
-        self.cache.clear()
-        self.cache_invalidated = True
+    def _count_cache_eviction(self, key):
+        """ Update the statistics of ormcache after the eviction of ``key``. """
+        model_name, method = key[:2]
+        STAT[(self.db_name, model_name, method)].evict += 1
+
+    @property
+    def cache(self):
+        """ The default cache for model methods. """
+        return self._caches['default']
+
+    def _clear_cache(self, *cache_names):
+        """ Clear the given caches (all of them by default), and mark them as
+        invalidated.
+        """
+        cache_names = cache_names or tuple(CACHES)
+        for cache_name in cache_names:
+            self._caches[cache_name].clear()
+        self.cache_invalidated.update(cache_names)
 
     def clear_caches(self):
         """ Clear the caches associated to methods decorated with
@@ -430,12 +587,30 @@ class Registry(Mapping):
 
     @property
     def cache_invalidated(self):
-        """ Determine whether the current thread has modified the cache. """
-        return getattr(self._invalidation_flags, 'cache', False)
+        """ Return the names of the caches modified by the current thread. """
+        try:
+            return self._invalidation_flags.caches
+        except AttributeError:
+            caches = self._invalidation_flags.caches = set()
+            return caches
 
     @cache_invalidated.setter
     def cache_invalidated(self, value):
-        self._invalidation_flags.cache = value
+        if value is True:
+            value = CACHES
+        self._invalidation_flags.caches = set(value or ())
+
+    def _get_signaling_sequences(self, cr):
+        """ Return the current values of the registry signaling sequence, and
+        of the cache signaling sequences as a dict indexed by cache name.
+        """
+        sequences = ['base_registry_signaling'] + [_cache_signaling_sequence(name) for name in CACHES]
+        cr.execute("SELECT {} FROM {}".format(
+            ", ".join("%s.last_value" % sequence for sequence in sequences),
+            ", ".join(sequences),
+        ))
+        values = cr.fetchone()
+        return values[0], dict(zip(CACHES, values[1:]))
 
     def setup_signaling(self):
         """ Setup the inter-process signaling on this registry. """
@@ -445,21 +620,20 @@ class Registry(Mapping):
         with self.cursor() as cr:
             # The `base_registry_signaling` sequence indicates when the registry
             # must be reloaded.
-            # The `base_cache_signaling` sequence indicates when all caches must
-            # be invalidated (i.e. cleared).
-            cr.execute("SELECT sequence_name FROM information_schema.sequences WHERE sequence_name='base_registry_signaling'")
-            if not cr.fetchall():
-                cr.execute("CREATE SEQUENCE base_registry_signaling INCREMENT BY 1 START WITH 1")
-                cr.execute("SELECT nextval('base_registry_signaling')")
-                cr.execute("CREATE SEQUENCE base_cache_signaling INCREMENT BY 1 START WITH 1")
-                cr.execute("SELECT nextval('base_cache_signaling')")
-
-            cr.execute(""" SELECT base_registry_signaling.last_value,
-                                  base_cache_signaling.last_value
-                           FROM base_registry_signaling, base_cache_signaling""")
-            self.registry_sequence, self.cache_sequence = cr.fetchone()
+            # The `base_cache_signaling[_<name>]` sequences indicate when the
+            # corresponding caches must be invalidated (i.e. cleared).
+            sequences = ['base_registry_signaling'] + [_cache_signaling_sequence(name) for name in CACHES]
+            cr.execute("SELECT sequence_name FROM information_schema.sequences WHERE sequence_name IN %s",
+                       [tuple(sequences)])
+            existing = {row[0] for row in cr.fetchall()}
+            for sequence in sequences:
+                if sequence not in existing:
+                    cr.execute("CREATE SEQUENCE %s INCREMENT BY 1 START WITH 1" % sequence)
+                    cr.execute("SELECT nextval(%s)", [sequence])
+
+            self.registry_sequence, self.cache_sequences = self._get_signaling_sequences(cr)
             _logger.debug("Multiprocess load registry signaling: [Registry: %s] [Cache: %s]",
-                          self.registry_sequence, self.cache_sequence)
+                          self.registry_sequence, self.cache_sequences)
 
     def check_signaling(self):
         """ Check whether the registry has changed, and performs all necessary
@@ -468,47 +642,69 @@ class Registry(Mapping):
         if self.in_test_mode():
             return self
 
+        if config['registry_listen']:
+            # the signaling sequences are only checked when another process
+            # notified a change, or when the listener may have missed one
+            listener = SignalingListener.get()
+            if not listener.must_check(self.db_name):
+                return self
+            listener.mark_checked(self.db_name)
+
         with closing(self.cursor()) as cr:
-            cr.execute(""" SELECT base_registry_signaling.last_value,
-                                  base_cache_signaling.last_value
-                           FROM base_registry_signaling, base_cache_signaling""")
-            r, c = cr.fetchone()
+            r, c = self._get_signaling_sequences(cr)
             _logger.debug("Multiprocess signaling check: [Registry - %s -> %s] [Cache - %s -> %s]",
-                          self.registry_sequence, r, self.cache_sequence, c)
+                          self.registry_sequence, r, self.cache_sequences, c)
             # Check if the model registry must be reloaded
             if self.registry_sequence != r:
                 _logger.info("Reloading the model registry after database signaling.")
                 self = Registry.new(self.db_name)
-            # Check if the model caches must be invalidated.
-            elif self.cache_sequence != c:
-                _logger.info("Invalidating all model caches after database signaling.")
-                # Bypass self.clear_caches() to avoid invalidation loops in multi-threaded
-                # configs due to the `cache_invalidated` flag being set, causing more signaling.
-                self.cache.clear()
+            # Check if some model caches must be invalidated; only the caches
+            # that have been signaled are cleared.
+            else:
+                invalidated = [name for name in CACHES if self.cache_sequences.get(name) != c[name]]
+                if invalidated:
+                    _logger.info("Invalidating model caches %s after database signaling.",
+                                 ", ".join(invalidated))
+                    # Bypass self._clear_cache() to avoid invalidation loops in multi-threaded
+                    # configs due to the `cache_invalidated` flag being set, causing more signaling.
+                    for name in invalidated:
+                        self._caches[name].clear()
             self.registry_sequence = r
-            self.cache_sequence = c
+            self.cache_sequences = c
 
         return self
 
     def signal_changes(self):
         """ Notifies other processes if registry or cache has been invalidated. """
+        signaled = False
         if self.registry_invalidated and not self.in_test_mode():
             _logger.info("Registry changed, signaling through the database")
             with closing(self.cursor()) as cr:
                 cr.execute("select nextval('base_registry_signaling')")
                 self.registry_sequence = cr.fetchone()[0]
+            signaled = True
 
         # no need to notify cache invalidation in case of registry invalidation,
         # because reloading the registry implies starting with an empty cache
         elif self.cache_invalidated and not self.in_test_mode():
-            _logger.info("At least one model cache has been invalidated, signaling through the database.")
+            cache_names = sorted(self.cache_invalidated)
+            _logger.info("Model caches %s have been invalidated, signaling through the database.",
+                         ", ".join(cache_names))
             with closing(self.cursor()) as cr:
-                cr.execute("select nextval('base_cache_signaling')")
-                self.cache_sequence = cr.fetchone()[0]
+                cr.execute("SELECT %s" % ", ".join(
+                    "nextval('%s')" % _cache_signaling_sequence(name) for name in cache_names
+                ))
+                self.cache_sequences.update(zip(cache_names, cr.fetchone()))
+            signaled = True
 
         self.registry_invalidated = False
         self.cache_invalidated = False
 
+        if signaled and config['registry_listen']:
+            # wake up the processes listening to signaling
+            with odoo.sql_db.db_connect('postgres').cursor() as cr:
+                cr.execute("NOTIFY odoo_signaling, %s", [self.db_name])
+
     def reset_changes(self):
         """ Reset the registry and cancel all invalidations. """
         if self.registry_invalidated:
@@ -516,7 +712,8 @@ class Registry(Mapping):
                 self.setup_models(cr)
                 self.registry_invalidated = False
         if self.cache_invalidated:
-            self.cache.clear()
+            for cache_name in self.cache_invalidated:
+                self._caches[cache_name].clear()
             self.cache_invalidated = False
 
     @contextmanager
@@ -572,3 +769,85 @@ class DummyRLock(object):
         self.acquire()
     def __exit__(self, type, value, traceback):
         self.release()
+
+
+class SignalingListener(object):
+    """ Listener of the registry and cache invalidations signaled by other
+    processes, through the PostgreSQL channel ``odoo_signaling``.
+
+    When the option ``registry_listen`` is set, every process runs one
+    listener thread, and :meth:`Registry.check_signaling` only reads the
+    signaling sequences of a database after a notification for it, or after
+    ``registry_listen_interval`` seconds in case a notification was missed.
+    While the listener is not connected, the sequences are checked on every
+    call, as without listener.
+    """
+    _instance = None
+
+    def __init__(self):
+        self.interval = config['registry_listen_interval']
+        self.connected = False
+        self.checked = {}               # {db_name: time of the last check}
+
+    @classmethod
+    def get(cls):
+        """ Return the listener of the current process, and start it if
+        necessary. A forked process starts its own listener.
+        """
+        listener = cls._instance
+        if listener is None or listener.pid != os.getpid():
+            with Registry._lock:
+                listener = cls._instance
+                if listener is None or listener.pid != os.getpid():
+                    listener = cls._instance = cls().start()
+        return listener
+
+    def must_check(self, db_name):
+        """ Return whether the signaling sequences of ``db_name`` must be read. """
+        if not self.connected:
+            return True
+        last_check = self.checked.get(db_name)
+        return last_check is None or time.time() - last_check > self.interval
+
+    def mark_checked(self, db_name):
+        """ Record that the signaling sequences of ``db_name`` are being read.
+        A notification received from now on will trigger another check.
+        """
+        self.checked[db_name] = time.time()
+
+    def notified(self, db_name):
+        """ Handle a notification of changes in ``db_name``: its signaling
+        sequences will be read at the next check.
+        """
+        self.checked.pop(db_name, None)
+
+    def loop(self):
+        with odoo.sql_db.db_connect('postgres').cursor() as cr:
+            conn = cr._cnx
+            cr.execute("LISTEN odoo_signaling")
+            cr.commit()
+            # notifications may have been missed while not listening
+            self.checked.clear()
+            self.connected = True
+            _logger.info("Registry signaling: listening on db postgres")
+            while True:
+                if select.select([conn], [], [], self.interval) != ([], [], []):
+                    conn.poll()
+                    while conn.notifies:
+                        self.notified(conn.notifies.pop().payload)
+
+    def run(self):
+        while True:
+            try:
+                self.loop()
+            except Exception:
+                _logger.exception("Registry signaling: listener error, sleep and retry")
+            self.connected = False
+            time.sleep(self.interval)
+
+    def start(self):
+        self.pid = os.getpid()
+        thread = threading.Thread(name="%s.SignalingListener" % __name__, target=self.run)
+        thread.daemon = True
+        thread.start()
+        return self
@@ -142,9 +142,14 @@ DOMAIN_OPERATORS = (NOT_OPERATOR, OR_OPERATOR, AND_OPERATOR)
 # only one representation).
 # Internals (i.e. not available to the user) 'inselect' and 'not inselect'
 # operators are also used. In this case its right operand has the form (subselect, params).
+# The internal operators 'exists' and 'not exists' are used for conditions on
+# x2many fields. Their right operand has the form
+# (table, link, column, filter_column, filter_ids), and the term corresponds to
+# EXISTS (SELECT 1 FROM table WHERE table.column = id [AND table.filter_column IN filter_ids])
 TERM_OPERATORS = ('=', '!=', '<=', '<', '>', '>=', '=?', '=like', '=ilike',
                   'like', 'not like', 'ilike', 'not ilike', 'in', 'not in',
                   'child_of', 'parent_of')
+INTERNAL_OPERATORS = ('inselect', 'not inselect', 'exists', 'not exists')
 
 # A subset of the above operators, with a 'negative' semantic. When the
 # expressions 'in NEGATIVE_TERM_OPERATORS' or 'not in NEGATIVE_TERM_OPERATORS' are used in the code
@@ -430,7 +435,7 @@ def is_leaf(element, internal=False):
     """
     INTERNAL_OPS = TERM_OPERATORS + ('<>',)
     if internal:
-        INTERNAL_OPS += ('inselect', 'not inselect')
+        INTERNAL_OPS += INTERNAL_OPERATORS
     return (isinstance(element, tuple) or isinstance(element, list)) \
         and len(element) == 3 \
         and element[1] in INTERNAL_OPS \
@@ -438,6 +443,37 @@ def is_leaf(element, internal=False):
              or tuple(element) in (TRUE_LEAF, FALSE_LEAF))
 
 
+def _value_kind(value):
+    """ Return a hashable summary of the right operand of a domain term, that
+        captures what the parsing of the term depends on. """
+    if isinstance(value, str):
+        return str, bool(value), len(value) == 10
+    if isinstance(value, (list, tuple)):
+        return type(value), bool(value), all(isinstance(item, str) for item in value)
+    return type(value), bool(value)
+
+
+def domain_shape(domain):
+    """ Return a hashable key representing the structure of a normalized
+        domain, independently of the values of its terms, or ``None`` if the
+        domain is not valid. Two domains with the same shape on a given model
+        are parsed the same way by :class:`expression`, provided their parsing
+        does not depend on the actual values (name_search, child_of, etc.)
+    """
+    shape = []
+    for element in domain:
+        if is_operator(element):
+            shape.append(element)
+        elif not is_leaf(element):
+            return None
+        elif tuple(element) in (TRUE_LEAF, FALSE_LEAF):
+            shape.append(tuple(element))
+        else:
+            left, operator, right = element
+            shape.append((left, operator, _value_kind(right)))
+    return tuple(shape)
+
+
 # --------------------------------------------------
 # SQL utils
 # --------------------------------------------------
@@ -677,8 +713,16 @@ class expression(object):
         # normalize and prepare the expression for parsing
         self.expression = distribute_not(normalize_domain(domain))
 
-        # parse the domain expression
-        self.parse()
+        # parse the domain expression, unless a domain with the same shape has
+        # already been parsed in a way that does not depend on its values
+        shape = domain_shape(self.expression)
+        key = shape and (model._name, shape)
+        cache = model.pool._expression_cache
+        template = cache.get(key) if key else None
+        if template is None or not self._apply_template(template):
+            self.parse()
+            if key and self._cacheable:
+                cache[key] = self._get_template()
 
     # ----------------------------------------
     # Leafs management
@@ -696,6 +740,48 @@ class expression(object):
             tables.append(table_name)
         return tables
 
+    def _get_template(self):
+        """ Return the result of the parsing, without the values of the terms,
+            and without references to environments. """
+        leaves = [
+            leaf.leaf if leaf.is_operator() else (
+                leaf.model._name,
+                tuple(
+                    (lhs._name, model._name, lhs_col, col, link)
+                    for lhs, model, lhs_col, col, link in leaf.join_context
+                ),
+                leaf.leaf[0],
+            )
+            for leaf in self.result
+        ]
+        return leaves, list(self.joins)
+
+    def _apply_template(self, template):
+        """ Set the result of the parsing from a template returned by
+            :meth:`_get_template` for a domain with the same shape. Return
+            whether the template is still valid, i.e., whether its joins are
+            still those of ``_inherits`` or ``auto_join`` fields.
+        """
+        env = self.root_model.env
+        leaves, joins = template
+        result = []
+        for element, item in zip(self.expression, leaves):
+            if isinstance(item, str):
+                result.append(ExtendedLeaf(item, self.root_model))
+                continue
+            model_name, join_context, left = item
+            contexts = []
+            for lhs_name, name, lhs_col, col, link in join_context:
+                lhs = env[lhs_name]
+                if not (lhs._inherits.get(name) == link or lhs._fields[link].auto_join):
+                    return False
+                contexts.append((lhs, env[name], lhs_col, col, link))
+            leaf = (left, element[1], element[2])
+            result.append(ExtendedLeaf(leaf, env[model_name], contexts))
+        self.result = result
+        self.joins = list(joins)
+        return True
+
     # ----------------------------------------
     # Parsing
     # ----------------------------------------
@@ -814,6 +900,9 @@ class expression(object):
                 and validated. """
             self.result.append(leaf)
 
+        # whether the parsing only depends on the shape of the domain
+        cacheable = True
+
         self.result = []
         self.stack = [ExtendedLeaf(leaf, self.root_model) for leaf in self.expression]
         # process from right to left; expression is from left to right
@@ -871,6 +960,7 @@ class expression(object):
                 push(leaf)
 
             elif left == 'id' and operator in HIERARCHY_FUNCS:
+                cacheable = False
                 ids2 = to_ids(right, model, leaf.leaf)
                 dom = HIERARCHY_FUNCS[operator](left, ids2, model)
                 for dom_leaf in reversed(dom):
@@ -896,6 +986,7 @@ class expression(object):
                 push(create_substitution_leaf(leaf, (path[1], operator, right), comodel))
 
             elif len(path) > 1 and field.store and field.type == 'one2many' and field.auto_join:
+                cacheable = False
                 # res_partner.id = res_partner__bank_ids.partner_id
                 leaf.add_join_context(comodel, 'id', field.inverse_name, path[0])
                 domain = field.get_domain_list(model)
@@ -910,17 +1001,20 @@ class expression(object):
                 raise NotImplementedError('auto_join attribute not supported on field %s' % field)
 
             elif len(path) > 1 and field.store and field.type == 'many2one':
+                cacheable = False
                 right_ids = comodel.with_context(active_test=False).search([('.'.join(path[1:]), operator, right)], order='id').ids
                 leaf.leaf = (path[0], 'in', right_ids)
                 push(leaf)
 
             # Making search easier when there is a left operand as one2many or many2many
             elif len(path) > 1 and field.store and field.type in ('many2many', 'one2many'):
+                cacheable = False
                 right_ids = comodel.search([('.'.join(path[1:]), operator, right)], order='id').ids
                 leaf.leaf = (path[0], 'in', right_ids)
                 push(leaf)
 
             elif not field.store:
+                cacheable = False
                 # Non-stored field should provide an implementation of search.
                 if not field.search:
                     # field does not support search!
@@ -947,6 +1041,7 @@ class expression(object):
 
             # Applying recursivity on field(one2many)
             elif field.type == 'one2many' and operator in HIERARCHY_FUNCS:
+                cacheable = False
                 ids2 = to_ids(right, comodel, leaf.leaf)
                 if field.comodel_name != model._name:
                     dom = HIERARCHY_FUNCS[operator](left, ids2, comodel, prefix=field.comodel_name)
@@ -956,6 +1051,7 @@ class expression(object):
                     push(create_substitution_leaf(leaf, dom_leaf, model))
 
             elif field.type == 'one2many':
+                cacheable = False
                 domain = field.get_domain_list(model)
                 inverse_is_int = comodel._fields[field.inverse_name].type in ('integer', 'many2one_reference')
                 unwrap_inverse = (lambda ids: ids) if inverse_is_int else (lambda recs: recs.ids)
@@ -973,25 +1069,32 @@ class expression(object):
                     if ids2 and inverse_is_int and domain:
                         ids2 = comodel.search([('id', 'in', ids2)] + domain, order='id').ids
 
-                    # determine ids1 in model related to ids2
-                    if not ids2:
-                        ids1 = []
-                    elif comodel._fields[field.inverse_name].store:
-                        ids1 = select_from_where(cr, field.inverse_name, comodel._table, 'id', ids2, operator)
+                    if ids2 and comodel._fields[field.inverse_name].store and operator not in ('<', '>', '<=', '>='):
+                        # rewrite condition as a subquery on the lines ids2
+                        op1 = 'not exists' if operator in NEGATIVE_TERM_OPERATORS else 'exists'
+                        right1 = (comodel._table, path[0], field.inverse_name, 'id', ids2)
+                        push(create_substitution_leaf(leaf, ('id', op1, right1), internal=True))
+
                     else:
-                        recs = comodel.browse(ids2).sudo().with_context(prefetch_fields=False)
-                        ids1 = unwrap_inverse(recs.mapped(field.inverse_name))
+                        # determine ids1 in model related to ids2
+                        if not ids2:
+                            ids1 = []
+                        elif comodel._fields[field.inverse_name].store:
+                            ids1 = select_from_where(cr, field.inverse_name, comodel._table, 'id', ids2, operator)
+                        else:
+                            recs = comodel.browse(ids2).sudo().with_context(prefetch_fields=False)
+                            ids1 = unwrap_inverse(recs.mapped(field.inverse_name))
 
-                    # rewrite condition in terms of ids1
-                    op1 = 'not in' if operator in NEGATIVE_TERM_OPERATORS else 'in'
-                    push(create_substitution_leaf(leaf, ('id', op1, ids1), model))
+                        # rewrite condition in terms of ids1
+                        op1 = 'not in' if operator in NEGATIVE_TERM_OPERATORS else 'in'
+                        push(create_substitution_leaf(leaf, ('id', op1, ids1), model))
 
                 else:
                     if comodel._fields[field.inverse_name].store and not (inverse_is_int and domain):
                         # rewrite condition to match records with/without lines
-                        op1 = 'inselect' if operator in NEGATIVE_TERM_OPERATORS else 'not inselect'
-                        subquery = 'SELECT "%s" FROM "%s" where "%s" is not null' % (field.inverse_name, comodel._table, field.inverse_name)
-                        push(create_substitution_leaf(leaf, ('id', op1, (subquery, [])), internal=True))
+                        op1 = 'exists' if operator in NEGATIVE_TERM_OPERATORS else 'not exists'
+                        right1 = (comodel._table, path[0], field.inverse_name, None, ())
+                        push(create_substitution_leaf(leaf, ('id', op1, right1), internal=True))
                     else:
                         comodel_domain = [(field.inverse_name, '!=', False)]
                         if inverse_is_int and domain:
@@ -1004,6 +1107,7 @@ class expression(object):
                         push(create_substitution_leaf(leaf, ('id', op1, ids1), model))
 
             elif field.type == 'many2many':
+                cacheable = False
                 rel_table, rel_id1, rel_id2 = field.relation, field.column1, field.column2
 
                 if operator in HIERARCHY_FUNCS:
@@ -1016,8 +1120,8 @@ class expression(object):
                     if comodel == model:
                         push(create_substitution_leaf(leaf, ('id', 'in', ids2), model))
                     else:
-                        subquery = 'SELECT "%s" FROM "%s" WHERE "%s" IN %%s' % (rel_id1, rel_table, rel_id2)
-                        push(create_substitution_leaf(leaf, ('id', 'inselect', (subquery, [tuple(ids2) or (None,)])), internal=True))
+                        right1 = (rel_table, path[0], rel_id1, rel_id2, ids2)
+                        push(create_substitution_leaf(leaf, ('id', 'exists', right1), internal=True))
 
                 elif right is not False:
                     # determine ids2 in comodel
@@ -1032,19 +1136,19 @@ class expression(object):
                         ids2 = [right]
 
                     # rewrite condition in terms of ids2
-                    subop = 'not inselect' if operator in NEGATIVE_TERM_OPERATORS else 'inselect'
-                    subquery = 'SELECT "%s" FROM "%s" WHERE "%s" IN %%s' % (rel_id1, rel_table, rel_id2)
-                    ids2 = tuple(it for it in ids2 if it) or (None,)
-                    push(create_substitution_leaf(leaf, ('id', subop, (subquery, [ids2])), internal=True))
+                    subop = 'not exists' if operator in NEGATIVE_TERM_OPERATORS else 'exists'
+                    right1 = (rel_table, path[0], rel_id1, rel_id2, [it for it in ids2 if it])
+                    push(create_substitution_leaf(leaf, ('id', subop, right1), internal=True))
 
                 else:
                     # rewrite condition to match records with/without relations
-                    op1 = 'inselect' if operator in NEGATIVE_TERM_OPERATORS else 'not inselect'
-                    subquery = 'SELECT "%s" FROM "%s" where "%s" is not null' % (rel_id1, rel_table, rel_id1)
-                    push(create_substitution_leaf(leaf, ('id', op1, (subquery, [])), internal=True))
+                    op1 = 'exists' if operator in NEGATIVE_TERM_OPERATORS else 'not exists'
+                    right1 = (rel_table, path[0], rel_id1, None, ())
+                    push(create_substitution_leaf(leaf, ('id', op1, right1), internal=True))
 
             elif field.type == 'many2one':
                 if operator in HIERARCHY_FUNCS:
+                    cacheable = False
                     ids2 = to_ids(right, comodel, leaf.leaf)
                     if field.comodel_name != model._name:
                         dom = HIERARCHY_FUNCS[operator](left, ids2, comodel, prefix=field.comodel_name)
@@ -1071,6 +1175,7 @@ class expression(object):
                     # resolve string-based m2o criterion into IDs
                     if isinstance(right, str) or \
                             right and isinstance(right, (tuple, list)) and all(isinstance(item, str) for item in right):
+                        cacheable = False
                         push(create_substitution_leaf(leaf, _get_expression(comodel, left, right, operator), model))
                     else:
                         # right == [] or right == False and all other cases are handled by __leaf_to_sql()
@@ -1082,6 +1187,7 @@ class expression(object):
             # -------------------------------------------------
 
             elif field.type == 'binary' and field.attachment:
+                cacheable = False
                 if operator in ('=', '!=') and not right:
                     inselect_operator = 'inselect' if operator in NEGATIVE_TERM_OPERATORS else 'not inselect'
                     subselect = "SELECT res_id FROM ir_attachment WHERE res_model=%s AND res_field=%s"
@@ -1103,12 +1209,14 @@ class expression(object):
             else:
                 if field.type == 'datetime' and right:
                     if isinstance(right, str) and len(right) == 10:
+                        cacheable = False
                         if operator in ('>', '<='):
                             right += ' 23:59:59'
                         else:
                             right += ' 00:00:00'
                         push(create_substitution_leaf(leaf, (left, operator, right), model))
                     elif isinstance(right, date) and not isinstance(right, datetime):
+                        cacheable = False
                         if operator in ('>', '<='):
                             right = datetime.combine(right, time.max)
                         else:
@@ -1119,6 +1227,7 @@ class expression(object):
 
 
                 elif field.translate is True and right:
+                    cacheable = False
                     need_wildcard = operator in ('like', 'ilike', 'not like', 'not ilike')
                     sql_operator = {'=like': 'like', '=ilike': 'ilike'}.get(operator, operator)
                     if need_wildcard:
@@ -1170,6 +1279,7 @@ class expression(object):
         for leaf in self.result:
             joins |= set(leaf.get_join_conditions())
         self.joins = list(joins)
+        self._cacheable = cacheable and len(self.result) == len(self.expression)
 
     def __leaf_to_sql(self, eleaf):
         model = eleaf.model
@@ -1177,7 +1287,7 @@ class expression(object):
         left, operator, right = leaf
 
         # final sanity checks - should never fail
-        assert operator in (TERM_OPERATORS + ('inselect', 'not inselect')), \
+        assert operator in (TERM_OPERATORS + INTERNAL_OPERATORS), \
             "Invalid operator %r in domain term %r" % (operator, leaf)
         assert leaf in (TRUE_LEAF, FALSE_LEAF) or left in model._fields, \
             "Invalid field %r in domain term %r" % (left, leaf)
@@ -1202,6 +1312,16 @@ class expression(object):
             query = '(%s."%s" not in (%s))' % (table_alias, left, right[0])
             params = right[1]
 
+        elif operator in ('exists', 'not exists'):
+            table, link, column, filter_column, filter_ids = right
+            alias, alias_statement = generate_table_alias(eleaf.generate_alias(), [(table, link)])
+            condition = '"%s"."%s" = %s."%s"' % (alias, column, table_alias, left)
+            params = []
+            if filter_column:
+                condition += ' AND "%s"."%s" IN %%s' % (alias, filter_column)
+                params = [tuple(filter_ids) or (None,)]
+            query = '(%s (SELECT 1 FROM %s WHERE %s))' % (operator.upper(), alias_statement, condition)
+
         elif operator in ['in', 'not in']:
             # Two cases: right is a boolean or a list. The boolean case is an
             # abuse and handled for backward compatibility.
@@ -1286,7 +1406,11 @@ class expression(object):
 
         return query, params
 
-    def to_sql(self):
+    def to_sql(self, joins=True):
+        """ Return the SQL condition and its parameters for the domain. The
+            join conditions are included, unless ``joins`` is false; they are
+            then available in ``self.joins``.
+        """
         stack = []                      # stack of query strings
         params = []                     # query parameters, in reverse order
 
@@ -1306,7 +1430,7 @@ class expression(object):
 
         assert len(stack) == 1
         query = stack[0]
-        joins = ' AND '.join(self.joins)
+        joins = joins and ' AND '.join(self.joins)
         if joins:
             query = '(%s) AND %s' % (joins, query)
 
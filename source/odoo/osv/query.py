@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
+import re
+
+# join condition between two columns, like '"a"."b"="c"."d"' in domains or
+# '("a"."b" = "c"."d")' in implicit joins
+JOIN_CONDITION = re.compile(r'^\(?("\w+"\."\w+")\s*=\s*("\w+"\."\w+")\)?$')
 
 
 def _quote(to_quote):
@@ -9,16 +14,24 @@ def _quote(to_quote):
     return to_quote
 
 
-class Query(object):
+def _condition_key(clause):
+    """ Return a key to compare ``clause`` with other conditions, which does
+        not depend on the formatting of join conditions.
     """
-     Dumb implementation of a Query object, using 3 string lists so far
-     for backwards compatibility with the (table, where_clause, where_params) previously used.
-
-     TODO: To be improved after v6.0 to rewrite part of the ORM and add support for:
-      - auto-generated multiple table aliases
-      - multiple joins to the same table with different conditions
-      - dynamic right-hand-side values in domains  (e.g. a.name = a.description)
-      - etc.
+    match = JOIN_CONDITION.match(clause)
+    return frozenset(match.groups()) if match else clause
+
+
+class Query(object):
+    """ Query builder used by the ORM to combine the tables, joins and
+        conditions of a domain, of access rules and of an order specification
+        into a SELECT query.
+
+        Tables and conditions are kept as string lists for backwards
+        compatibility with the (table, where_clause, where_params) previously
+        used, but joins are deduplicated: a table alias is joined at most once,
+        and join conditions are not repeated in the WHERE clause. The method
+        :meth:`select` generates the final query.
     """
 
     def __init__(self, tables=None, where_clause=None, where_clause_params=None, joins=None, extras=None):
@@ -116,7 +129,7 @@ class Query(object):
             if alias_statement not in self.tables:
                 self.tables.append(alias_statement)
                 condition = '("%s"."%s" = "%s"."%s")' % (lhs, lhs_col, alias, col)
-                self.where_clause.append(condition)
+                self.add_where(condition)
             else:
                 # already joined
                 pass
@@ -137,6 +150,51 @@ class Query(object):
                     self.extras[(lhs, join_tuple)] = (extra, extra_params)
             return alias, alias_statement
 
+    def add_where(self, clause, params=()):
+        """ Add a condition and its parameters to the WHERE clause. A condition
+            without parameter placeholders, like a join condition, is not
+            repeated if already present, whatever its formatting.
+        """
+        if '%s' in clause:
+            self.where_clause.append(clause)
+        else:
+            key = _condition_key(clause)
+            if not any(_condition_key(item) == key for item in self.where_clause):
+                self.where_clause.append(clause)
+        self.where_clause_params.extend(params)
+
+    def add_tables(self, tables):
+        """ Add tables (quoted table names or alias statements) to the FROM
+            clause, unless they are already present.
+        """
+        for table in tables:
+            if table not in self.tables:
+                self.tables.append(table)
+
+    def select(self, *args, group_by=None, order_by=None, limit=None, offset=None):
+        """ Return the SELECT query corresponding to ``self``.
+
+            :param args: the expressions to select
+            :param group_by: the content of the GROUP BY clause, if any
+            :param order_by: the content of the ORDER BY clause, if any
+            :param limit: the maximum number of rows, if any
+            :param offset: the number of rows to skip, if any
+            :return: a pair ``(query_str, params)`` to execute
+        """
+        from_clause, where_clause, params = self.get_sql()
+        query_str = 'SELECT %s FROM %s' % (", ".join(args), from_clause)
+        if where_clause:
+            query_str += ' WHERE %s' % where_clause
+        if group_by:
+            query_str += ' GROUP BY %s' % group_by
+        if order_by:
+            query_str += ' ORDER BY %s' % order_by
+        if limit:
+            query_str += ' LIMIT %d' % limit
+        if offset:
+            query_str += ' OFFSET %d' % offset
+        return query_str, params
+
     def get_sql(self):
         """ Returns (query_from, query_where, query_params). """
         from odoo.osv.expression import get_alias_from_query
@@ -1,8 +1,13 @@
 #-----------------------------------------------------------
-# Threaded, Gevent and Prefork Servers
+# Threaded, Gevent, Asyncio and Prefork Servers
 #-----------------------------------------------------------
+import asyncio
+import concurrent.futures
 import datetime
 import errno
+import gc
+import io
+import json
 import logging
 import os
 import os.path
@@ -16,6 +21,7 @@ import sys
 import threading
 import time
 import unittest
+import urllib.parse
 
 import psutil
 import werkzeug.serving
@@ -57,7 +63,7 @@ from odoo.modules import get_modules
 from odoo.modules.module import run_unit_tests, get_test_modules
 from odoo.modules.registry import Registry
 from odoo.release import nt_service_name
-from odoo.tools import config
+from odoo.tools import config, date_utils
 from odoo.tools import stripped_sys_argv, dumpstacks, log_ormcache_stats
 
 _logger = logging.getLogger(__name__)
@@ -76,6 +82,23 @@ def memory_info(process):
     return pmem.vms
 
 
+def memory_stats(process):
+    """
+    :return: a string describing the resident memory of the process, and the
+             part of it shared with other processes
+    """
+    pmem = process.memory_info()
+    stats = 'rss %dMiB' % (pmem.rss >> 20)
+    if hasattr(pmem, 'shared'):
+        stats += ', shared %dMiB' % (pmem.shared >> 20)
+    try:
+        # uss is the memory that would be freed if the process exited
+        stats += ', unique %dMiB' % (process.memory_full_info().uss >> 20)
+    except (AttributeError, psutil.AccessDenied):
+        pass
+    return stats
+
+
 def set_limit_memory_hard():
     if os.name == 'posix' and config['limit_memory_hard']:
         rlimit = resource.RLIMIT_RSS if platform.system() == 'Darwin' else resource.RLIMIT_AS
@@ -300,7 +323,7 @@ class FSWatcherInotify(FSWatcherBase):
 
 
 #----------------------------------------------------------
-# Servers: Threaded, Gevented and Prefork
+# Servers: Threaded, Gevented, Asyncio and Prefork
 #----------------------------------------------------------
 
 class CommonServer(object):
@@ -634,6 +657,204 @@ class GeventServer(CommonServer):
         self.start()
         self.stop()
 
+class RequestError(Exception):
+    """ Invalid or unsupported HTTP request, answered with the given status. """
+    def __init__(self, status):
+        super(RequestError, self).__init__(status)
+        self.status = status
+
+class AsyncioServer(GeventServer):
+    """ Longpolling service relying on asyncio instead of gevent.
+
+    Requests are handled by the WSGI application in a pool of threads. A
+    request may defer its JSON-RPC result by appending a coroutine function to
+    ``environ['odoo.longpolling.defer']``: the thread is then released, and the
+    result of the coroutine is sent to the client once it is available. This
+    is how idle longpolling connections are kept without holding a thread.
+
+    The server only parses what longpolling clients send: requests with a
+    bounded request line, headers and ``Content-Length`` body.
+    """
+    max_request_line = 8 * 1024
+    max_headers_size = 64 * 1024
+    max_body_size = 1024 * 1024
+
+    def __init__(self, app):
+        super(AsyncioServer, self).__init__(app)
+        self.loop = None
+        self.executor = None
+
+    async def watchdog(self, beat=4):
+        self.ppid = os.getppid()
+        while True:
+            self.process_limits()
+            await asyncio.sleep(beat)
+
+    async def read_line(self, reader, limit, status):
+        """ Read a line of at most ``limit`` bytes from ``reader``, or raise
+        a :class:`RequestError` with the given status.
+        """
+        try:
+            line = await reader.readuntil(b'\n')
+        except asyncio.IncompleteReadError as e:
+            line = e.partial
+        except asyncio.LimitOverrunError:
+            raise RequestError(status)
+        if len(line) > limit:
+            raise RequestError(status)
+        return line
+
+    async def read_request(self, reader, writer):
+        """ Read an HTTP request from ``reader`` and return its WSGI environ
+        and body, or ``None`` if the client closed the connection.
+        """
+        request_line = await self.read_line(reader, self.max_request_line, '414 Request-URI Too Long')
+        if not request_line.strip():
+            return None
+        try:
+            method, target, protocol = request_line.decode('latin-1').split()
+        except ValueError:
+            raise RequestError('400 Bad Request')
+        path, _, query = target.partition('?')
+        environ = {
+            'REQUEST_METHOD': method,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': urllib.parse.unquote(path, 'latin-1'),
+            'QUERY_STRING': query,
+            'SERVER_NAME': self.interface,
+            'SERVER_PORT': str(self.port),
+            'SERVER_PROTOCOL': protocol,
+            'REMOTE_ADDR': (writer.get_extra_info('peername') or ('<local>',))[0],
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+            'odoo.longpolling.defer': [],
+        }
+        headers_size = 0
+        while True:
+            line = await self.read_line(reader, self.max_headers_size, '431 Request Header Fields Too Large')
+            headers_size += len(line)
+            if headers_size > self.max_headers_size:
+                raise RequestError('431 Request Header Fields Too Large')
+            if not line.strip():
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            key = name.strip().upper().replace('-', '_')
+            if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                key = 'HTTP_' + key
+            value = value.strip()
+            environ[key] = "%s,%s" % (environ[key], value) if key in environ else value
+
+        if 'HTTP_TRANSFER_ENCODING' in environ:
+            # only bodies with a Content-Length are supported
+            if 'chunked' in environ['HTTP_TRANSFER_ENCODING'].lower():
+                raise RequestError('411 Length Required')
+            raise RequestError('501 Not Implemented')
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            raise RequestError('400 Bad Request')
+        if length < 0:
+            raise RequestError('400 Bad Request')
+        if length > self.max_body_size:
+            raise RequestError('413 Request Entity Too Large')
+        body = await reader.readexactly(length) if length else b''
+        environ['wsgi.input'] = io.BytesIO(body)
+        return environ, body
+
+    def call_app(self, environ):
+        """ Run the WSGI application; return the status, headers and body of
+        its response.
+        """
+        response = {}
+        chunks = []
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = status
+            response['headers'] = headers
+            return chunks.append
+
+        result = self.app(environ, start_response)
+        try:
+            chunks.extend(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return response['status'], response['headers'], b''.join(chunks)
+
+    async def write_response(self, writer, status, headers, content):
+        head = ["HTTP/1.1 %s" % status]
+        head.extend("%s: %s" % header for header in headers)
+        head.extend(["Connection: close", "", ""])
+        writer.write("\r\n".join(head).encode('latin-1') + content)
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        try:
+            request = await self.read_request(reader, writer)
+            if request is None:
+                return
+            environ, body = request
+            status, headers, content = await self.loop.run_in_executor(None, self.call_app, environ)
+            deferred = environ['odoo.longpolling.defer']
+            if deferred:
+                # the application returned an empty result, and will provide
+                # the actual one when the coroutine completes
+                result = await deferred[0]()
+                content = json.dumps({
+                    'jsonrpc': '2.0',
+                    'id': json.loads(body).get('id'),
+                    'result': result,
+                }, default=date_utils.json_default).encode()
+                headers = [(name, value) for name, value in headers if name.lower() != 'content-length']
+                headers.append(('Content-Length', str(len(content))))
+            await self.write_response(writer, status, headers, content)
+            _logger.debug("%s %s %s", environ['REQUEST_METHOD'], environ['PATH_INFO'], status)
+        except RequestError as e:
+            _logger.debug("Asyncio Service (longpolling): invalid request: %s", e.status)
+            try:
+                await self.write_response(writer, e.status, [('Content-Length', '0')], b'')
+            except ConnectionError:
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception:
+            _logger.exception("Asyncio Service (longpolling): error while handling a request")
+        finally:
+            writer.close()
+
+    def start(self):
+        set_limit_memory_hard()
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        # threads only run the WSGI application, hence need a database cursor
+        self.executor = concurrent.futures.ThreadPoolExecutor(max(1, config['db_maxconn'] // 2))
+        self.loop.set_default_executor(self.executor)
+        if os.name == 'posix':
+            signal.signal(signal.SIGQUIT, dumpstacks)
+            signal.signal(signal.SIGUSR1, log_ormcache_stats)
+            self.loop.create_task(self.watchdog())
+
+        self.httpd = self.loop.run_until_complete(
+            asyncio.start_server(self.handle, self.interface, self.port, limit=self.max_headers_size)
+        )
+        _logger.info('Asyncio Service (longpolling) running on %s:%s', self.interface, self.port)
+        try:
+            self.loop.run_forever()
+        except KeyboardInterrupt:
+            pass
+        except:
+            _logger.exception("Asyncio Service (longpolling): uncaught error during main loop")
+            raise
+
+    def stop(self):
+        self.httpd.close()
+        self.executor.shutdown(wait=False)
+        self.loop.close()
+
 class PreforkServer(CommonServer):
     """ Multiprocessing inspired by (g)unicorn.
     PreforkServer (aka Multicorn) currently uses accept(2) as dispatching
@@ -702,7 +923,8 @@ class PreforkServer(CommonServer):
 
     def long_polling_spawn(self):
         nargs = stripped_sys_argv()
-        cmd = [sys.executable, sys.argv[0], 'gevent'] + nargs[1:]
+        mode = 'asyncio' if config['longpolling_server'] == 'asyncio' else 'gevent'
+        cmd = [sys.executable, sys.argv[0], mode] + nargs[1:]
         popen = subprocess.Popen(cmd)
         self.long_polling_pid = popen.pid
 
@@ -741,6 +963,9 @@ class PreforkServer(CommonServer):
             elif sig == signal.SIGUSR1:
                 # log ormcache stats on kill -SIGUSR1
                 log_ormcache_stats()
+            elif sig == signal.SIGUSR2:
+                # log memory usage of the workers on kill -SIGUSR2
+                self.log_memory_stats()
             elif sig == signal.SIGTTIN:
                 # increase number of workers
                 self.population += 1
@@ -748,6 +973,15 @@ class PreforkServer(CommonServer):
                 # decrease number of workers
                 self.population -= 1
 
+    def log_memory_stats(self):
+        _logger.info("Main process (%s): %s", self.pid, memory_stats(psutil.Process(self.pid)))
+        for pid, worker in self.workers.items():
+            try:
+                stats = memory_stats(psutil.Process(pid))
+            except psutil.NoSuchProcess:
+                continue
+            _logger.info("%s (%s): %s", worker.__class__.__name__, pid, stats)
+
     def process_zombie(self):
         # reap dead workers
         while 1:
@@ -815,6 +1049,7 @@ class PreforkServer(CommonServer):
         signal.signal(signal.SIGTTOU, self.signal_handler)
         signal.signal(signal.SIGQUIT, dumpstacks)
         signal.signal(signal.SIGUSR1, log_ormcache_stats)
+        signal.signal(signal.SIGUSR2, self.signal_handler)
 
         if self.address:
             # listen to socket
@@ -859,9 +1094,18 @@ class PreforkServer(CommonServer):
             self.stop()
             return rc
 
+        warmup_registries(preload)
+
         # Empty the cursor pool, we dont want them to be shared among forked workers.
         odoo.sql_db.close_all()
 
+        # Move the objects allocated so far out of reach of the garbage
+        # collector, which would otherwise write in their memory pages when
+        # collecting, and thereby break their sharing with the workers.
+        if hasattr(gc, 'freeze'):
+            gc.collect()
+            gc.freeze()
+
         _logger.debug("Multiprocess starting")
         while 1:
             try:
@@ -909,6 +1153,9 @@ class Worker(object):
     def signal_handler(self, sig, frame):
         self.alive = False
 
+    def signal_memory_stats_handler(self, sig, frame):
+        _logger.info("%s (%s): %s", self.__class__.__name__, self.pid, memory_stats(psutil.Process(self.pid)))
+
     def signal_time_expired_handler(self, n, stack):
         # TODO: print actual RUSAGE_SELF (since last check_limits) instead of
         #       just repeating the config setting
@@ -966,6 +1213,7 @@ class Worker(object):
 
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGXCPU, self.signal_time_expired_handler)
+        signal.signal(signal.SIGUSR2, self.signal_memory_stats_handler)
 
         signal.signal(signal.SIGTERM, signal.SIG_DFL)
         signal.signal(signal.SIGHUP, signal.SIG_DFL)
@@ -985,9 +1233,10 @@ class Worker(object):
             t.daemon = True
             t.start()
             t.join()
-            _logger.info("Worker (%s) exiting. request_count: %s, registry count: %s.",
+            _logger.info("Worker (%s) exiting. request_count: %s, registry count: %s, %s.",
                          self.pid, self.request_count,
-                         len(odoo.modules.registry.Registry.registries))
+                         len(odoo.modules.registry.Registry.registries),
+                         memory_stats(psutil.Process(self.pid)))
             self.stop()
         except Exception:
             _logger.exception("Worker (%s) Exception occured, exiting..." % self.pid)
@@ -997,7 +1246,7 @@ class Worker(object):
     def _runloop(self):
         signal.pthread_sigmask(signal.SIG_BLOCK, {
             signal.SIGXCPU,
-            signal.SIGINT, signal.SIGQUIT, signal.SIGUSR1,
+            signal.SIGINT, signal.SIGQUIT, signal.SIGUSR1, signal.SIGUSR2,
         })
         try:
             while self.alive:
@@ -1224,6 +1473,22 @@ def preload_registries(dbnames):
             return -1
     return rc
 
+def warmup_registries(dbnames):
+    """ Fill the caches of the given (preloaded) registries, and load what the
+    first request would otherwise load lazily. """
+    if not odoo.http.root._loaded:
+        odoo.http.root._loaded = True
+        odoo.http.root.load_addons()
+    templates = [xmlid.strip() for xmlid in config['warmup_templates'].split(',') if xmlid.strip()]
+    for dbname in dbnames or []:
+        try:
+            registry = Registry(dbname)
+            with odoo.api.Environment.manage(), registry.cursor() as cr:
+                env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {})
+                env['ir.http']._warmup_caches(templates)
+        except Exception:
+            _logger.warning("Failed to warm up database `%s`.", dbname, exc_info=True)
+
 def start(preload=None, stop=False):
     """ Start the odoo http server and cron processor.
     """
@@ -1234,6 +1499,8 @@ def start(preload=None, stop=False):
 
     if odoo.evented:
         server = GeventServer(odoo.service.wsgi_server.application)
+    elif odoo.asynchronous:
+        server = AsyncioServer(odoo.service.wsgi_server.application)
     elif config['workers']:
         if config['test_enable'] or config['test_file']:
             _logger.warning("Unit testing in workers mode could fail; use --workers 0.")
@@ -1270,7 +1537,7 @@ def start(preload=None, stop=False):
         server = ThreadedServer(odoo.service.wsgi_server.application)
 
     watcher = None
-    if 'reload' in config['dev_mode'] and not odoo.evented:
+    if 'reload' in config['dev_mode'] and not (odoo.evented or odoo.asynchronous):
         if inotify:
             watcher = FSWatcherInotify()
             watcher.start()
@@ -14,12 +14,13 @@ _logger = logging.getLogger(__name__)
 
 class ormcache_counter(object):
     """ Statistic counters for cache entries. """
-    __slots__ = ['hit', 'miss', 'err']
+    __slots__ = ['hit', 'miss', 'err', 'evict']
 
     def __init__(self):
         self.hit = 0
         self.miss = 0
         self.err = 0
+        self.evict = 0
 
     @property
     def ratio(self):
@@ -38,6 +39,15 @@ class ormcache(object):
         def _compute_domain(self, model_name, mode="read"):
             ...
 
+    The named parameter `cache` gives the name of the registry cache (or
+    region) where the results are stored, ``'default'`` if not given. Caches
+    are invalidated independently of each other (see
+    ``odoo.modules.registry.CACHES``)::
+
+        @ormcache('view_id', cache='templates')
+        def _read_template(self, view_id):
+            ...
+
     For the sake of backward compatibility, the decorator supports the named
     parameter `skiparg`::
 
@@ -52,6 +62,7 @@ class ormcache(object):
     def __init__(self, *args, **kwargs):
         self.args = args
         self.skiparg = kwargs.get('skiparg')
+        self.cache_name = kwargs.get('cache', 'default')
 
     def __call__(self, method):
         self.method = method
@@ -76,7 +87,7 @@ class ormcache(object):
 
     def lru(self, model):
         counter = STAT[(model.pool.db_name, model._name, self.method)]
-        return model.pool.cache, (model._name, self.method), counter
+        return model.pool._caches[self.cache_name], (model._name, self.method), counter
 
     def lookup(self, method, *args, **kwargs):
         d, key0, counter = self.lru(args[0])
@@ -95,8 +106,8 @@ class ormcache(object):
             return self.method(*args, **kwargs)
 
     def clear(self, model, *args):
-        """ Clear the registry cache """
-        model.pool._clear_cache()
+        """ Clear the registry cache where the method stores its results """
+        model.pool._clear_cache(self.cache_name)
 
 
 class ormcache_context(ormcache):
@@ -199,6 +210,7 @@ class dummy_cache(object):
 def log_ormcache_stats(sig=None, frame=None):
     """ Log statistics of ormcache usage by database, model, and method. """
     from odoo.modules.registry import Registry
+    from odoo.tools import ignore
     import threading
 
     me = threading.currentThread()
@@ -208,17 +220,28 @@ def log_ormcache_stats(sig=None, frame=None):
         # set logger prefix to dbname
         me.dbname = dbname
         entries = defaultdict(int)
-        # beware: we use .keys() on purpose here (reg.cache is not a real dict)
-        for key in reg.cache.keys():
-            entries[key[:2]] += 1
+        sizes = defaultdict(int)
+        for cache in reg._caches.values():
+            for key in cache.keys():
+                entries[key[:2]] += 1
+                with ignore(KeyError):
+                    sizes[key[:2]] += cache.sizeof(key)
         # show entries sorted by model name, method name
         for key in sorted(entries, key=lambda key: (key[0], key[1].__name__)):
             model, method = key
             stat = STAT[(dbname, model, method)]
             _logger.info(
-                "%6d entries, %6d hit, %6d miss, %6d err, %4.1f%% ratio, for %s.%s",
-                entries[key], stat.hit, stat.miss, stat.err, stat.ratio, model, method.__name__,
+                "%6d entries, %9d bytes, %6d hit, %6d miss, %6d err, %6d evict, %4.1f%% ratio, for %s.%s",
+                entries[key], sizes[key], stat.hit, stat.miss, stat.err, stat.evict, stat.ratio,
+                model, method.__name__,
             )
+        # show the amount of data fetched from variable-width columns by model
+        fetched = defaultdict(lambda: [0, 0])
+        for (model, fname), (rows, size) in list(reg.read_stats.items()):
+            fetched[model][0] += rows
+            fetched[model][1] += size
+        for model, (rows, size) in sorted(fetched.items()):
+            _logger.info("%9d values, %12d bytes fetched, for %s", rows, size, model)
 
     me.dbname = me_dbname
 
@@ -138,6 +138,16 @@ class configmanager(object):
                          help="Listen port for the main HTTP service", type="int", metavar="PORT")
         group.add_option("--longpolling-port", dest="longpolling_port", my_default=8072,
                          help="Listen port for the longpolling HTTP service", type="int", metavar="PORT")
+        group.add_option("--x-sendfile", dest="x_sendfile", my_default='none',
+                         type="choice", choices=['none', 'x-sendfile', 'x-accel'],
+                         help="Let the reverse proxy send the files of the filestore, with the X-Sendfile "
+                              "header (Apache, lighttpd) or the X-Accel-Redirect header (nginx, which "
+                              "requires an internal location /web/filestore aliasing the filestore "
+                              "directory). Default: 'none', the files are streamed by Odoo.")
+        group.add_option("--longpolling-server", dest="longpolling_server", my_default='gevent',
+                         type="choice", choices=['gevent', 'asyncio'],
+                         help="Implementation of the longpolling HTTP service spawned in multiprocessing "
+                              "mode: 'gevent' (default) or 'asyncio', which only relies on the standard library.")
         group.add_option("--no-http", dest="http_enable", action="store_false", my_default=True,
                          help="Disable the HTTP and Longpolling services entirely")
         group.add_option("--proxy-mode", dest="proxy_mode", action="store_true", my_default=False,
@@ -156,6 +166,14 @@ class configmanager(object):
         group.add_option("--db-filter", dest="dbfilter", my_default='', metavar="REGEXP",
                          help="Regular expressions for filtering available databases for Web UI. "
                               "The expression can use %d (domain) and %h (host) placeholders.")
+        group.add_option("--session-store", dest="session_store", my_default='filesystem',
+                         type="choice", choices=['filesystem', 'postgresql'],
+                         help="Storage of the HTTP sessions: 'filesystem' (one file per session in the "
+                              "data directory) or 'postgresql' (a table in the database given by "
+                              "--session-db, shared by all the servers). Default is %default.")
+        group.add_option("--session-db", dest="session_db", my_default=False,
+                         help="Database name or URI where the HTTP sessions are stored, "
+                              "with --session-store=postgresql.")
         parser.add_option_group(group)
 
         # Testing Group
@@ -292,6 +310,38 @@ class configmanager(object):
         group.add_option("--max-cron-threads", dest="max_cron_threads", my_default=2,
                          help="Maximum number of threads processing concurrently cron jobs (default 2).",
                          type="int")
+        group.add_option("--report-processes", dest="report_processes", my_default=1,
+                         help="Maximum number of wkhtmltopdf processes converting a large PDF report "
+                              "concurrently (default 1). Each process converts a separate document, in "
+                              "which the document-wide page counters of wkhtmltopdf (page, topage) restart; "
+                              "the page numbers of the standard layouts count the pages of each record, and "
+                              "are not affected. In multiprocessing mode, each process loads the assets "
+                              "of the report from the workers, which must be numerous enough.",
+                         type="int")
+        group.add_option("--ormcache-size", dest="ormcache_size", my_default=64 * 1024 * 1024,
+                         help="Maximum approximate memory used by the cached results of model methods, "
+                              "per database and per process (default 64MiB).",
+                         type="int")
+        group.add_option("--image-cache-size", dest="image_cache_size", my_default=256 * 1024 * 1024,
+                         help="Maximum size of the resized images kept in the filestore of each "
+                              "database to serve /web/image, 0 to disable (default 256MiB).",
+                         type="int")
+        group.add_option("--prebuild-assets", dest="prebuild_assets", my_default=False, action="store_true",
+                         help="Build the asset bundles of the database when modules are installed or "
+                              "updated, instead of on the first request needing each of them.")
+        group.add_option("--registry-snapshot", dest="registry_snapshot", my_default=False, action="store_true",
+                         help="Save the field dependencies computed when setting up the models in the "
+                              "data directory, and reuse them in the processes setting up the same models "
+                              "and fields, which makes their startup faster.")
+        group.add_option("--registry-listen", dest="registry_listen", my_default=False, action="store_true",
+                         help="Receive the registry and cache invalidations of other processes through "
+                              "PostgreSQL notifications, instead of checking them in the database "
+                              "at the beginning of every request.")
+        group.add_option("--registry-listen-interval", dest="registry_listen_interval", my_default=10,
+                         help="With --registry-listen, maximum delay in seconds between two checks of "
+                              "the invalidations in the database, in case a notification was missed "
+                              "(default 10).",
+                         type="int")
         group.add_option("--unaccent", dest="unaccent", my_default=False, action="store_true",
                          help="Use the unaccent function provided by the database when available.")
         group.add_option("--geoip-db", dest="geoip_database", my_default='/usr/share/GeoIP/GeoLite2-City.mmdb',
@@ -325,6 +375,10 @@ class configmanager(object):
             group.add_option("--limit-request", dest="limit_request", my_default=8192,
                              help="Maximum number of request to be processed per worker (default 8192).",
                              type="int")
+            group.add_option("--warmup-templates", dest="warmup_templates", my_default='',
+                             help="Comma-separated list of xml ids of qweb templates to compile in the "
+                                  "main process before spawning the workers, along with the other caches "
+                                  "of the databases given with -d, so that the workers share them.")
             parser.add_option_group(group)
 
         # Copy all optparse options (i.e. MyOption) into self.options.
@@ -421,7 +475,7 @@ class configmanager(object):
             self.options['server_wide_modules'] = 'base,web'
 
         # if defined do not take the configfile value even if the defined value is None
-        keys = ['http_interface', 'http_port', 'longpolling_port', 'http_enable',
+        keys = ['http_interface', 'http_port', 'longpolling_port', 'longpolling_server', 'x_sendfile', 'http_enable',
                 'db_name', 'db_user', 'db_password', 'db_host', 'db_sslmode',
                 'db_port', 'db_template', 'logfile', 'pidfile', 'smtp_port',
                 'email_from', 'smtp_server', 'smtp_user', 'smtp_password',
@@ -449,9 +503,10 @@ class configmanager(object):
             'language', 'translate_out', 'translate_in', 'overwrite_existing_translations',
             'dev_mode', 'shell_interface', 'smtp_ssl', 'load_language',
             'stop_after_init', 'without_demo', 'http_enable', 'syslog',
-            'list_db', 'proxy_mode',
+            'list_db', 'proxy_mode', 'session_store', 'session_db',
             'test_file', 'test_tags',
             'osv_memory_count_limit', 'osv_memory_age_limit', 'max_cron_threads', 'unaccent',
+            'report_processes', 'ormcache_size', 'image_cache_size', 'prebuild_assets', 'registry_snapshot', 'registry_listen', 'registry_listen_interval',
             'data_dir',
             'server_wide_modules',
         ]
@@ -459,7 +514,8 @@ class configmanager(object):
         posix_keys = [
             'workers',
             'limit_memory_hard', 'limit_memory_soft',
-            'limit_time_cpu', 'limit_time_real', 'limit_request', 'limit_time_real_cron'
+            'limit_time_cpu', 'limit_time_real', 'limit_request', 'limit_time_real_cron',
+            'warmup_templates',
         ]
 
         if os.name == 'posix':
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 import base64
+import collections
 import io
 import logging
 import os.path
@@ -28,6 +29,9 @@ from odoo import SUPERUSER_ID, api
 
 _logger = logging.getLogger(__name__)
 
+# matches the external ids given to ref() in python expressions
+REF_RE = re.compile(r"""\bref\(\s*['"]([\w.]+)['"]\s*\)""")
+
 from .safe_eval import safe_eval as s_eval
 safe_eval = lambda expr, ctx={}: s_eval(expr, ctx, nocopy=True)
 
@@ -96,6 +100,8 @@ def _eval_xml(self, node, env):
             f_name = node.get("name")
             idref2 = {}
             if f_search:
+                # the search may match the records waiting to be loaded
+                self._flush_records()
                 idref2 = _get_idref(self, env, f_model, self.idref)
             q = safe_eval(f_search, idref2)
             ids = env[f_model].search(q).ids
@@ -497,6 +503,9 @@ form: module.record_id""" % (xml_id,)
 
         self._test_xml_id(rec_id)
         xid = self.make_xml_id(rec_id)
+        if xid in self._records_xmlids:
+            # the same record is defined twice in a row
+            self._flush_records()
 
         # in update mode, the record won't be updated if the data node explicitly
         # opt-out using @noupdate="1". A second check will be performed in
@@ -539,6 +548,8 @@ form: module.record_id""" % (xml_id,)
             f_val = False
 
             if f_search:
+                # the search may match the records waiting to be loaded
+                self._flush_records()
                 idref2 = _get_idref(self, env, f_model, self.idref)
                 q = safe_eval(f_search, idref2)
                 assert f_model, 'Define an attribute model="..." in your .XML file !'
@@ -574,12 +585,10 @@ form: module.record_id""" % (xml_id,)
             res[f_name] = f_val
 
         data = dict(xml_id=xid, values=res, noupdate=self.noupdate)
-        record = model._load_records([data], self.mode == 'update')
-        if rec_id:
-            self.idref[rec_id] = record.id
+        self._queue_record(model, rec_id, data)
         if config.get('import_partial'):
+            self._flush_records()
             env.cr.commit()
-        return rec_model, record.id
 
     def _tag_template(self, el):
         # This helper transforms a <template> element into a <record> and forwards it
@@ -651,7 +660,64 @@ form: module.record_id""" % (xml_id,)
 
         return self._tag_record(record)
 
+    def _queue_record(self, model, rec_id, data):
+        """ Queue the given record data to be loaded. Consecutive records of
+        the same model (and environment) are loaded together by a single call
+        to ``_load_records``.
+        """
+        if self._records and (self._records_model._name, self._records_model.env) != (model._name, model.env):
+            self._flush_records()
+        self._records_model = model
+        self._records.append((rec_id, data))
+        if data['xml_id']:
+            self._records_xmlids.add(data['xml_id'])
+
+    def _flush_records(self):
+        """ Load the queued records. """
+        if not self._records:
+            return
+        model, records = self._records_model, self._records
+        self._records_model, self._records = None, []
+        self._records_xmlids.clear()
+        result = model._load_records([data for rec_id, data in records], self.mode == 'update')
+        for (rec_id, data), record in zip(records, result):
+            if rec_id:
+                self.idref[rec_id] = record.id
+            if data['xml_id']:
+                self._xmlids[data['xml_id']] = (model._name, record.id)
+
+    def _prefetch_xmlids(self, de):
+        """ Resolve at once the external ids referenced in the given document. """
+        xml_ids = set()
+        for node in de.iter(tag=etree.Element):
+            for attr in self.REF_ATTRIBUTES:
+                if node.get(attr):
+                    xml_ids.add(node.get(attr))
+            for group in (node.get('groups') or '').split(','):
+                if group:
+                    xml_ids.add(group[1:] if group.startswith('-') else group)
+            for attr in ('eval', 'search', 'context'):
+                if node.get(attr):
+                    xml_ids.update(REF_RE.findall(node.get(attr)))
+
+        bymodule = collections.defaultdict(set)
+        for xml_id in xml_ids:
+            prefix, suffix = self.make_xml_id(xml_id.strip()).split('.', 1)
+            bymodule[prefix].add(suffix)
+
+        cr = self.env.cr
+        for prefix, suffixes in bymodule.items():
+            for subsuffixes in cr.split_for_in_conditions(suffixes):
+                cr.execute("""
+                    SELECT module, name, model, res_id FROM ir_model_data
+                    WHERE module=%s AND name IN %s AND res_id IS NOT NULL
+                """, [prefix, subsuffixes])
+                for module, name, model, res_id in cr.fetchall():
+                    self._xmlids['%s.%s' % (module, name)] = (model, res_id)
+
     def id_get(self, id_str, raise_if_not_found=True):
+        if self._records and self.make_xml_id(id_str) in self._records_xmlids:
+            self._flush_records()
         if id_str in self.idref:
             return self.idref[id_str]
         res = self.model_id_get(id_str, raise_if_not_found)
@@ -660,6 +726,10 @@ form: module.record_id""" % (xml_id,)
     def model_id_get(self, id_str, raise_if_not_found=True):
         if '.' not in id_str:
             id_str = '%s.%s' % (self.module, id_str)
+        if id_str in self._records_xmlids:
+            self._flush_records()
+        if id_str in self._xmlids:
+            return self._xmlids[id_str]
         return self.env['ir.model.data'].xmlid_to_res_model_res_id(id_str, raise_if_not_found=raise_if_not_found)
 
     def _tag_root(self, el):
@@ -668,6 +738,10 @@ form: module.record_id""" % (xml_id,)
             if f is None:
                 continue
 
+            if rec.tag not in ('record', 'template'):
+                # other tags may depend on the queued records
+                self._flush_records()
+
             self.envs.append(self.get_env(el))
             self._noupdate.append(nodeattr2bool(el, 'noupdate', self.noupdate))
             try:
@@ -676,6 +750,12 @@ form: module.record_id""" % (xml_id,)
                 self._noupdate.pop()
                 self.envs.pop()
 
+            if rec.tag in ('delete', 'function'):
+                # any record may have been deleted
+                self._xmlids.clear()
+            elif rec.tag not in ('record', 'template', *self.DATA_ROOTS) and rec.get('id'):
+                self._xmlids.pop(self.make_xml_id(rec.get('id')), None)
+
     @property
     def env(self):
         return self.envs[-1]
@@ -694,6 +774,12 @@ form: module.record_id""" % (xml_id,)
         self.assertion_report = report
         self._noupdate = [noupdate]
         self.xml_filename = xml_filename
+        # records waiting to be loaded, see _queue_record()
+        self._records_model = None
+        self._records = []
+        self._records_xmlids = set()
+        # prefetched external ids: {xml_id: (model, res_id)}
+        self._xmlids = {}
         self._tags = {
             'record': self._tag_record,
             'delete': self._tag_delete,
@@ -709,7 +795,9 @@ form: module.record_id""" % (xml_id,)
     def parse(self, de):
         assert de.tag in self.DATA_ROOTS, "Root xml tag must be <openerp>, <odoo> or <data>."
         try:
+            self._prefetch_xmlids(de)
             self._tag_root(de)
+            self._flush_records()
         except Exception as e:
             exc_info = sys.exc_info()
             pycompat.reraise(
@@ -721,8 +809,9 @@ form: module.record_id""" % (xml_id,)
                 exc_info[2]
             )
     DATA_ROOTS = ['odoo', 'data', 'openerp']
+    REF_ATTRIBUTES = ['ref', 'parent', 'action', 'inherit_id', 'paperformat', 'view_id', 'uid', 'website_id']
 
-def convert_file(cr, module, filename, idref, mode='update', noupdate=False, kind=None, report=None, pathname=None):
+def convert_file(cr, module, filename, idref, mode='update', noupdate=False, kind=None, report=None, pathname=None, doc=None):
     if pathname is None:
         pathname = os.path.join(module, filename)
     ext = os.path.splitext(filename)[1].lower()
@@ -733,7 +822,7 @@ def convert_file(cr, module, filename, idref, mode='update', noupdate=False, kin
         elif ext == '.sql':
             convert_sql_import(cr, fp)
         elif ext == '.xml':
-            convert_xml_import(cr, module, fp, idref, mode, noupdate, report)
+            convert_xml_import(cr, module, fp, idref, mode, noupdate, report, doc=doc)
         elif ext == '.js':
             pass # .js files are valid but ignored here.
         else:
@@ -778,7 +867,11 @@ def convert_csv_import(cr, module, fname, csvcontent, idref=None, mode='init',
         warning_msg = "\n".join(msg['message'] for msg in result['messages'])
         raise Exception(_('Module loading %s failed: file %s could not be processed:\n %s') % (module, fname, warning_msg))
 
-def convert_xml_import(cr, module, xmlfile, idref=None, mode='init', noupdate=False, report=None):
+def parse_xml_file(xmlfile):
+    """ Parse the given xml data file, and validate it against the schema of
+    data files. This does not access the database, and may be done in another
+    thread than the one importing the file.
+    """
     doc = etree.parse(xmlfile)
     schema = os.path.join(config['root_path'], 'import_xml.rng')
     relaxng = etree.RelaxNG(etree.parse(schema))
@@ -794,6 +887,14 @@ def convert_xml_import(cr, module, xmlfile, idref=None, mode='init', noupdate=Fa
                 _logger.warn(e)
             _logger.info("Install 'jingtrang' for more precise and useful validation messages.")
         raise
+    return doc
+
+def convert_xml_import(cr, module, xmlfile, idref=None, mode='init', noupdate=False, report=None, doc=None):
+    """ Import the given xml data file; ``doc`` is the file already parsed
+    by ``parse_xml_file``, if available.
+    """
+    if doc is None:
+        doc = parse_xml_file(xmlfile)
 
     if isinstance(xmlfile, str):
         xml_filename = xmlfile
@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
 # taken from http://code.activestate.com/recipes/252524-length-limited-o1-lru-cache-implementation/
+import sys
 import threading
+import types
+from collections import OrderedDict
 
 from .func import synchronized
 
-__all__ = ['LRU']
+__all__ = ['LRU', 'SizedLRU']
 
 class LRUNode(object):
     __slots__ = ['prev', 'next', 'me']
@@ -126,3 +129,121 @@ class LRU(object):
         self.d = {}
         self.first = None
         self.last = None
+
+
+def sizeof(obj, depth=6):
+    """ Return the approximate memory size of ``obj`` in bytes, including the
+    objects it contains, up to the given nesting depth. Code objects (like
+    the ones of compiled QWeb templates) are measured by their bytecode and
+    constants.
+    """
+    size = sys.getsizeof(obj)
+    if depth <= 0:
+        return size
+    depth -= 1
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        pass
+    elif isinstance(obj, dict):
+        size += sum(sizeof(key, depth) + sizeof(val, depth) for key, val in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(sizeof(item, depth) for item in obj)
+    elif isinstance(obj, types.FunctionType):
+        size += sizeof(obj.__code__, depth)
+    elif isinstance(obj, types.CodeType):
+        size += sizeof(obj.co_code, depth) + sizeof(obj.co_consts, depth)
+    return size
+
+
+class SizedLRU(object):
+    """ LRU cache bounded by the approximate memory size of its values.
+
+    Reading the cache does not take any lock: an ``OrderedDict`` lookup and
+    its ``move_to_end`` are atomic operations, and a key evicted by another
+    thread in between is simply not moved. Only the operations that modify
+    the cache are serialized, in order to keep the size accounting exact.
+
+    :param max_size: the maximum size of the cache, in bytes
+    :param on_evict: an optional function called with every key that is
+        evicted from the cache because of its size limit
+    """
+    def __init__(self, max_size, on_evict=None):
+        self._lock = threading.Lock()
+        self._data = OrderedDict()      # {key: (value, size)}
+        self.max_size = max(max_size, 1)
+        self.size = 0
+        self.on_evict = on_evict
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, val=None):
+        try:
+            return self[key]
+        except KeyError:
+            return val
+
+    def __getitem__(self, key):
+        value, _size = self._data[key]
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            pass
+        return value
+
+    def __setitem__(self, key, value):
+        size = sys.getsizeof(key) + sizeof(value)
+        evicted = []
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            if size > self.max_size:
+                # the value does not fit in the cache at all
+                return
+            self._data[key] = (value, size)
+            self.size += size
+            while self.size > self.max_size:
+                evicted_key, (_value, evicted_size) = self._data.popitem(last=False)
+                self.size -= evicted_size
+                evicted.append(evicted_key)
+        if self.on_evict is not None:
+            for evicted_key in evicted:
+                self.on_evict(evicted_key)
+
+    def __delitem__(self, key):
+        with self._lock:
+            _value, size = self._data.pop(key)
+            self.size -= size
+
+    def __len__(self):
+        return len(self._data)
+
+    def sizeof(self, key):
+        """ Return the size accounted for the given key, in bytes. """
+        return self._data[key][1]
+
+    def keys(self):
+        while True:
+            try:
+                return list(self._data)
+            except RuntimeError:
+                # the cache has been modified by another thread, try again
+                pass
+
+    def items(self):
+        while True:
+            try:
+                return [(key, value) for key, (value, _size) in list(self._data.items())]
+            except RuntimeError:
+                pass
+
+    def pop(self, key):
+        with self._lock:
+            value, size = self._data.pop(key)
+            self.size -= size
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data = OrderedDict()
+            self.size = 0
@@ -1099,7 +1099,6 @@ def trans_load_data(cr, fileobj, fileformat, lang, lang_name=None, verbose=True,
 
     env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, context or {})
     Lang = env['res.lang']
-    Translation = env['ir.translation']
 
     try:
         if not Lang.search_count([('code', '=', lang)]):
@@ -1109,43 +1108,56 @@ def trans_load_data(cr, fileobj, fileformat, lang, lang_name=None, verbose=True,
         # now, the serious things: we read the language file
         fileobj.seek(0)
         reader = TranslationFileReader(fileobj, fileformat=fileformat)
+        trans_load_rows(cr, reader, lang, verbose=verbose, module_name=module_name, context=context)
 
-        # read the rest of the file
-        irt_cursor = Translation._get_import_cursor()
+    except IOError:
+        iso_lang = get_iso_codes(lang)
+        filename = '[lang: %s][format: %s]' % (iso_lang or 'new', fileformat)
+        _logger.exception("couldn't read translation file %s", filename)
 
-        def process_row(row):
-            """Process a single PO (or POT) entry."""
-            # dictionary which holds values for this line of the csv file
-            # {'lang': ..., 'type': ..., 'name': ..., 'res_id': ...,
-            #  'src': ..., 'value': ..., 'module':...}
-            dic = dict.fromkeys(('type', 'name', 'res_id', 'src', 'value',
-                                 'comments', 'imd_model', 'imd_name', 'module'))
-            dic['lang'] = lang
-            dic.update(row)
 
-            # do not import empty values
-            if not env.context.get('create_empty_translation', False) and not dic['value']:
-                return
+def trans_load_rows(cr, rows, lang, verbose=True, module_name=None, context=None):
+    """Populates the ir_translation table with the given entries of a
+    translation file, as returned by :func:`TranslationFileReader`."""
+    env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, context or {})
+    Translation = env['ir.translation']
+    irt_cursor = Translation._get_import_cursor()
+
+    def process_row(row):
+        """Process a single PO (or POT) entry."""
+        # dictionary which holds values for this line of the csv file
+        # {'lang': ..., 'type': ..., 'name': ..., 'res_id': ...,
+        #  'src': ..., 'value': ..., 'module':...}
+        dic = dict.fromkeys(('type', 'name', 'res_id', 'src', 'value',
+                             'comments', 'imd_model', 'imd_name', 'module'))
+        dic['lang'] = lang
+        dic.update(row)
+
+        # do not import empty values
+        if not env.context.get('create_empty_translation', False) and not dic['value']:
+            return
 
-            if dic['type'] == 'code' and module_name:
-                dic['module'] = module_name
+        if dic['type'] == 'code' and module_name:
+            dic['module'] = module_name
 
-            irt_cursor.push(dic)
+        irt_cursor.push(dic)
 
-        # First process the entries from the PO file (doing so also fills/removes
-        # the entries from the POT file).
-        for row in reader:
-            process_row(row)
+    # First process the entries from the PO file (doing so also fills/removes
+    # the entries from the POT file).
+    for row in rows:
+        process_row(row)
 
-        irt_cursor.finish()
-        Translation.clear_caches()
-        if verbose:
-            _logger.info("translation file loaded successfully")
+    irt_cursor.finish()
+    Translation.clear_caches()
+    if verbose:
+        _logger.info("translation file loaded successfully")
 
-    except IOError:
-        iso_lang = get_iso_codes(lang)
-        filename = '[lang: %s][format: %s]' % (iso_lang or 'new', fileformat)
-        _logger.exception("couldn't read translation file %s", filename)
+
+def trans_read_file(filename):
+    """Return the entries of the given translation file, as a list of dicts."""
+    fileformat = os.path.splitext(filename)[-1][1:].lower()
+    with file_open(filename, mode='rb') as fileobj:
+        return list(TranslationFileReader(fileobj, fileformat=fileformat))
 
 
 def get_locales(lang=None):